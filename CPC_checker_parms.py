@@ -31,6 +31,10 @@ k8s_cni='cilium'
 # for OpenShift: oc
 cmd_start_kubectl='sudo KUBECONFIG=$KUBECONFIG kubectl '
 
+# big clusters: page size (--chunk-size) used when listing k8s objects (eg: pods)
+# -> the lookup stops as soon as a match has been found, so the remaining pages are not fetched
+kubectl_chunk_size=500
+
 # label to define a worker node:
 labels_workernode=['baremetal.cluster.gke.io/node-pool=node-pool-1']
 
@@ -40,10 +44,81 @@ nodes_to_skip=[]
 
 # OPTIONAL: skip the following checks: 
 # NOTE: run: 'python3 cpc_k8s_platform_check_v21.9.py --listchecks' to get an overview of possible checks 
-checks_to_skip=['check_glusterFS','check_AMF_worker_nodes_docker_msgqueue_unlimited']
+checks_to_skip=['check_glusterFS']
 
 # OPTIONAL: run checks in alphabetical order
 run_checks_alphabetically=True
+# OPTIONAL: number of checks run at the same time (1 = one after the other, eg: 4 for big clusters)
+# NOTE: the report always shows the checks in the order above, whatever the order in which they finish
+check_max_parallel=1
+# OPTIONAL: keep the duration of each check + of the ssh work per node in report_history/<REPORT_FILE_PREFIX>_timing.json
+# -> the next runs start the longest expected checks/nodes first + show an ETA in the progress bar
+use_timing_history=False
+# OPTIONAL: 'check' -> check by check (every check does all its nodes)
+#           'node'  -> node by node (node-major, or --node-major): all per-node checks of a node back to back over
+#                      1x ssh connection, max node_major_max_parallel nodes at the same time (same report layout)
+execution_mode='check'
+node_major_max_parallel=10
+# OPTIONAL: sampling (or --sample) for big pools of identical nodes -> nodes with the same kernel, OS image, kubelet and
+# container runtime version, labels and capacity form a group, only sample_nodes_per_group nodes of each group are checked
+# NOTE: a check which fails on a sampled node is done on all nodes of the group, the summary shows the coverage
+sample_nodes=False
+sample_nodes_per_group=2
+# labels which are different on identical nodes
+sample_ignore_labels=['kubernetes.io/hostname']
+
+# --drift: the node facts (node probe) of the nodes of each role are compared, facts differing from the majority are shown
+# facts (regex) which are different on every node (counters, random values) and are never compared:
+drift_ignore_facts=[r'sysctl/kernel\.random\.',r'sysctl/kernel\.(hostname|ns_last_pid|pty\.nr)$',r'sysctl/fs\.(dentry-state|inode-nr|inode-state|file-nr)$',
+                    r'sysctl/net\.netfilter\.nf_conntrack_count$',r'sysctl/net\.ipv6\.conf\..*\.stable_secret$']
+# max number of outlier nodes shown per fact
+drift_max_outliers_shown=5
+
+# OPTIONAL: read the kubelet settings (cpuManagerPolicy, topologyManagerPolicy) from the live kubelet config
+# via the API server (/api/v1/nodes/<node>/proxy/configz) instead of ssh + grep in the kubelet config files
+use_kubelet_configz=False
+# number of nodes for which the kubelet config is fetched at the same time
+kubelet_configz_max_parallel=10
+
+# OPTIONAL: collect the node facts (sysctl, kernel modules, SELinux, systemd units, interfaces, ...) with the
+# node probe script (cpc_node_probe.sh, read-only): 1x ssh per node iso 1x ssh per check per node
+# NOTE: cpc_node_probe.sh must be in the same directory as the script
+use_node_probe=False
+# number of nodes probed at the same time
+node_probe_max_parallel=10
+# the node probe compresses its output (gzip + base64) when it is bigger than this (0 = never)
+node_probe_compress_min_bytes=65536
+
+# ssh ConnectTimeout (seconds) for all ssh connections to the nodes
+ssh_connect_timeout=10
+# check the ssh connection to all nodes (in parallel) before running the checks
+# -> a node which can not be reached is UNREACHABLE for all checks (no ssh timeout per check)
+ssh_preflight=True
+ssh_preflight_max_parallel=20
+# keep the ssh connection to a node open (seconds) and reuse it for the next commands (ssh ControlMaster), 0 = no reuse
+# -> eg: 300 when calling run_checks() several times from python
+ssh_control_persist=0
+
+# retry of commands failing with a transport error (ssh/kubectl could not reach the node/API server):
+#   connect   : connection refused/reset, no route to host
+#   auth      : ssh permission denied / host key, kubectl Unauthorized
+#   timeout   : connect/TLS/i/o timeout
+#   throttled : API server overloaded: 429 TooManyRequests, 5xx
+# -> exponential backoff with jitter: transport_retry_base_delay, x2 for each next retry (max transport_retry_max_delay)
+# -> a check which gets a wrong value is never retried
+transport_retry_max_attempts=3
+transport_retry_base_delay=1
+transport_retry_max_delay=10
+transport_retry_on=['connect','timeout','throttled']
+
+# admission control (the queue wait is shown in the summary):
+# max kubectl calls per second to the API server (token bucket, 0 = no limit) + burst
+kubectl_qps=10
+kubectl_burst=20
+# max ssh sessions at the same time to 1x node (sshd MaxStartups/MaxSessions on the node, 0 = no limit)
+ssh_max_sessions_per_node=2
+# max ssh sessions at the same time from/through the jump host (bastion, 0 = no limit)
+ssh_max_sessions=10
 
 # print out extra info about which nodes are used by the script
 show_extra_info=False                                                               
@@ -82,20 +157,30 @@ amf_worker_node_sysctl={
 'kernel.sched_rt_runtime_us': -1,
 'kernel.core_pattern': '/var/crash/core.%p'
 }
+# sysctl values only checked on nodes with a matching OS image (other nodes -> N/A)
+amf_worker_node_sysctl_os_specific={
+'kernel.sched_rt_runtime_us': ['Red Hat','CentOS']
+}
 # OPTIONAL: check IPSEC (for 4G - LI)
 check_amf_ipsec=True
-if check_amf_ipsec:
-    amf_worker_node_sysctl['net.ipv4.conf.all.accept_redirects']=0
-    amf_worker_node_sysctl['net.ipv4.conf.all.send_redirects']=0
-    amf_worker_node_sysctl['net.ipv4.conf.default.rp_filter']=0
-    amf_worker_node_sysctl['net.ipv4.conf.default.accept_source_route']=0
-    amf_worker_node_sysctl['net.ipv4.conf.default.send_redirects']=0
-    amf_worker_node_sysctl['net.ipv4.icmp_ignore_bogus_error_responses']=1
-    amf_worker_node_sysctl['net.ipv4.conf.all.rp_filter']=0
+# sysctl values checked on the AMF worker nodes on top of amf_worker_node_sysctl when check_amf_ipsec is set
+amf_worker_node_sysctl_ipsec={
+'net.ipv4.conf.all.accept_redirects': 0,
+'net.ipv4.conf.all.send_redirects': 0,
+'net.ipv4.conf.default.rp_filter': 0,
+'net.ipv4.conf.default.accept_source_route': 0,
+'net.ipv4.conf.default.send_redirects': 0,
+'net.ipv4.icmp_ignore_bogus_error_responses': 1,
+'net.ipv4.conf.all.rp_filter': 0
+}
 # OPTIONAL: ipvlan host interfaces (see values file of AMF):
 #leave empty when not using ipvlan 
 #amf_ipvlan_interface_list=['bond0.101','bond0.301','bond0.401']
 amf_ipvlan_interface_list=['bond0.101','bond0.301','bond0.401']
+# labels to find the whereabouts pods (filtered by the API server instead of listing all pods)
+whereabouts_pod_labels=['app=whereabouts','name=whereabouts']
+# namespaces searched for whereabouts pods without one of these labels (the pods of the other namespaces are never listed)
+whereabouts_namespaces=['kube-system',namespace_amf]
 
 # cmg:
 # if using dpdk, the worker nodes should use huge pages
@@ -149,6 +234,54 @@ cmg_CSF_mtu_size=9000
 CREATE_REPORT_FILE=True
 # report file prefix -> full name becomes: REPORT_FILE_PREFIX + '_' + timestamp + '.log'
 REPORT_FILE_PREFIX = 'Telenet_pre-prod'
+# OPTIONAL: compact report (or --compact) for big fleets -> the nodes with the same outcome of a check are shown on 1x line
+# ("187/200 nodes: ..." + the nodes), the full details per node stay in the history database (--history, --diff-against)
+# NOTE: without history_db the details per node are lost (warning at the start of the run)
+compact_report=False
+# max number of nodes shown per outcome in the compact report
+compact_max_nodes_shown=10
+# OPTIONAL: keep the results of every run (status + value per check and per node, durations) in a SQLite database
+# -> python3 cpc_k8s_platform_checker.py --history [runs|status|slowest]   ('' = no history database)
+# -> needed by --history, --diff-against and --rerun-failed, eg: history_db='report_history/CPC_history.db'
+history_db=''
+# runs older than this number of days are removed from the history database (0 = keep all runs)
+history_retention_days=180
+# OPTIONAL: --diff-against: nodes with the same state key as in that run (same kernel/OS/kubelet/runtime version, boot ID, labels,
+# capacity and the same parameters in this file) are not checked again -> their results of that run are used
+# NOTE: a change on the node which is not visible in k8s (eg: sysctl -w without reboot) is not seen for these nodes
+diff_skip_unchanged_nodes=False
+
+# MULTI-CLUSTER (--clusters):
+#############################
+# check several clusters at once: python3 cpc_k8s_platform_checker.py --clusters pre-prod prod   (or: --clusters all)
+# per cluster profile (all optional):
+#   kubeconfig : kubeconfig file of the cluster   -> added to cmd_start_kubectl: --kubeconfig=...
+#   context    : context in the kubeconfig file   -> added to cmd_start_kubectl: --context=...
+#   platform   : target_platform of the cluster
+#   sshkey     : ssh key to access the nodes of the cluster
+#   config     : YAML/JSON profile file with the parameters of this cluster (see --config)
+#   inherits   : name of another cluster profile this profile is based on (its own values win)
+#   parms      : parameters of this file with another value for this cluster
+#                (default REPORT_FILE_PREFIX: REPORT_FILE_PREFIX + '_' + profile name)
+# eg:
+# cluster_profiles={
+#     'pre-prod': {'kubeconfig':'/home/nokia/.kube/pre-prod.conf','platform':'gcp','parms':{'REPORT_FILE_PREFIX':'Telenet_pre-prod'}},
+#     'prod':     {'kubeconfig':'/home/nokia/.kube/prod.conf','context':'prod-admin','platform':'ncs',
+#                  'parms':{'REPORT_FILE_PREFIX':'Telenet_prod','labels_amfnode':['amf=amf1']}},
+# }
+cluster_profiles={}
+#
+# PROFILE FILES (--config):
+# python3 cpc_k8s_platform_checker.py --config prod.yaml
+#   -> YAML (needs PyYAML) or JSON file with only the parameters that differ from this file
+#   -> inherits: profile file(s) it is based on (path relative to the file), eg:
+#        # prod.yaml
+#        inherits: pre-prod.yaml
+#        REPORT_FILE_PREFIX: Telenet_prod
+#        labels_amfnode: ['amf=amf1']
+#   -> all parameters are validated (type + allowed values) before anything is done on the cluster
+# max number of clusters checked at the same time
+cluster_max_parallel=4
 report_header_length=115
 
 # variables for report:
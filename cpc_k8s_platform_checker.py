@@ -13,6 +13,32 @@
 # 
 #         TO DO: allow checks to be performed on a specific CNF: NRD, AMF, SMF or UPF
 # 
+# 22.05 : whereabouts check -> use label selectors, direct crd lookups and paginated (--chunk-size) pod lists with early exit
+#         CPU/NUMA pinning checks can read the live kubelet config via the API server (configz) iso ssh + grep
+#         node probe (cpc_node_probe.sh): collect all node facts with 1x ssh per node -> 1x JSON document
+#         OS image, kernel and container runtime per node out of 1x cluster snapshot -> checks which do not apply to a node: N/A
+#         commands as argv lists (no shell, no grep/awk/cut pipes) -> output filtered in python
+#         streaming command output: stop the command as soon as the needed line(s) arrived
+#         ssh pre-flight of all nodes in parallel + circuit breaker: node UNREACHABLE after its 1st ssh failure
+#         retry with exponential backoff + jitter for transport errors (connect, auth, timeout, throttled) of ssh/kubectl (--self-check: shows a refused ssh port is retried)
+#         admission control: kubectl/oc QPS (token bucket), ssh sessions per node + via the jump host, queue wait in the summary
+#         --clusters: run several clusters (cluster_profiles) at once in 1x process -> merged summary + 1x report file per cluster
+#         config: CPC_checker_parms.py + YAML/JSON profile files (--config, inherits) -> validated before anything is done on the cluster, parameters added after 22.05 have a default (older CPC_checker_parms.py still works)
+#         API: run_checks(config, checks, nodes) from python, run context (RunContext) = own copy of the script with its own config + caches (the checks still use module globals), reused by the next calls
+#         check dependencies: gating checks first, SKIPPED (due to ...) for checks whose prerequisite is not OK, for unreachable nodes + the mtu/VF checks of a missing/down interface (per node), the CMG interface checks need CMG worker nodes (node list, -o/-s applied)
+#         bug fixing: check_NRD_labels (label_nrdnode does not exist) + NRD worker node list (looped over labels_amfnode)
+#         opt-in: checks run at the same time (check_max_parallel), longest expected check/node first (timing history), ETA in progress bar
+#         node-major mode (--node-major): per node all per-node checks back to back over 1x ssh connection, nodes at the same time
+#         --sample: only a sample of each group of identical nodes is checked, the whole group when a sampled node fails
+#         --drift: fleet drift matrix -> facts of the node probe compared across the nodes of each role, outliers vs the majority
+#         --export-facts: all facts collected during the run -> 1x row per (cluster, node, fact, value, timestamp) in a CSV(.gz)/Parquet file
+#         history database (SQLite): status + value per check and per node, durations of every run -> --history runs/status/slowest
+#         --diff-against: only the changes since an earlier run (checks, nodes, status/value per node), unchanged nodes can be skipped
+#         --rerun-failed: only the failing checks + nodes of an earlier run are done again, merged with its other results in a full report
+#         --compact: compact report for big fleets, the nodes with the same outcome of a check on 1x line (N/M nodes: ... + the nodes)
+#         --trace: timeline of the run as Chrome trace-event file (spans per check, node, node probe, command + queue wait)
+#         --shell: interactive mode (check, facts, refresh, ...) on a warm cluster snapshot, node facts + ssh connections
+#         lazy discovery: the node lists (per role) + platform facts are only built when a check needs them (eg: -c check_istio, --nodeinfo)
 # 22.04 : split checks for CMG SRIOV and IPVLAN worker nodes
 # 22.03 : labelname -> make it a list instead of just 1 value
 #         bug fixing
@@ -52,6 +78,50 @@
 
 # CPC_checker_parms.py changes:
 ###############################
+# 22.05:
+# 1) NEW:
+#   kubectl_chunk_size                          : page size (--chunk-size) when listing big lists of k8s objects (eg: pods)
+#   whereabouts_pod_labels                      : list of labels to find the whereabouts pods (server side filtering)
+#   whereabouts_namespaces                      : namespaces searched for unlabelled whereabouts pods (never all pods)
+#   use_kubelet_configz                         : read kubelet settings via /api/v1/nodes/<node>/proxy/configz iso ssh to the nodes
+#   kubelet_configz_max_parallel                : max number of nodes for which the kubelet config is fetched at the same time
+#   use_node_probe                              : collect the node facts with the node probe script (1x ssh per node)
+#   node_probe_max_parallel                     : max number of nodes probed at the same time
+#   node_probe_compress_min_bytes               : the node probe compresses its output when it is bigger than this (0 = never)
+#   amf_worker_node_sysctl_os_specific          : sysctl values only checked on nodes with a matching OS image
+#   ssh_connect_timeout                         : ssh ConnectTimeout (seconds) for all ssh connections to the nodes
+#   ssh_preflight                               : check the ssh connection to all nodes (in parallel) before the checks
+#   ssh_preflight_max_parallel                  : max number of nodes checked at the same time by the ssh pre-flight
+#   transport_retry_max_attempts                : max number of attempts of a command failing with a transport error
+#   transport_retry_base_delay                  : delay (seconds) before the 1st retry, doubled for each next retry
+#   transport_retry_max_delay                   : max delay (seconds) between 2 attempts
+#   transport_retry_on                          : transport errors which are retried: connect, auth, timeout, throttled
+#   cluster_profiles                            : clusters which can be checked with --clusters (kubeconfig, context, platform, parms)
+#   cluster_max_parallel                        : max number of clusters checked at the same time with --clusters
+#   kubectl_qps                                 : max kubectl calls per second (token bucket, 0 = no limit)
+#   kubectl_burst                               : max kubectl calls started at once before kubectl_qps applies
+#   ssh_max_sessions_per_node                   : max ssh sessions at the same time to 1x node (0 = no limit)
+#   ssh_max_sessions                            : max ssh sessions at the same time from/through the jump host (0 = no limit)
+#   amf_worker_node_sysctl_ipsec                : sysctl values checked on the AMF worker nodes when check_amf_ipsec is set
+#   ssh_control_persist                         : keep the ssh connection to a node open for reuse (seconds, 0 = no reuse)
+#   check_max_parallel                          : max number of checks run at the same time (1 = one after the other)
+#   use_timing_history                          : keep the duration of the checks + nodes -> longest expected work first, ETA
+#   execution_mode                              : 'check' (check by check) or 'node' (node by node, see --node-major)
+#   node_major_max_parallel                     : max number of nodes checked at the same time in node-major mode
+#   sample_nodes                                : only check a sample of each group of identical nodes (see --sample)
+#   sample_nodes_per_group                      : number of nodes checked per group of identical nodes when sampling
+#   sample_ignore_labels                        : node labels which do not make nodes different when sampling (eg: hostname)
+#   drift_ignore_facts                          : facts (regex) which are different on every node and never drift (eg: kernel.random.*)
+#   drift_max_outliers_shown                    : max number of outlier nodes shown per fact by --drift
+#   history_db                                  : SQLite database with the results of every run (see --history), '' = no history (default)
+#   history_retention_days                      : runs older than this are removed from the history database (0 = keep all)
+#   diff_skip_unchanged_nodes                   : --diff-against: nodes with the same state key as in that run are not checked again
+#   compact_report                              : compact report, the nodes with the same outcome of a check on 1x line (see --compact)
+#   compact_max_nodes_shown                     : max number of nodes shown per outcome in the compact report
+# 2) CHANGED:
+#   checks_to_skip                              : docker/containerd msgqueue checks no longer need to be skipped (N/A per node)
+#   amf_worker_node_sysctl                      : no longer extended with the IPSEC sysctl values in this file (see amf_worker_node_sysctl_ipsec)
+#   cluster_profiles                            : config (YAML/JSON profile file) and inherits (other cluster profile) added
 # 22.04:
 # 1) NEW:
 #   labels_cmgnode_sriov                        : list of labels assigned to CMG worker nodes using SRIOV
@@ -116,30 +186,500 @@ import sys
 import time
 import argparse
 import subprocess
+import json
+import csv
+import sqlite3
+import shlex
+import tempfile
+import gzip
+import base64
+import hashlib
+import copy
+import io
+import runpy
+import random
+import threading
+import itertools
+from contextlib import contextmanager
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor,wait,as_completed,FIRST_COMPLETED
 from subprocess import PIPE, Popen
 import CPC_checker_parms
-from CPC_checker_parms import *
 import re
-
-CPC_PLATFORM_CHECKER_VERSION = "version 22.04"
+# optional: only needed for YAML config files
+try:
+    import yaml
+except ImportError:
+    yaml=None
+# optional: only needed for --export-facts to a Parquet file
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow=None
+# optional: line editing + command history in --shell
+try:
+    import readline
+except ImportError:
+    readline=None
+
+# CONFIG:
+#########
+# parameters -> (kind, check): every config (CPC_checker_parms.py, YAML/JSON profile file, cluster profile) is
+# validated before anything is done on the cluster
+#   check: allowed values (list) or minimum value (int/number)
+TRANSPORT_ERROR_CLASSES=['connect','auth','timeout','throttled']
+PLATFORMS=['ncs','os','gcp','eccd','k8s']
+PARMS_KINDS={
+    'str':'a string',
+    'bool':'True or False',
+    'int':'an integer',
+    'number':'a number',
+    'str_list':'a list of strings',
+    'sysctl':"a dictionary {'sysctl key': value}",
+    'os_specific':"a dictionary {'sysctl key': ['OS image', ...]}",
+    'dict':'a dictionary'}
+PARMS_SCHEMA={
+    'worker_node_username':                 ('str',None),
+    'skip_username_worker_node_to_ssh':     ('bool',None),
+    'target_platform':                      ('str',PLATFORMS),
+    'container_runtime':                    ('str',['docker','containerd']),
+    'nic_brand':                            ('str',['Intel','Mellanox']),
+    'k8s_cni':                              ('str',None),
+    'cmd_start_kubectl':                    ('str',None),
+    'kubectl_chunk_size':                   ('int',1),
+    'labels_workernode':                    ('str_list',None),
+    'nodes_to_skip':                        ('str_list',None),
+    'checks_to_skip':                       ('str_list',None),
+    'run_checks_alphabetically':            ('bool',None),
+    'check_max_parallel':                   ('int',1),
+    'use_timing_history':                   ('bool',None),
+    'execution_mode':                       ('str',['check','node']),
+    'node_major_max_parallel':              ('int',1),
+    'sample_nodes':                         ('bool',None),
+    'sample_nodes_per_group':               ('int',1),
+    'sample_ignore_labels':                 ('str_list',None),
+    'drift_ignore_facts':                   ('str_list',None),
+    'drift_max_outliers_shown':             ('int',1),
+    'use_kubelet_configz':                  ('bool',None),
+    'kubelet_configz_max_parallel':         ('int',1),
+    'use_node_probe':                       ('bool',None),
+    'node_probe_max_parallel':              ('int',1),
+    'node_probe_compress_min_bytes':        ('int',0),
+    'ssh_connect_timeout':                  ('int',1),
+    'ssh_preflight':                        ('bool',None),
+    'ssh_preflight_max_parallel':           ('int',1),
+    'ssh_control_persist':                  ('int',0),
+    'transport_retry_max_attempts':         ('int',1),
+    'transport_retry_base_delay':           ('number',0),
+    'transport_retry_max_delay':            ('number',0),
+    'transport_retry_on':                   ('str_list',TRANSPORT_ERROR_CLASSES),
+    'kubectl_qps':                          ('number',0),
+    'kubectl_burst':                        ('int',1),
+    'ssh_max_sessions_per_node':            ('int',0),
+    'ssh_max_sessions':                     ('int',0),
+    'show_extra_info':                      ('bool',None),
+    'namespace_istio_system':               ('str',None),
+    'podname_istio_ingressgateway':         ('str',None),
+    'namespace_nrd_dabatase':               ('str',None),
+    'namespace_nrd':                        ('str',None),
+    'check_nrd_istio':                      ('bool',None),
+    'labels_nrdnode':                       ('str_list',None),
+    'label_nrd_database':                   ('str',None),
+    'label_nrd':                            ('str',None),
+    'check_NRD_performance':                ('bool',None),
+    'nrd_worker_node_sysctl':               ('sysctl',None),
+    'namespace_amf':                        ('str',None),
+    'labels_amfnode':                       ('str_list',None),
+    'amf_worker_node_sysctl':               ('sysctl',None),
+    'amf_worker_node_sysctl_os_specific':   ('os_specific',None),
+    'check_amf_ipsec':                      ('bool',None),
+    'amf_worker_node_sysctl_ipsec':         ('sysctl',None),
+    'amf_ipvlan_interface_list':            ('str_list',None),
+    'whereabouts_pod_labels':               ('str_list',None),
+    'whereabouts_namespaces':               ('str_list',None),
+    'deploy_cmg_with_dpdk':                 ('bool',None),
+    'cmg_worker_node_sysctl':               ('sysctl',None),
+    'namespace_smf':                        ('str',None),
+    'namespace_upf':                        ('str',None),
+    'labels_cmgnode':                       ('str_list',None),
+    'labels_cmgnode_sriov':                 ('str_list',None),
+    'cmg_sriov_interface_list':             ('str_list',None),
+    'cmg_sriov_interface_mtu_min':          ('int',0),
+    'labels_cmgnode_ipvlan':                ('str_list',None),
+    'cmg_ipvlan_interface_list':            ('str_list',None),
+    'cmg_workernode_k8s_interface_name':    ('str',None),
+    'cmg_CSF_mtu_size':                     ('int',0),
+    'CREATE_REPORT_FILE':                   ('bool',None),
+    'REPORT_FILE_PREFIX':                   ('str',None),
+    'history_db':                           ('str',None),
+    'history_retention_days':               ('int',0),
+    'diff_skip_unchanged_nodes':            ('bool',None),
+    'compact_report':                       ('bool',None),
+    'compact_max_nodes_shown':              ('int',1),
+    'cluster_profiles':                     ('dict',None),
+    'cluster_max_parallel':                 ('int',1),
+    'report_header_length':                 ('int',1),
+    'dotline_length':                       ('int',1),
+    'level1':                               ('int',0),
+    'level2':                               ('int',0),
+    'level3':                               ('int',0),
+    'level4':                               ('int',0),
+    'check_failed':                         ('bool',None),
+    'check_passed':                         ('bool',None)}
+# parameters added after 22.05 -> default when not in the config (an older CPC_checker_parms.py still works as before):
+#   the behaviour before the parameter existed, opt-in features off
+#   -> the other parameters are in every CPC_checker_parms.py: still needed
+#   -> function: default is based on other parameters of the config
+PARMS_DEFAULTS={
+    'kubectl_chunk_size':                   500,
+    'check_max_parallel':                   1,
+    'use_timing_history':                   False,
+    'execution_mode':                       'check',
+    'node_major_max_parallel':              10,
+    'sample_nodes':                         False,
+    'sample_nodes_per_group':               2,
+    'sample_ignore_labels':                 ['kubernetes.io/hostname'],
+    'drift_ignore_facts':                   [r'sysctl/kernel\.random\.',r'sysctl/kernel\.(hostname|ns_last_pid|pty\.nr)$',r'sysctl/fs\.(dentry-state|inode-nr|inode-state|file-nr)$',
+                                             r'sysctl/net\.netfilter\.nf_conntrack_count$',r'sysctl/net\.ipv6\.conf\..*\.stable_secret$'],
+    'drift_max_outliers_shown':             5,
+    'use_kubelet_configz':                  False,
+    'kubelet_configz_max_parallel':         10,
+    'use_node_probe':                       False,
+    'node_probe_max_parallel':              10,
+    'node_probe_compress_min_bytes':        65536,
+    'ssh_connect_timeout':                  10,
+    'ssh_preflight':                        False,
+    'ssh_preflight_max_parallel':           20,
+    'ssh_control_persist':                  0,
+    'transport_retry_max_attempts':         1,
+    'transport_retry_base_delay':           1,
+    'transport_retry_max_delay':            10,
+    'transport_retry_on':                   ['connect','timeout','throttled'],
+    'kubectl_qps':                          0,
+    'kubectl_burst':                        1,
+    'ssh_max_sessions_per_node':            0,
+    'ssh_max_sessions':                     0,
+    'amf_worker_node_sysctl_os_specific':   {},
+    'amf_worker_node_sysctl_ipsec':         {},
+    'whereabouts_pod_labels':               ['app=whereabouts','name=whereabouts'],
+    'whereabouts_namespaces':               lambda my_config: ['kube-system',my_config.get('namespace_amf','amf')],
+    'history_db':                           '',
+    'history_retention_days':               180,
+    'diff_skip_unchanged_nodes':            False,
+    'compact_report':                       False,
+    'compact_max_nodes_shown':              10,
+    'cluster_profiles':                     {},
+    'cluster_max_parallel':                 4}
+CLUSTER_PROFILE_KEYS=['kubeconfig','context','platform','sshkey','parms','config','inherits']
+
+def check_parm(name,value):
+
+    # 1x parameter -> error text, None when ok
+    kind,check=PARMS_SCHEMA[name]
+    if kind=='str':
+        my_ok=isinstance(value,str)
+    elif kind=='bool':
+        my_ok=isinstance(value,bool)
+    elif kind=='int':
+        my_ok=isinstance(value,int) and not isinstance(value,bool)
+    elif kind=='number':
+        my_ok=isinstance(value,(int,float)) and not isinstance(value,bool)
+    elif kind=='str_list':
+        my_ok=isinstance(value,list) and all(isinstance(x,str) for x in value)
+    elif kind=='sysctl':
+        my_ok=isinstance(value,dict) and all(isinstance(x,str) and isinstance(y,(str,int)) and not isinstance(y,bool) for x,y in value.items())
+    elif kind=='os_specific':
+        my_ok=isinstance(value,dict) and all(isinstance(x,str) and isinstance(y,list) and all(isinstance(z,str) for z in y) for x,y in value.items())
+    else:
+        my_ok=isinstance(value,dict)
+    if not my_ok:
+        return(name+' = '+repr(value)+' -> must be '+PARMS_KINDS[kind])
+    if isinstance(check,list):
+        if [x for x in (value if kind=='str_list' else [value]) if x not in check]:
+            return(name+' = '+repr(value)+' -> allowed values: '+', '.join(check))
+    elif check is not None and value < check:
+        return(name+' = '+repr(value)+' -> must be at least '+str(check))
+    return(None)
+
+def validate_config(my_config):
+
+    # all errors in the config (empty list = ok)
+    #  -> missing: only parameters without a default (see PARMS_DEFAULTS, filled in by load_config)
+    my_errors=[]
+    for name in PARMS_SCHEMA:
+        if name in my_config:
+            my_errors.append(check_parm(name,my_config[name]))
+        elif name not in PARMS_DEFAULTS:
+            my_errors.append(name+' -> missing')
+    my_errors=[x for x in my_errors if x]
+    if my_errors:
+        return(my_errors)
+    if my_config['transport_retry_base_delay'] > my_config['transport_retry_max_delay']:
+        my_errors.append('transport_retry_base_delay -> must not be bigger than transport_retry_max_delay')
+    if '/' in my_config['REPORT_FILE_PREFIX']:
+        my_errors.append('REPORT_FILE_PREFIX = '+repr(my_config['REPORT_FILE_PREFIX'])+" -> must not contain '/'")
+    for profile_name,profile in my_config['cluster_profiles'].items():
+        my_text='cluster_profiles['+repr(profile_name)+']'
+        if not isinstance(profile,dict):
+            my_errors.append(my_text+' -> must be '+PARMS_KINDS['dict'])
+            continue
+        my_errors+=[my_text+' -> unknown key: '+str(x) for x in profile if x not in CLUSTER_PROFILE_KEYS]
+        if profile.get('platform') is not None and profile['platform'] not in PLATFORMS:
+            my_errors.append(my_text+"['platform'] = "+repr(profile['platform'])+' -> allowed values: '+', '.join(PLATFORMS))
+        if profile.get('inherits') is not None and profile['inherits'] not in my_config['cluster_profiles']:
+            my_errors.append(my_text+"['inherits'] = "+repr(profile['inherits'])+' -> cluster profile not found')
+        for name,value in profile.get('parms',{}).items():
+            if name not in PARMS_SCHEMA:
+                my_errors.append(my_text+"['parms'] -> unknown parameter: "+str(name))
+            elif check_parm(name,value):
+                my_errors.append(my_text+"['parms']: "+check_parm(name,value))
+    return(my_errors)
+
+def read_config_file(path,seen=()):
+
+    # YAML/JSON profile file -> parameters
+    #   inherits: file(s) this profile is based on (path relative to this file), its own values win
+    path=os.path.abspath(path)
+    if path in seen:
+        raise ValueError('config: inheritance loop: '+' -> '.join(seen+(path,)))
+    if path.endswith(('.yaml','.yml')) and yaml is None:
+        raise ValueError('config: '+path+' -> PyYAML is needed to read YAML files (pip install pyyaml)')
+    try:
+        with open(path) as f:
+            my_data=yaml.safe_load(f) if path.endswith(('.yaml','.yml')) else json.load(f)
+    except Exception as my_error:
+        raise ValueError('config: '+path+' -> '+str(my_error))
+    if not isinstance(my_data,dict):
+        raise ValueError('config: '+path+' -> must contain parameter: value pairs')
+    my_parents=my_data.pop('inherits',[])
+    if isinstance(my_parents,str):
+        my_parents=[my_parents]
+    my_unknown=sorted(str(x) for x in my_data if x not in PARMS_SCHEMA)
+    if my_unknown:
+        raise ValueError('config: '+path+' -> unknown parameter(s): '+', '.join(my_unknown))
+    my_config={}
+    for parent in my_parents:
+        my_config.update(read_config_file(os.path.join(os.path.dirname(path),parent),seen+(path,)))
+    my_config.update(my_data)
+    return(my_config)
+
+def load_config(config_file=None,overrides=None):
+
+    # config = CPC_checker_parms.py <- profile file (+ the files it inherits) <- overrides (eg: of a cluster profile)
+    #  -> new dictionary each time, so several configs can be used next to each other
+    #  -> ValueError with all errors when the config is not valid
+    my_config=copy.deepcopy({x:y for x,y in vars(CPC_checker_parms).items() if not x.startswith('_') and not isinstance(y,type(sys))})
+    if config_file:
+        my_config.update(read_config_file(config_file))
+    if overrides:
+        my_config.update(copy.deepcopy(overrides))
+    # parameters not set -> default (after the own values: a default can be based on them)
+    for name,value in PARMS_DEFAULTS.items():
+        if name not in my_config:
+            my_config[name]=value(my_config) if callable(value) else copy.deepcopy(value)
+    my_errors=validate_config(my_config)
+    if my_errors:
+        raise ValueError('\n'.join(my_errors))
+    return(my_config)
+
+# --config/--clusters: each profile runs in its own copy of this script (see run_profile) with its own config
+#   -> cluster_profile is given by run_profile, None: config = CPC_checker_parms.py
+# config of this copy:
+#   parms_config = the validated config (new dictionary, see load_config) -> used where the config is needed as a whole
+#   (API run context, history database, ...), the checks read the parameters as globals of this copy, like they did with
+#   'from CPC_checker_parms import *' -> 1x copy of the script per config, so 2 configs never share a global
+cluster_profile=globals().get('cluster_profile')
+try:
+    parms_config=load_config(*((cluster_profile.get('config'),cluster_profile['parms']) if cluster_profile else ()))
+except ValueError as my_error:
+    if __name__ != '__main__':
+        raise
+    print('\n ERROR: invalid config:\n'+''.join('   - '+x+'\n' for x in str(my_error).splitlines()))
+    sys.exit(1)
+globals().update(parms_config)
+
+CPC_PLATFORM_CHECKER_VERSION = "version 22.05"
+
+# live kubelet config per node (configz), fetched once per node:
+kubelet_configz_cache={}
+# ECCD: the node lists contain IPs -> keep the k8s node name of each IP
+node_name_by_IP={}
+
+# node probe: script streamed to the nodes + the schema version of the JSON document it returns
+NODE_PROBE_SCRIPT=os.path.join(os.path.dirname(os.path.abspath(__file__)),'cpc_node_probe.sh')
+NODE_PROBE_SCHEMA_VERSION=1
+# the node probe collects the ethtool features of these interfaces:
+NODE_PROBE_ETHTOOL_INTERFACES=['bond0']
+# node facts per node (node probe), collected once per node:
+node_facts_cache={}
+# OS image, kernel and container runtime per node (cluster snapshot):
+node_status_by_name={}
+# output of 'get nodes --show-labels' (1x kubectl call for all node labels):
+node_labels_lines=None
+# lazy discovery: node list per role, built on 1st use by a check (see get_node_list) -> role, description
+NODE_ROLES=[('workers','Worker nodes'),('NRD','NRD worker nodes'),('AMF','AMF worker nodes'),('CMG','CMG worker nodes'),
+            ('CMG_SRIOV','CMG worker nodes SRIOV'),('CMG_IPVLAN','CMG worker nodes IPVLAN')]
+node_lists={}
+node_list_filter={'onlynode':None,'nodes':None}
+node_lists_lock=threading.Lock()
+# platform facts (K8s version, Anthos version) of the report header: asked on 1st use (see get_platform_fact)
+platform_facts={}
+# circuit breaker: nodes which could not be reached via ssh (node -> reason) -> no more ssh to these nodes
+unreachable_nodes={}
+NODE_UNREACHABLE='ERROR: UNREACHABLE'
+# nodes which passed the ssh pre-flight -> not checked again by the next runs in the same run context
+preflight_passed_nodes=set()
+# nodes with an ssh connection kept open (ControlMaster) -> closed by close_run_context
+ssh_control_nodes=set()
+# the running check (1x per thread, checks run at the same time -> see run_check_list):
+#   report        : report lines of the check (put in the report in the order of the checks, not in the order they finish)
+#   skipped_nodes : nodes skipped by the check (node -> reason), eg: unreachable -> no ssh to the node, interface missing
+#   node_scope    : node-major mode -> the nodes the check may do (see nodes_in_scope), None: all nodes
+#   node_index    : node-major mode -> index of the node in the node list of the check (-1: not in it, None: no per-node check)
+#   name          : name of the check (facts seen by the check -> --export-facts)
+running_check=threading.local()
+# node-major mode: keep the ssh connection to a node open for the checks of that node (when ssh_control_persist is 0)
+NODE_MAJOR_CONTROL_PERSIST=60
+# --shell: interactive mode (see run_shell) -> the ssh connections to the nodes stay open between the commands (when ssh_control_persist is 0)
+interactive_shell=False
+SHELL_CONTROL_PERSIST=600
+SHELL_HELP='''Commands:
+  check <check|all> [nodes]   : run 1x check (or all checks), only on the given nodes if any
+  checks                      : the checks of this config
+  nodes                       : the nodes per role + the unreachable nodes
+  facts <node> [text]         : the facts of the node (node probe + cluster snapshot), only the ones containing text if given
+  refresh [nodes]             : forget what is known about the nodes (all nodes: cluster snapshot + node lists too)
+  help                        : this text
+  quit                        : leave the shell (or Ctrl-D)'''
+# --sample: groups of identical nodes of the last run -> nodes, nodes checked, checks done on the whole group (see run_sampled)
+sampling_coverage=[]
+# timing history: duration (seconds) of the checks + of the ssh work per node in this run
+#  -> kept in report_history/<REPORT_FILE_PREFIX>_timing.json (use_timing_history in CPC_checker_parms.py)
+timing_history=None
+check_durations={}
+node_durations={}
+timing_lock=threading.Lock()
+# --trace: Chrome trace-event file of the run (None: no spans are kept), see trace_span
+#  -> spans: run -> check -> node -> command (ssh/kubectl, with its queue wait), node probe, queued (waiting for a thread)
+#  -> trace_context: open spans of the thread (the parent of a new span), see trace_wrap for the threads of an executor
+trace_path=None
+trace_events=[]
+trace_lock=threading.Lock()
+trace_ids=itertools.count(1)
+trace_context=threading.local()
+# --export-facts: file the facts collected during the run are written to (None: the facts are not kept)
+#  -> per node: [(timestamp, {section: {fact: value}})] (same layout as flatten_node_facts)
+export_facts_path=None
+collected_facts={}
+collected_facts_lock=threading.Lock()
+# last run of the checks (see run_check_list) -> history database (history_db):
+#   reports   : report lines per check
+#   values    : value seen per check per node (do_the_check)
+#   durations : duration (seconds) of the checks + of the ssh work per node
+last_run={'reports':{},'values':{},'durations':{'checks':{},'nodes':{}}}
+# history database: tables + indexes (cluster, node, check, time)
+HISTORY_SCHEMA=[
+    'CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY, cluster TEXT, started TEXT, duration REAL, checks_ok INTEGER, '
+    'checks_failed INTEGER, checks_na INTEGER, checks_skipped INTEGER, unreachable_nodes INTEGER, report_file TEXT, argv TEXT)',
+    'CREATE TABLE IF NOT EXISTS check_results (run_id INTEGER, cluster TEXT, started TEXT, check_name TEXT, status TEXT, reason TEXT, duration REAL, report TEXT)',
+    'CREATE TABLE IF NOT EXISTS node_results (run_id INTEGER, cluster TEXT, started TEXT, node TEXT, check_name TEXT, status TEXT, value TEXT, detail TEXT)',
+    'CREATE TABLE IF NOT EXISTS node_durations (run_id INTEGER, cluster TEXT, started TEXT, node TEXT, duration REAL)',
+    'CREATE TABLE IF NOT EXISTS node_states (run_id INTEGER, cluster TEXT, started TEXT, node TEXT, state_key TEXT)',
+    'CREATE INDEX IF NOT EXISTS runs_cluster_started ON runs (cluster, started)',
+    'CREATE INDEX IF NOT EXISTS check_results_check ON check_results (cluster, check_name, started)',
+    'CREATE INDEX IF NOT EXISTS node_results_node ON node_results (cluster, node, check_name, started)',
+    'CREATE INDEX IF NOT EXISTS node_results_check ON node_results (check_name, started)',
+    'CREATE INDEX IF NOT EXISTS node_durations_node ON node_durations (cluster, node, started)',
+    'CREATE INDEX IF NOT EXISTS node_states_run ON node_states (run_id, node)']
+HISTORY_TABLES=['runs','check_results','node_results','node_durations','node_states']
+# columns added to the tables of an existing history database
+HISTORY_NEW_COLUMNS=[('check_results','report','TEXT')]
+# --diff-against: run of the history database the results are compared with (run_id, started, report_file)
+diff_baseline=None
+# results of an earlier run of the history database (carried_from) which are used in this run:
+#   carried_results : node -> {check: (status, value, line of the report)} -> the check does not do the node again (see nodes_in_scope)
+#                     (diff_skip_unchanged_nodes: nodes which did not change, --rerun-failed: nodes which passed the failing checks)
+#   carried_checks  : --rerun-failed: check -> (result, report lines) of the checks which passed -> not run again (see run_one_check)
+carried_from=None
+carried_results={}
+carried_checks={}
+# --history: number of nodes/checks shown by 'slowest'
+HISTORY_SLOWEST_SHOWN=20
+
+# check dependencies: check -> checks it needs (prerequisites)
+#  -> a prerequisite which is not OK: the check is SKIPPED (due to the prerequisite), nothing is done on the cluster
+#  -> prerequisites (cheap gating checks) run before the other checks, the report keeps the normal order
+#  -> node level: a node which can not be reached (ssh pre-flight/circuit breaker) is SKIPPED by every per-node check,
+#     a node without the interface (missing or not UP) is SKIPPED by the mtu/VF checks of that interface (see skip_node)
+CHECK_DEPENDENCIES={
+    'check_NRD_worker_nodes_sysctl':['check_NRD_labels'],
+}
+# node list dependencies: check -> node role it needs (see NODE_ROLES)
+#  -> no nodes of that role (labels, -o/-s/nodes_to_skip applied, see get_node_list): the check is SKIPPED, no extra check is reported
+CHECK_NODE_DEPENDENCIES={
+    'check_CMG_worker_nodes_sriov_interfaces':'CMG_SRIOV',
+    'check_CMG_worker_nodes_ipvlan_interfaces':'CMG_IPVLAN',
+    'check_CMG_worker_nodes_k8s_cluster_CSF_mtu_size':'CMG',
+}
+# transport errors (stderr of ssh/kubectl) -> retried according to transport_retry_* in the parms
+# !! only for failures to reach the node/API server: a command which ran and gave a wrong value is never retried
+TRANSPORT_ERRORS_SSH=[
+    ('auth',re.compile(r'Permission denied|Host key verification failed|Too many authentication failures',re.I)),
+    ('timeout',re.compile(r'timed out',re.I)),
+    ('connect',re.compile(r'Connection refused|No route to host|Network is unreachable|Could not resolve hostname|Connection closed by|Connection reset|kex_exchange_identification',re.I))]
+# admission control (kubectl_qps, ssh_max_sessions*) -> kubectl/oc and ssh commands wait here before they are started:
+admission_lock=threading.Lock()
+kubectl_bucket={'tokens':kubectl_burst,'last':time.monotonic()}
+ssh_sessions=threading.BoundedSemaphore(ssh_max_sessions) if ssh_max_sessions > 0 else None
+ssh_sessions_per_node={}
+# queue wait per target class -> shown in the summary (to tune throughput against the load on the cluster)
+admission_wait={'kubectl':{'calls':0,'waited':0,'total':0.0,'max':0.0},
+                'ssh':{'calls':0,'waited':0,'total':0.0,'max':0.0}}
+TRANSPORT_ERRORS_KUBECTL=[
+    ('throttled',re.compile(r'TooManyRequests|\b429\b|ServiceUnavailable|InternalError|\b50[0234]\b|server is currently unable to handle the request',re.I)),
+    ('auth',re.compile(r'Unauthorized|You must be logged in to the server',re.I)),
+    ('timeout',re.compile(r'i/o timeout|TLS handshake timeout|Client\.Timeout|deadline exceeded|timed out',re.I)),
+    ('connect',re.compile(r'connection refused|no route to host|connection reset by peer|unexpected EOF|Unable to connect to the server',re.I))]
+
+# precompiled parsers:
+RE_ENV_ASSIGNMENT=re.compile(r'^[A-Za-z_][A-Za-z0-9_]*=')
+RE_KUBECTL_IN_SHELL=re.compile(r'(^|[\s/`;|&(])(kubectl|oc)(\s|$)')
+RE_SHELL_VARIABLE=re.compile(r'\$(?:\{(\w+)\}|(\w+))')
+RE_IP_STATE=re.compile(r'\bstate (\S+)')
+RE_IP_MTU=re.compile(r'\bmtu (\d+)')
+RE_IP_VF=re.compile(r'^\s*vf \d+',re.M)
+RE_SELINUX_CONFIG=re.compile(r'^SELINUX=(.*)$',re.M)
+RE_SELINUX_STATUS=re.compile(r'^SELinux status:\s+(\S+)',re.M)
+RE_REPORT_STATUS=re.compile(r'^ *(.*?)\.* (OK|FAILED|N/A|SKIPPED)$')
+# status of a node in the history: the worst status of its report lines
+NODE_STATUS_RANK={'N/A':0,'OK':1,'SKIPPED':2,'FAILED':3}
+
+def add_to_report(text):
+
+    # report lines -> report of the running check (see run_check_list), else directly in the report
+    global CPC_checker_report
+    if getattr(running_check,'report',None) is not None:
+        running_check.report+=text
+    else:
+        CPC_checker_report+=text
 
 def CPC_report(indents,addToReport,status=True,info_value=''):
-    global CPC_checker_report
     
     if indents==level1:
-        CPC_checker_report+='-> '+addToReport+':\n'
+        add_to_report('-> '+addToReport+':\n')
     elif indents==level2:
         if status:
             if info_value != "":
-                CPC_checker_report+=indents*' '+addToReport.ljust(dotline_length,'.')+' '+info_value+'\n'
+                add_to_report(indents*' '+addToReport.ljust(dotline_length,'.')+' '+info_value+'\n')
             else:
-                CPC_checker_report+=indents*' '+addToReport.ljust(dotline_length,'.')+' OK'+'\n'
+                add_to_report(indents*' '+addToReport.ljust(dotline_length,'.')+' OK'+'\n')
         else:
-            CPC_checker_report+=indents*' '+addToReport.ljust(dotline_length,'.')+' FAILED'+'\n'
-    else: #level3
-        CPC_checker_report+=indents*' '+addToReport.ljust(dotline_length-level3+level2,'.')+' '+info_value+'\n'
+            add_to_report(indents*' '+addToReport.ljust(dotline_length,'.')+' FAILED'+'\n')
+    else: #level3, level4
+        add_to_report(indents*' '+addToReport.ljust(dotline_length-indents+level2,'.')+' '+info_value+'\n')
 
-def do_the_check(applicant,cmd,criteria_ok,msg_ok,msg_nok,min_value=-1,max_value=-1,list_to_match=[],text_printValue='',printValue=False,rightStrip=False):
+def do_the_check(applicant,cmd,criteria_ok,msg_ok,msg_nok,min_value=-1,max_value=-1,list_to_match=[],text_printValue='',printValue=False,rightStrip=False,fact=None,applies_to=None,parse=None,stop_when=None):
 
     # applicant:
     #   ['local'] -> only apply check on local host, else on list of nodes 
@@ -148,12 +688,25 @@ def do_the_check(applicant,cmd,criteria_ok,msg_ok,msg_nok,min_value=-1,max_value
     #   'above min value'                   -> info returned should NOT be lower than min value (equal is OK)
     #   'lower max value'                   -> info returned should NOT be bigger than max value (equal is OK)
     #   'matches value in list'             -> info returned should match one of the values of 'list_to_match'
+    # fact:
+    #   function which takes the value out of the node facts (node probe) instead of running 'cmd' on the node
+    #   -> only used when use_node_probe is set in CPC_checker_parms.py
+    # cmd:
+    #   argv list (no shell): on the nodes it is run via ssh, the output is filtered in python by 'parse'
+    #   can also be a function which takes the node status (OS image, kernel, runtime) and returns the cmd for that node
+    # parse:
+    #   function which filters the output of cmd, eg: grep_lines('multus') iso '|grep multus'
+    # stop_when:
+    #   function on 1x line of output of cmd -> True: stop reading (and stop cmd), eg: line_matches('^HugePages_Total:')
+    # applies_to:
+    #   function which takes the node status and returns whether the check applies to the node
+    #   -> if not: N/A for that node, without doing any ssh to it
 
     #print(' -> cmd: '+str(cmd)+'FFFFFFFFFFF')
     if applicant==['local']:
     # only run command locally:
         ### get value:
-        my_info=get_Popen_info(cmd,rightStrip)
+        my_info=get_Popen_info(cmd,rightStrip,parse,stop_when)
         if my_info == '': 
             CPC_report(level2,msg_nok,check_failed)
             return("NOK",msg_nok)
@@ -214,15 +767,36 @@ def do_the_check(applicant,cmd,criteria_ok,msg_ok,msg_nok,min_value=-1,max_value
     else: 
     # list of workers
         global_check_OK=True
+        applicant=nodes_in_scope(applicant)
+        # prune the nodes to which the check does not apply:
+        nodes_NA=[]
+        if applies_to is not None:
+            nodes_NA=[x for x in applicant if not applies_to(get_node_status(x))]
+        if nodes_NA and len(nodes_NA)==len(applicant):
+            for i in range(0, len(applicant)):
+                CPC_report(level2,"node: "+str(applicant[i])+' not applicable -> '+describe_node_status(applicant[i]),info_value='N/A')
+            return("N/A","not applicable to any of the nodes")
+        use_facts = use_node_probe and fact is not None
+        if use_facts:
+            prefetch_node_facts([x for x in applicant if x not in nodes_NA])
         for i in range(0, len(applicant)):
+            if applicant[i] in nodes_NA:
+                CPC_report(level2,"node: "+str(applicant[i])+' not applicable -> '+describe_node_status(applicant[i]),info_value='N/A')
+                continue
+            # circuit breaker open -> no ssh to this node:
+            if applicant[i] in unreachable_nodes:
+                skip_unreachable_node(level2,applicant[i])
+                continue
             #### get value:
-            if login_worker_nodes_with_SSHKEY:
-                my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(applicant[i])+' '+cmd,rightStrip)
+            if use_facts:
+                my_info=get_node_fact(applicant[i],fact)
+            elif callable(cmd):
+                my_info=get_node_info(applicant[i],cmd(get_node_status(applicant[i])),rightStrip,parse,stop_when)
             else:
-                if skip_username_worker_node_to_ssh:        
-                    my_info=get_Popen_info('ssh -q '+str(applicant[i])+' '+cmd,rightStrip)
-                else:
-                    my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(applicant[i])+' '+cmd,rightStrip)
+                my_info=get_node_info(applicant[i],cmd,rightStrip,parse,stop_when)
+            if my_info == NODE_UNREACHABLE:
+                skip_unreachable_node(level2,applicant[i])
+                continue
             #print(' -> my info:',str(my_info)+'FFFFFFF')
             #### check value on ERROR:
             if my_info=="" or my_info.startswith("ERROR"):
@@ -237,6 +811,7 @@ def do_the_check(applicant,cmd,criteria_ok,msg_ok,msg_nok,min_value=-1,max_value
                 if not create_report:
                     return("NOK","node: "+str(applicant[i])+' '+failure_reason)
             else:
+                record_check_value(applicant[i],my_info)
                 #### if value has been returned and that was enough to regard it as OK:
                 ###############################
                 #### 'info returned not empty':
@@ -306,10 +881,20 @@ def do_the_check(applicant,cmd,criteria_ok,msg_ok,msg_nok,min_value=-1,max_value
         else:
             return("NOK",msg_nok)    
 
+def parse_selinux(text):
+
+    # /etc/selinux/config             : SELINUX=permissive       -> permissive
+    # SuSe Linux (sudo sestatus -v)   : SELinux status: disabled -> disabled
+    my_match=RE_SELINUX_CONFIG.search(text) or RE_SELINUX_STATUS.search(text)
+    if my_match:
+        return(my_match.group(1))
+    return('')
+
 def check_test():
    
-    apply_to=list_AMF_workers
-    cmd_to_exec='"cat /etc/selinux/config|egrep \'^SELINUX=\'|cut -d\'=\' -f2"'
+    apply_to=get_node_list('AMF')
+    cmd_to_exec=['cat','/etc/selinux/config']
+    parse_output=parse_selinux
     criteria_ok='matches value in list'
     msg_ok='has SELINUX setting OK'
     to_printValue=' -> SELINUX = '
@@ -317,15 +902,44 @@ def check_test():
     msg_nok='does not have SELINUX=permissive or disabled' 
    
     # if HugePage_Total is above 0 (eg: 1), we can assume HugePages have been enabled
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True,parse=parse_output)
     return(check_my_test)                   
     
-def get_Popen_info(cmd,rightStrip=False):
+
+def get_Popen_info(cmd,rightStrip=False,parse=None,stop_when=None,result=None,node=None):
     
+    # cmd:
+    #   string -> run via the shell
+    #   list   -> argv: exec the command directly (no shell), leading VAR=value items are added to the environment
+    # parse:
+    #   function which filters the output in python (eg: grep_lines, first_group) -> not used on errors
+    # stop_when:
+    #   function on 1x line of output -> True: no more output needed, the command is stopped (see stream_Popen_lines)
+    #   -> with state (see stop_when_all_seen): a new one is made for each attempt, a retry starts from scratch
+    # result:
+    #   dictionary (optional) filled in with the returncode and stderr of the command (eg: 255 -> ssh error)
+    # node:
+    #   node reached by the command (ssh argv, see get_node_info) -> admission control per node
     #print(' -> cmd in Popen:'+str(cmd)+'FFFFFFFFFFFF')
     # run subprocess Popen:
-    my_get_info = Popen (cmd,shell=True, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out,err=my_get_info.communicate()
+    if result is None:
+        result={}
+    def run_once():
+        with admit_command(cmd,node):
+            if stop_when is not None:
+                my_stop_when=stop_when() if getattr(stop_when,'stateful',False) else stop_when
+                out=''.join(line+'\n' for line in stream_Popen_lines(cmd,my_stop_when,result))
+                # stopped by us -> the answer is there, whatever the return code
+                return(out,result['stderr'],0 if result['stopped'] else result['returncode'])
+            my_get_info = start_Popen(cmd)
+            out,err=my_get_info.communicate()
+        result.update({'returncode':my_get_info.returncode,'stderr':err.decode('utf-8'),'stopped':False})
+        return(out.decode('utf-8'),result['stderr'],my_get_info.returncode)
+    try:
+        out,err,returncode=retry_transport_errors(cmd,run_once,result)
+    except OSError as my_error:
+        result.update({'returncode':127,'stderr':str(my_error),'stopped':False})
+        return('ERROR: '+str(my_error))
     # need to check the return code of the command
     # https://tldp.org/LDP/abs/html/exitcodes.html
     # 0 = OK
@@ -333,35 +947,1149 @@ def get_Popen_info(cmd,rightStrip=False):
     #     if empty -> still a good reply
     #print(' -> out:'+str(out)+'FFFFFFF')
     #print(' -> err:'+str(err)+'FFFFFFF')
-    if my_get_info.returncode != 0 and my_get_info.returncode != 1:
+    if returncode != 0 and returncode != 1:
+        # argv: no pipe hides the error of the command itself -> give its error (255 = ssh error)
+        if isinstance(cmd,list) and returncode != 255 and err.rstrip() != '':
+            return('ERROR: '+err.rstrip()+describe_retries(result))
         return('ERROR')
     # an empty reply is ok
-    if my_get_info.returncode == 1:
-        if out.decode('utf-8').rstrip() != '':
+    if returncode == 1:
+        if out.rstrip() != '':
             return('ERROR - no info returned by command: '+str(cmd))
-        if err.decode('utf-8').rstrip() != '':
-            return('ERROR: '+err.decode('utf-8').rstrip())
+        if err.rstrip() != '':
+            return('ERROR: '+err.rstrip()+describe_retries(result))
 
     if rightStrip:
-        return(out.decode('utf-8').rstrip())
+        my_info=out.rstrip()
     else:
-        return(out.decode('utf-8'))
-    
+        my_info=out
+    if parse is not None:
+        return(parse(my_info))
+    return(my_info)
+
+def wait_for_kubectl_token():
+
+    # token bucket: kubectl_qps tokens per second, max kubectl_burst tokens
+    #  -> the token is taken right away (can go negative), the caller sleeps until it is really there
+    if kubectl_qps <= 0:
+        return(0.0)
+    with admission_lock:
+        now=time.monotonic()
+        kubectl_bucket['tokens']=min(kubectl_burst,kubectl_bucket['tokens']+(now-kubectl_bucket['last'])*kubectl_qps)
+        kubectl_bucket['last']=now
+        kubectl_bucket['tokens']-=1
+        my_wait=max(0.0,-kubectl_bucket['tokens']/kubectl_qps)
+    if my_wait > 0:
+        time.sleep(my_wait)
+    return(my_wait)
+
+def get_node_sessions(node):
+
+    # semaphore limiting the ssh sessions to 1x node (None = no limit)
+    if ssh_max_sessions_per_node <= 0:
+        return(None)
+    with admission_lock:
+        if node not in ssh_sessions_per_node:
+            ssh_sessions_per_node[node]=threading.BoundedSemaphore(ssh_max_sessions_per_node)
+        return(ssh_sessions_per_node[node])
+
+def add_admission_wait(target_class,my_wait):
+
+    my_stats=admission_wait[target_class]
+    with admission_lock:
+        my_stats['calls']+=1
+        if my_wait > 0.001:
+            my_stats['waited']+=1
+        my_stats['total']+=my_wait
+        my_stats['max']=max(my_stats['max'],my_wait)
+
+@contextmanager
+def admit_command(cmd,node=None):
+
+    # admission control: wait until the command may be started
+    #   node given (ssh to the node) -> ssh_max_sessions (jump host) + ssh_max_sessions_per_node for the node
+    #   kubectl/oc calls             -> API server: kubectl_qps
+    #   other local commands         -> started right away
+    # --trace: 1x span per command, the queue wait is a span in it
+    my_span=start_trace_span(get_trace_name(cmd,node),'command',cmd=(remote_cmd(cmd) if isinstance(cmd,list) else cmd)[:300])
+    if node is not None:
+        my_semaphores=[x for x in (ssh_sessions,get_node_sessions(node)) if x is not None]
+        my_start=time.monotonic()
+        for my_semaphore in my_semaphores:
+            my_semaphore.acquire()
+        my_wait=time.monotonic()-my_start
+        add_admission_wait('ssh',my_wait)
+        add_queue_wait_span('ssh sessions',my_span,my_start,my_wait)
+        my_start=time.monotonic()
+        try:
+            yield
+        finally:
+            for my_semaphore in reversed(my_semaphores):
+                my_semaphore.release()
+            add_node_duration(node,time.monotonic()-my_start)
+            end_trace_span(my_span,queue_wait=round(my_wait,6))
+    elif is_kubectl_command(cmd):
+        my_start=time.monotonic()
+        my_wait=wait_for_kubectl_token()
+        add_admission_wait('kubectl',my_wait)
+        add_queue_wait_span('kubectl_qps',my_span,my_start,my_wait)
+        try:
+            yield
+        finally:
+            end_trace_span(my_span,queue_wait=round(my_wait,6))
+    else:
+        try:
+            yield
+        finally:
+            end_trace_span(my_span)
+
+def get_program_name(cmd):
+
+    # program started by the command (argv or shell command): 1st word after sudo and VAR=value, without its path
+    #  -> 'sudo KUBECONFIG=$KUBECONFIG kubectl get nodes' -> 'kubectl'
+    if isinstance(cmd,list):
+        my_argv=cmd
+    else:
+        try:
+            my_argv=shlex.split(cmd)
+        except ValueError:
+            my_argv=cmd.split()
+    my_words=[x for x in my_argv if not x.startswith('-') and x != 'sudo' and not RE_ENV_ASSIGNMENT.match(x)]
+    return(os.path.basename(my_words[0]) if my_words else '')
+
+def is_kubectl_command(cmd):
+
+    # call to the API server? argv: kubectl/oc is the program, shell command: kubectl/oc anywhere in it (pipes, `...`)
+    if isinstance(cmd,list):
+        return(get_program_name(cmd) in ('kubectl','oc'))
+    return(RE_KUBECTL_IN_SHELL.search(cmd) is not None)
+
+def get_trace_name(cmd,node=None):
+
+    # --trace: short name of a command -> 'ssh <node>', 'kubectl get nodes', ... (shell command: its start)
+    if node is not None:
+        return('ssh '+str(node))
+    if not isinstance(cmd,list):
+        return(cmd[:40])
+    my_argv=split_env_assignments(cmd)[0]
+    my_words=[x for x in my_argv if not x.startswith('-') and x != 'sudo' and not RE_ENV_ASSIGNMENT.match(x)]
+    return(' '.join([os.path.basename(x) for x in my_words[:1]]+my_words[1:3]))
+
+def get_trace_stack():
+
+    # --trace: open spans of this thread (the last one is the parent of a new span)
+    if getattr(trace_context,'stack',None) is None:
+        trace_context.stack=[]
+    return(trace_context.stack)
+
+def add_trace_event(name,cat,start,end,args):
+
+    my_thread=threading.current_thread()
+    with trace_lock:
+        trace_events.append({'name':name,'cat':cat,'start':start,'end':end,'thread':(my_thread.ident,my_thread.name),'args':args})
+
+def start_trace_span(name,cat,**args):
+
+    # --trace: open a span in this thread (None: no trace) -> end_trace_span
+    #  args: shown with the span in the trace viewer, + span_id and parent_id (the span it is part of)
+    if trace_path is None:
+        return(None)
+    my_stack=get_trace_stack()
+    my_span={'name':name,'cat':cat,'start':time.monotonic(),'args':dict(args,span_id=next(trace_ids))}
+    if my_stack:
+        my_span['args']['parent_id']=my_stack[-1]['args']['span_id']
+    my_stack.append(my_span)
+    return(my_span)
+
+def end_trace_span(my_span,**args):
+
+    if my_span is None:
+        return
+    my_stack=get_trace_stack()
+    if my_stack and my_stack[-1] is my_span:
+        my_stack.pop()
+    my_span['args'].update(args)
+    add_trace_event(my_span['name'],my_span['cat'],my_span['start'],time.monotonic(),my_span['args'])
+
+@contextmanager
+def trace_span(name,cat,**args):
+
+    my_span=start_trace_span(name,cat,**args)
+    try:
+        yield my_span
+    finally:
+        end_trace_span(my_span)
+
+def add_queue_wait_span(name,my_span,start,wait):
+
+    # --trace: queue wait of the admission control -> span in the span of the command (only when it really waited)
+    if my_span is not None and wait > 0.001:
+        add_trace_event('queue wait: '+name,'queue',start,start+wait,{'parent_id':my_span['args']['span_id']})
+
+def trace_wrap(func,name=None):
+
+    # --trace: func is run in the thread of an executor -> its spans are part of the open span of this thread,
+    # + 1x 'queued' span per call: from now (submitted) until a thread of the executor starts it
+    if trace_path is None:
+        return(func)
+    my_parent=get_trace_stack()[-1:]
+    my_name=name or func.__name__
+    my_submitted=time.monotonic()
+    def run_traced(*args):
+        trace_context.stack=list(my_parent)
+        my_args={'arg':str(args[0])} if args else {}
+        if my_parent:
+            my_args['parent_id']=my_parent[0]['args']['span_id']
+        add_trace_event('queued: '+my_name,'queue',my_submitted,time.monotonic(),my_args)
+        try:
+            return(func(*args))
+        finally:
+            trace_context.stack=None
+    return(run_traced)
+
+def write_trace(path,traces):
+
+    # Chrome trace-event JSON (chrome://tracing, https://ui.perfetto.dev) -> traces: [(cluster, spans)]
+    #  -> 1x process per cluster, 1x track per thread, time 0 = start of the first span
+    my_start=min((x['start'] for my_name,my_spans in traces for x in my_spans),default=0)
+    my_events=[]
+    for my_pid,(my_name,my_spans) in enumerate(traces,1):
+        my_events.append({'name':'process_name','ph':'M','pid':my_pid,'tid':0,'args':{'name':my_name}})
+        my_threads={}
+        for x in sorted(my_spans,key=lambda x: x['start']):
+            my_tid=my_threads.setdefault(x['thread'],len(my_threads)+1)
+            my_events.append({'name':x['name'],'cat':x['cat'],'ph':'X','pid':my_pid,'tid':my_tid,
+                              'ts':round((x['start']-my_start)*1e6,3),'dur':round((x['end']-x['start'])*1e6,3),'args':x['args']})
+        for (my_ident,my_thread),my_tid in my_threads.items():
+            my_events.append({'name':'thread_name','ph':'M','pid':my_pid,'tid':my_tid,'args':{'name':my_thread}})
+    with open(path,'w') as f:
+        json.dump({'traceEvents':my_events,'displayTimeUnit':'ms'},f)
+
+def export_trace(traces):
+
+    # --trace: write the spans + 1x line of output
+    try:
+        write_trace(trace_path,traces)
+    except OSError as my_error:
+        print('\n ERROR: could not write the trace to '+trace_path+': '+str(my_error)+'\n')
+        return
+    print('Trace written: '+str(sum(len(y) for x,y in traces))+' spans -> '+trace_path+' (chrome://tracing, https://ui.perfetto.dev)\n')
+
+def add_node_duration(node,duration):
+
+    # timing history: time spent in ssh sessions to the node
+    with timing_lock:
+        node_durations[node]=node_durations.get(node,0)+duration
+
+def get_timing_history():
+
+    # durations of the previous runs (smoothed) -> {'checks':{check: seconds},'nodes':{node: seconds}}
+    global timing_history
+    if timing_history is None:
+        timing_history={'checks':{},'nodes':{}}
+        if use_timing_history:
+            try:
+                with open(os.path.join('report_history',REPORT_FILE_PREFIX+'_timing.json')) as f:
+                    my_history=json.load(f)
+                timing_history={'checks':dict(my_history['checks']),'nodes':dict(my_history['nodes'])}
+            except (OSError,ValueError,KeyError,TypeError):
+                pass
+    return(timing_history)
+
+def save_timing_history():
+
+    # add the durations of this run to the timing history: (previous + this run) / 2 -> 1x slow run does not turn the order upside down
+    my_history=get_timing_history()
+    with timing_lock:
+        for my_kind,my_durations in (('checks',check_durations),('nodes',node_durations)):
+            for name,duration in my_durations.items():
+                my_previous=my_history[my_kind].get(name)
+                my_history[my_kind][name]=round(duration if my_previous is None else (my_previous+duration)/2,3)
+            last_run['durations'][my_kind]=dict(my_durations)
+            my_durations.clear()
+    if not use_timing_history:
+        return
+    try:
+        os.makedirs('report_history',exist_ok=True)
+        with open(os.path.join('report_history',REPORT_FILE_PREFIX+'_timing.json'),'w') as f:
+            json.dump(my_history,f,indent=1,sort_keys=True)
+    except OSError as my_error:
+        print('WARNING: could not save the timing history: '+str(my_error))
+
+def order_nodes(nodes):
+
+    # longest expected ssh work first (timing history), the other nodes in the given order
+    my_history=get_timing_history()['nodes']
+    return(sorted(dict.fromkeys(nodes),key=lambda node: -my_history.get(node,0)))
+
+def format_duration(seconds):
+
+    return('%dm%02ds' % divmod(int(round(seconds)),60))
+
+def describe_admission_wait():
+
+    # queue wait of the admission control -> summary
+    my_text='\nQueue wait (admission control):\n'
+    for target_class in sorted(admission_wait):
+        my_stats=admission_wait[target_class]
+        my_text+=(' - '+target_class.ljust(7)+' : '+str(my_stats['calls'])+' calls, '+str(my_stats['waited'])+' waited, '
+                  +'total {:.1f}s, max {:.1f}s'.format(my_stats['total'],my_stats['max'])+'\n')
+    return(my_text)
+
+def classify_transport_error(cmd,returncode,err):
+
+    # failure to reach the node (ssh) or the API server (kubectl) -> connect, auth, timeout or throttled
+    # None: no transport error (ok, or the command itself failed -> never retried)
+    if returncode == 0:
+        return(None)
+    if isinstance(cmd,list) and cmd[:1] == ['ssh']:
+        # ssh: 255 = ssh error, anything else is the return code of the remote command
+        if returncode != 255:
+            return(None)
+        # no message (eg: LogLevel=QUIET in the ssh config) -> the node could not be reached
+        if err.strip() == '':
+            return('connect')
+        my_errors=TRANSPORT_ERRORS_SSH
+    elif err.strip() == '':
+        return(None)
+    else:
+        my_errors=TRANSPORT_ERRORS_KUBECTL
+    for error_class,my_regex in my_errors:
+        if my_regex.search(err):
+            return(error_class)
+    return(None)
+
+def self_check_transport_retries():
+
+    # --self-check: are the transport errors classified and retried as configured?
+    #  1) ssh error messages (and an ssh error without message) -> error class
+    #  2) ssh to a refused port (127.0.0.1 port 1) -> retried when connect is in transport_retry_on
+    my_checks=[]
+    for err,error_class in (('ssh: connect to host node1 port 22: Connection refused','connect'),
+                            ('ssh: connect to host node1 port 22: No route to host','connect'),
+                            ('ssh: Could not resolve hostname node1: Name or service not known','connect'),
+                            ('Connection closed by 10.0.0.1 port 22','connect'),
+                            ('ssh: connect to host node1 port 22: Connection timed out','timeout'),
+                            ('cloud-user@node1: Permission denied (publickey).','auth'),
+                            ('','connect')):
+        my_class=classify_transport_error(['ssh','node1','true'],255,err)
+        my_checks.append(('ssh rc 255 "'+err+'" -> '+str(my_class),my_class == error_class))
+    my_checks.append(('ssh rc 1 (remote command failed) -> not retried',classify_transport_error(['ssh','node1','false'],1,'') is None))
+    my_result={}
+    my_start=time.monotonic()
+    get_Popen_info(['ssh','-o','LogLevel=ERROR','-o','ConnectTimeout='+str(ssh_connect_timeout),'-o','BatchMode=yes','-p','1','127.0.0.1','true'],result=my_result,node='127.0.0.1')
+    my_attempts=transport_retry_max_attempts if 'connect' in transport_retry_on else 1
+    my_checks.append(('ssh to refused port 127.0.0.1:1 -> '+str(my_result.get('transport_error'))+' error, '+str(my_result.get('attempts'))+' attempts in '+str(round(time.monotonic()-my_start,1))+'s',
+                      my_result.get('transport_error') == 'connect' and my_result.get('attempts') == my_attempts))
+    print('\nSelf-check transport errors + retries (transport_retry_on: '+', '.join(transport_retry_on)+', max '+str(transport_retry_max_attempts)+' attempts):')
+    for my_text,my_ok in my_checks:
+        print(' - '+my_text.ljust(100,'.')+' '+('OK' if my_ok else 'FAILED'))
+    print('')
+    return(all(my_ok for my_text,my_ok in my_checks))
+
+def get_retry_delay(attempt):
+
+    # exponential backoff with jitter: base * 2^(attempt-1), max transport_retry_max_delay,
+    # and a random part (50%..100%) so parallel commands do not all retry at the same moment
+    my_delay=min(transport_retry_max_delay,transport_retry_base_delay*(2**(attempt-1)))
+    return(random.uniform(my_delay/2,my_delay))
+
+def retry_transport_errors(cmd,run_once,result):
+
+    # run_once() -> (out,err,returncode), repeated as long as it fails with a transport error in transport_retry_on
+    # result: transport_error (None if ok) and attempts are filled in
+    attempt=1
+    while True:
+        out,err,returncode=run_once()
+        transport_error=classify_transport_error(cmd,returncode,err)
+        if transport_error is None or transport_error not in transport_retry_on or attempt >= transport_retry_max_attempts:
+            break
+        time.sleep(get_retry_delay(attempt))
+        attempt+=1
+    result.update({'transport_error':transport_error,'attempts':attempt})
+    return(out,err,returncode)
+
+def describe_retries(result):
+
+    # extra text for the report when a transport error was retried
+    if result.get('transport_error') and result.get('attempts',1) > 1:
+        return(' ('+result['transport_error']+' error, '+str(result['attempts'])+' attempts)')
+    return('')
+
+def start_Popen(cmd,stdin=None,stderr=subprocess.PIPE):
+
+    # string -> via the shell, argv list -> exec'd directly (leading VAR=value items -> environment)
+    if isinstance(cmd,list):
+        my_argv,my_env=split_env_assignments(cmd)
+        return(Popen (my_argv,shell=False, env=my_env, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr))
+    return(Popen (cmd,shell=True, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr))
+
+def stream_Popen_lines(cmd,stop_when=None,result=None):
+
+    # run the command and yield its output line by line (decoded, without newline) as soon as it arrives
+    # stop_when:
+    #   function on 1x line -> True: that line is the last one needed, the command is stopped (early exit)
+    #   -> the command is also stopped when the caller stops reading (break)
+    # result:
+    #   dictionary (optional) filled in at the end: returncode, stderr and stopped (True if stopped by us)
+    if result is None:
+        result={}
+    result.update({'returncode':None,'stderr':'','stopped':False})
+    # stderr to a temporary file: a full stderr pipe can not block the command while we read stdout
+    my_stderr=tempfile.TemporaryFile()
+    try:
+        my_process=start_Popen(cmd,stderr=my_stderr)
+    except OSError as my_error:
+        my_stderr.close()
+        result['returncode']=127
+        result['stderr']=str(my_error)
+        return
+    end_of_output=False
+    try:
+        for line in my_process.stdout:
+            line=line.decode('utf-8',errors='replace').rstrip('\r\n')
+            yield line
+            if stop_when is not None and stop_when(line):
+                break
+        else:
+            end_of_output=True
+    finally:
+        # stop the command if we did not read all of its output:
+        if not end_of_output and my_process.poll() is None:
+            my_process.terminate()
+            result['stopped']=True
+        my_process.stdout.close()
+        result['returncode']=my_process.wait()
+        my_stderr.seek(0)
+        result['stderr']=my_stderr.read().decode('utf-8',errors='replace')
+        my_stderr.close()
+
+def line_matches(pattern,flags=0):
+
+    # stop_when: line matching the regex
+    my_regex=re.compile(pattern,flags)
+    return(lambda line: my_regex.search(line) is not None)
+
+def stop_when_all_seen(keys,key_of_line):
+
+    # stop_when with state: all keys seen (key_of_line: key of 1x line of output)
+    #  -> factory, get_Popen_info makes a new stop_when for each attempt (a retry must see all keys again)
+    def new_stop_when():
+        keys_to_see=set(keys)
+        def stop_when(line):
+            keys_to_see.discard(key_of_line(line))
+            return(not keys_to_see)
+        return(stop_when)
+    new_stop_when.stateful=True
+    return(new_stop_when)
+
+def split_env_assignments(argv):
+
+    # 'KUBECONFIG=/x/y kubectl get nodes' -> argv without the leading VAR=value items + environment with them
+    my_env=None
+    while argv and RE_ENV_ASSIGNMENT.match(argv[0]):
+        if my_env is None:
+            my_env=dict(os.environ)
+        my_var,my_value=argv[0].split('=',1)
+        my_env[my_var]=my_value
+        argv=argv[1:]
+    return(argv,my_env)
+
+def kubectl_argv(*args):
+
+    # cmd_start_kubectl (eg: 'sudo KUBECONFIG=$KUBECONFIG kubectl ') as argv list + the kubectl arguments
+    #  -> $VARIABLES are expanded like the shell does (unknown variable -> empty)
+    my_start=RE_SHELL_VARIABLE.sub(lambda m: os.environ.get(m.group(1) or m.group(2),''),cmd_start_kubectl)
+    return(shlex.split(my_start)+list(args))
+
+def remote_cmd(cmd):
+
+    # command to run on a node via ssh: argv list -> 1x string, each item quoted for the remote shell
+    if isinstance(cmd,list):
+        return(' '.join(shlex.quote(x) for x in cmd))
+    return(cmd)
+
+def grep_lines(pattern,flags=0):
+
+    # parser: all lines matching the regex (like grep)
+    my_regex=re.compile(pattern,flags)
+    return(lambda text: '\n'.join(x for x in text.splitlines() if my_regex.search(x)))
+
+def first_group(pattern,flags=re.M):
+
+    # parser: 1st group of the 1st match of the regex (like grep + awk/cut) -> '' if no match
+    my_regex=re.compile(pattern,flags)
+    def parse(text):
+        my_match=my_regex.search(text)
+        if my_match:
+            return(my_match.group(1))
+        return('')
+    return(parse)
+
+def field_of_lines(pattern,field):
+
+    # parser: field 'field' (0 = 1st) of all lines matching the regex (like grep + awk '{print $n}')
+    my_regex=re.compile(pattern)
+    return(lambda text: '\n'.join(x.split()[field] for x in text.splitlines() if my_regex.search(x) and len(x.split())>field))
+
+def get_Popen_first_match(cmd,match_text=''):
+
+    # read the output of the command line by line and stop as soon as a line contains 'match_text' (case insensitive)
+    #  -> combined with kubectl --chunk-size, the remaining pages are never requested from the API server
+    #  -> returns the matched line, '' if nothing matched, or 'ERROR: ...' when the command failed (eg: token expired, RBAC)
+    #  -> run via get_Popen_info: admission control (kubectl_qps), retries and --trace like all other commands
+    my_match=lambda line: line.strip() != '' and match_text.lower() in line.lower()
+    my_first_match=lambda text: next((x.rstrip() for x in text.splitlines() if my_match(x)),'')
+    return(get_Popen_info(cmd,parse=my_first_match,stop_when=my_match))
+
+def get_kubelet_configz(node):
+
+    # fetch the live kubelet config of a node via the API server (no ssh needed):
+    #   kubectl get --raw /api/v1/nodes/<node>/proxy/configz
+    # -> returns the kubeletconfig dictionary, or the error (string) when it could not be read
+    if node in kubelet_configz_cache:
+        return(kubelet_configz_cache[node])
+    node_name=node_name_by_IP.get(node,node)
+    my_info=get_Popen_info(kubectl_argv('get','--raw','/api/v1/nodes/'+node_name+'/proxy/configz'),True)
+    if my_info=="":
+        kubeletconfig="ERROR: no kubelet config returned by the API server"
+    elif my_info.startswith("ERROR"):
+        kubeletconfig=my_info
+    else:
+        try:
+            kubeletconfig=json.loads(my_info)['kubeletconfig']
+            record_node_facts(node,{'kubeletconfig/':{x:y if isinstance(y,str) else json.dumps(y,sort_keys=True) for x,y in kubeletconfig.items()}})
+        except (ValueError,KeyError,TypeError,AttributeError):
+            kubeletconfig="ERROR: could not parse the kubelet config returned by the API server"
+    kubelet_configz_cache[node]=kubeletconfig
+    return(kubeletconfig)
+
+def fetch_kubelet_configz(nodes):
+
+    # fetch the kubelet config of all given nodes at the same time (only the ones not cached yet)
+    to_fetch=[x for x in dict.fromkeys(nodes) if x not in kubelet_configz_cache]
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=kubelet_configz_max_parallel) as executor:
+            list(executor.map(trace_wrap(get_kubelet_configz),to_fetch))
+
+def do_the_configz_check(applicant,configz_key,list_to_match,msg_ok,msg_nok):
+
+    # same as do_the_check with criteria 'matches value in list',
+    # but the value is taken from the live kubelet config (configz) of each node
+    global_check_OK=True
+    to_printValue=' -> '+configz_key+' = '
+    applicant=nodes_in_scope(applicant)
+    fetch_kubelet_configz(applicant)
+    for i in range(0, len(applicant)):
+        kubeletconfig=get_kubelet_configz(applicant[i])
+        if isinstance(kubeletconfig,str):
+            global_check_OK=False
+            failure_reason=' '+kubeletconfig
+            CPC_report(level2,"node: "+str(applicant[i])+failure_reason,check_failed)
+            if not create_report:
+                return("NOK","node: "+str(applicant[i])+failure_reason)
+            continue
+        my_info=str(kubeletconfig.get(configz_key,'<not set>'))
+        if my_info not in list_to_match:
+            global_check_OK=False
+            CPC_report(level2,"node: "+str(applicant[i])+' '+msg_nok+to_printValue+my_info,check_failed)
+            if not create_report:
+                return("NOK","node: "+str(applicant[i])+' '+msg_nok)
+        else:
+            CPC_report(level2,"node: "+str(applicant[i])+' '+msg_ok+to_printValue+my_info)
+    if global_check_OK:
+        return('OK')
+    else:
+        return("NOK",msg_nok)
+
+def fetch_node_status():
+
+    # cluster snapshot: OS image, kernel and container runtime of all nodes with 1x kubectl call
+    #  -> used to decide per node which checks apply, before doing any ssh to the nodes
+    #  -> kubelet version, labels and capacity: groups of identical nodes (--sample)
+    my_info=get_Popen_info(kubectl_argv('get','nodes','--chunk-size='+str(kubectl_chunk_size),'-o','json'),True)
+    try:
+        my_nodes=json.loads(my_info)['items']
+    except (ValueError,KeyError):
+        return
+    for my_node in my_nodes:
+        node_info=my_node.get('status',{}).get('nodeInfo',{})
+        # eg: containerd://1.4.12 -> containerd
+        node_status_by_name[my_node['metadata']['name']]={
+            'os_image':node_info.get('osImage',''),
+            'kernel':node_info.get('kernelVersion',''),
+            'runtime':node_info.get('containerRuntimeVersion','').split(':')[0],
+            'runtime_version':node_info.get('containerRuntimeVersion',''),
+            'kubelet':node_info.get('kubeletVersion',''),
+            'boot_id':node_info.get('bootID',''),
+            'labels':my_node['metadata'].get('labels',{}),
+            'capacity':my_node.get('status',{}).get('capacity',{}),
+            'internal_ip':next((x.get('address','') for x in my_node.get('status',{}).get('addresses',[]) if x.get('type')=='InternalIP'),'')}
+        my_status=node_status_by_name[my_node['metadata']['name']]
+        record_node_facts(my_node['metadata']['name'],{'node/':{x:my_status[x] for x in ('os_image','kernel','runtime_version','kubelet','internal_ip')},
+                                                       'labels/':my_status['labels'],'capacity/':my_status['capacity']})
+
+def get_node_status(node):
+
+    # node status out of the cluster snapshot (ECCD: node lists contain IPs)
+    # -> unknown node: empty values (checks will apply to it)
+    return(node_status_by_name.get(node_name_by_IP.get(node,node),{'os_image':'','kernel':'','runtime':'','runtime_version':'','kubelet':'',
+                                                                    'boot_id':'','labels':{},'capacity':{},'internal_ip':''}))
+
+def get_nodes_with_label(label):
+
+    # all nodes having 'label' in their labels (same as: get node --show-labels|grep -e label|awk '{print $1}')
+    #  -> 1x kubectl call for all labels, the filtering is done here
+    global node_labels_lines
+    if node_labels_lines is None:
+        my_info=get_Popen_info(kubectl_argv('get','nodes','--show-labels','--no-headers'),True)
+        if my_info.startswith("ERROR"):
+            node_labels_lines=[]
+        else:
+            node_labels_lines=my_info.splitlines()
+    return([x.split()[0] for x in node_labels_lines if label in x])
+
+def get_node_internal_IP(node):
+
+    # ECCD: InternalIP of the node out of the cluster snapshot (kubectl describe node only if the node is not in it)
+    my_node_IP=get_node_status(node)['internal_ip']
+    if my_node_IP == '':
+        my_node_IP=get_Popen_info(kubectl_argv('describe','node',node),parse=field_of_lines('InternalIP',1))
+    return(my_node_IP)
+
+def parse_allocatable_sriov(text):
+
+    # kubectl describe node: sriov lines between 'Allocatable' and 'System Info:'
+    my_section=text.partition('Allocatable')[2].partition('System Info:')[0]
+    return('\n'.join(x for x in my_section.splitlines() if 'sriov' in x))
+
+def get_node_fingerprint(node):
+
+    # nodes with the same fingerprint are taken as identical (--sample): kernel, OS image, kubelet + container runtime version,
+    # labels (without sample_ignore_labels) and capacity out of the cluster snapshot
+    my_status=get_node_status(node)
+    my_labels={x:y for x,y in my_status['labels'].items() if x not in sample_ignore_labels}
+    return(json.dumps([my_status['kernel'],my_status['os_image'],my_status['kubelet'],my_status['runtime_version'],my_labels,my_status['capacity']],sort_keys=True))
+
+def describe_node_status(node):
+
+    my_status=get_node_status(node)
+    return('runtime: '+my_status['runtime']+', OS: '+my_status['os_image'])
+
+def runtime_is(runtime):
+
+    # applies_to: only nodes using this container runtime
+    return(lambda status: status['runtime'] in ['',runtime])
+
+def os_image_matches(list_OS):
+
+    # applies_to: only nodes with an OS image containing one of the values of list_OS
+    return(lambda status: status['os_image']=='' or any(x in status['os_image'] for x in list_OS))
+
+def os_is_suse(status):
+
+    # eg: SUSE Linux Enterprise Server 15 SP1
+    return('suse linux' in status['os_image'].lower())
+
+def get_ssh_argv(node):
+
+    # ssh command (argv) to reach a node
+    #  -> LogLevel=ERROR iso -q: no banners/warnings, but the ssh errors are kept (to classify them, see classify_transport_error)
+    my_ssh=['ssh','-o','LogLevel=ERROR','-o','ConnectTimeout='+str(ssh_connect_timeout)]
+    # reuse the ssh connection to the node (1x connection for all checks, and for the next runs)
+    my_control_persist=ssh_control_persist
+    if my_control_persist <= 0 and execution_mode == 'node':
+        my_control_persist=NODE_MAJOR_CONTROL_PERSIST
+    elif my_control_persist <= 0 and interactive_shell:
+        my_control_persist=SHELL_CONTROL_PERSIST
+    if my_control_persist > 0:
+        ssh_control_nodes.add(node)
+        my_ssh+=['-o','ControlMaster=auto','-o','ControlPath='+os.path.join(tempfile.gettempdir(),'cpc_ssh_%C'),
+                 '-o','ControlPersist='+str(my_control_persist)]
+    if login_worker_nodes_with_SSHKEY:
+        return(my_ssh+['-i',sshkey,worker_node_username+'@'+str(node)])
+    elif skip_username_worker_node_to_ssh:
+        return(my_ssh+[str(node)])
+    else:
+        return(my_ssh+[worker_node_username+'@'+str(node)])
+
+def mark_node_unreachable(node,reason):
+
+    # open the circuit breaker of the node: all remaining checks skip it (UNREACHABLE)
+    #  -> reason: ssh error message + retries (see describe_retries)
+    if reason == '' or reason.startswith(' ('):
+        reason='ssh connection failed (return code 255)'+reason
+    unreachable_nodes.setdefault(node,reason)
+
+def get_node_info(node,cmd,rightStrip=False,parse=None,stop_when=None):
+
+    # run cmd (argv list or string) on the node via ssh
+    #  -> unreachable node (circuit breaker open): nothing is done, NODE_UNREACHABLE is returned
+    #  -> ssh error (return code 255): the circuit breaker of the node is opened
+    if node in unreachable_nodes:
+        return(NODE_UNREACHABLE)
+    my_result={}
+    with trace_span('node: '+str(node),'node',node=node,**({'check':running_check.name} if getattr(running_check,'name',None) else {})):
+        my_info=get_Popen_info(get_ssh_argv(node)+[remote_cmd(cmd)],rightStrip,parse,stop_when,my_result,node)
+    if my_result.get('returncode') == 255 and not my_result.get('stopped'):
+        mark_node_unreachable(node,my_result.get('stderr','').strip()+describe_retries(my_result))
+        return(NODE_UNREACHABLE)
+    return(my_info)
+
+def preflight_nodes(nodes):
+
+    # ssh pre-flight: check the ssh connection to all nodes in parallel (ConnectTimeout: ssh_connect_timeout)
+    #  -> nodes which can not be reached are UNREACHABLE for all checks, without waiting for the timeout in each check
+    to_check=[x for x in order_nodes(nodes) if x not in unreachable_nodes and x not in preflight_passed_nodes]
+    if to_check:
+        with ThreadPoolExecutor(max_workers=ssh_preflight_max_parallel) as executor:
+            list(executor.map(trace_wrap(lambda node: get_node_info(node,['true']),'ssh pre-flight'),to_check))
+        preflight_passed_nodes.update(x for x in to_check if x not in unreachable_nodes)
+
+def nodes_in_scope(applicant):
+
+    # node-major mode (see run_node_major): the check only does the node of the thread it runs in
+    # results of an earlier run: the check does not do these nodes again (see carried_results)
+    if carried_results:
+        my_check=getattr(running_check,'name',None)
+        applicant=[x for x in applicant if my_check not in carried_results.get(x,{})]
+    my_scope=getattr(running_check,'node_scope',None)
+    if my_scope is None:
+        return(applicant)
+    my_nodes=[x for x in applicant if x in my_scope]
+    running_check.node_index=applicant.index(my_nodes[0]) if my_nodes else -1
+    return(my_nodes)
+
+def skip_node(indents,node,reason,details='',what=None):
+
+    # node level dependency not met -> the node is SKIPPED by this check (1x line in the report)
+    #   reason  : short reason for the summary (eg: UNREACHABLE, interface ens1f0 missing), details: only in the report
+    #   what    : what is not checked (None: 'node: <node>')
+    if getattr(running_check,'skipped_nodes',None) is not None:
+        running_check.skipped_nodes.setdefault(node,reason)
+    my_text=('node: '+str(node) if what is None else what)+' not checked due to '+reason+details
+    CPC_report(indents,my_text.lstrip(),info_value='SKIPPED')
+
+def skip_unreachable_node(indents,node,show_node=True):
+
+    # node level dependency: the node can not be reached -> SKIPPED by this check
+    skip_node(indents,node,'UNREACHABLE',' -> '+unreachable_nodes.get(node,''),None if show_node else '')
+
+def get_interface_gate(interface,interface_info,need_up=True):
+
+    # node level dependency of the mtu/VF checks of an interface: None if the interface is there (and UP), else the reason
+    #  -> interface missing or not UP: the mtu/VF checks of the interface are SKIPPED on the node
+    #  -> other errors (eg: sudo) are no gate: the check reports them as FAILED
+    if isinstance(interface_info,str):
+        return('interface '+interface+' missing' if 'does not exist' in interface_info else None)
+    if need_up and interface_info['state']!='UP':
+        return('interface '+interface+' not UP')
+    return(None)
+
+def describe_skipped_nodes(skipped_nodes):
+
+    # nodes skipped by a check (node -> reason) -> 'node(s) a, b skipped due to UNREACHABLE; node(s) c skipped due to ...'
+    my_reasons={}
+    for node in sorted(skipped_nodes,key=str):
+        my_reasons.setdefault(skipped_nodes[node],[]).append(str(node))
+    return('; '.join('node(s) '+', '.join(y)+' skipped due to '+x for x,y in my_reasons.items()))
+
+def parse_node_facts(out):
+
+    # decode the output of the node probe (compressed when it is big) and check its schema version
+    out=out.decode('utf-8')
+    if out.startswith('CPC_PROBE_GZIP_BASE64'):
+        try:
+            out=gzip.decompress(base64.b64decode(out.split('\n',1)[1])).decode('utf-8')
+        except (ValueError,OSError,IndexError):
+            return('ERROR: could not decompress the output of the node probe')
+    try:
+        facts=json.loads(out)
+    except ValueError:
+        return('ERROR: could not parse the output of the node probe')
+    if not isinstance(facts,dict) or facts.get('schema_version')!=NODE_PROBE_SCHEMA_VERSION:
+        schema_version=facts.get('schema_version') if isinstance(facts,dict) else None
+        return('ERROR: node probe schema version '+str(schema_version)+' is not supported (expected: '+str(NODE_PROBE_SCHEMA_VERSION)+')')
+    return(facts)
+
+def get_node_facts(node):
+
+    # run the node probe (cpc_node_probe.sh) on the node -> 1x JSON document with all facts of the node
+    #  -> the script is streamed over ssh stdin, so nothing has to be installed on the node
+    #  -> returns the facts (dictionary) or the error (string), only done once per node
+    if node in node_facts_cache:
+        return(node_facts_cache[node])
+    if node in unreachable_nodes:
+        return(NODE_UNREACHABLE)
+    with open(NODE_PROBE_SCRIPT,'rb') as f:
+        probe_script=f.read()
+    cmd=get_ssh_argv(node)+[remote_cmd(['sudo','sh','-s','--',str(node_probe_compress_min_bytes)]+NODE_PROBE_ETHTOOL_INTERFACES)]
+    def run_once():
+        with admit_command(cmd,node):
+            my_probe = Popen (cmd,shell=False, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out,err=my_probe.communicate(probe_script)
+        return(out,err.decode('utf-8'),my_probe.returncode)
+    my_result={}
+    with trace_span('node probe: '+str(node),'probe',node=node):
+        out,err,returncode=retry_transport_errors(cmd,run_once,my_result)
+    if returncode == 255:
+        # ssh error -> circuit breaker
+        mark_node_unreachable(node,err.strip()+describe_retries(my_result))
+        facts=NODE_UNREACHABLE
+    elif returncode != 0:
+        facts='ERROR: node probe failed: '+err.strip()
+    else:
+        facts=parse_node_facts(out)
+        if isinstance(facts,dict):
+            record_node_facts(node,flatten_node_facts(facts))
+    node_facts_cache[node]=facts
+    return(facts)
+
+def prefetch_node_facts(nodes):
+
+    # probe all given nodes at the same time (only the ones not probed yet)
+    to_probe=[x for x in order_nodes(nodes) if x not in node_facts_cache]
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=node_probe_max_parallel) as executor:
+            list(executor.map(trace_wrap(get_node_facts),to_probe))
+
+def flatten_node_facts(facts):
+
+    # node facts -> per section 1x level: {section: {fact: value}}, fact name = section + key
+    #   eg: 'sysctl/' -> {'net.core.rmem_max': '4194304'}, '' -> {'interfaces/bond0/mtu': '9000', ...}
+    #  -> kernel modules: 'modules/' -> {'sctp': 'loaded'} (missing on a node: None)
+    #  -> the big sections (thousands of sysctl keys) are used as they are: no new key per value per node
+    my_facts={'kernel':facts.get('kernel'),'thp':facts.get('thp')}
+    for my_key,my_value in facts.get('os_release',{}).items():
+        my_facts['os_release/'+my_key]=my_value
+    for my_group in ('selinux','hugepages'):
+        for my_key,my_value in facts.get(my_group,{}).items():
+            my_facts[my_group+'/'+my_key]=my_value
+    for my_group in ('systemd','interfaces','ethtool'):
+        for my_name,my_values in facts.get(my_group,{}).items():
+            for my_key,my_value in my_values.items():
+                my_facts[my_group+'/'+my_name+'/'+my_key]=str(my_value)
+    my_facts['kubelet/cpu_manager_state_policy']=facts.get('kubelet',{}).get('cpu_manager_state_policy')
+    for my_file,my_values in facts.get('kubelet',{}).get('config_files',{}).items():
+        for my_key,my_value in my_values.items():
+            my_facts['kubelet/'+my_file+'/'+my_key]=my_value
+    for my_dir,my_files in facts.get('cni',{}).items():
+        for my_file in my_files:
+            my_facts['cni/'+my_dir+'/'+my_file]='present'
+    return({'':my_facts,'sysctl/':facts.get('sysctl',{}),'modules/':dict.fromkeys(facts.get('modules',[]),'loaded')})
+
+def get_pool_drift(nodes,rows=None):
+
+    # drift of 1x pool of nodes: columnar table (1x column of values per fact, 1x row per node)
+    #  -> only the columns with more than 1 value are looked at: majority value + outlier nodes
+    #  -> returns number of facts, drifting facts [(fact, most common value, nodes with it, {outlier node: value})], errors per node
+    #  rows: flattened facts per node, shared by the pools (a node is in several pools)
+    rows={} if rows is None else rows
+    prefetch_node_facts(nodes)
+    my_errors={}
+    my_rows={}
+    for node in nodes:
+        my_facts=get_node_facts(node)
+        if isinstance(my_facts,str):
+            my_errors[node]=unreachable_nodes.get(node,my_facts)
+        else:
+            if node not in rows:
+                rows[node]=flatten_node_facts(my_facts)
+            my_rows[node]=rows[node]
+    my_nodes=list(my_rows)
+    if not my_nodes:
+        return(0,[],my_errors)
+    my_ignore=re.compile('|'.join('(?:'+x+')' for x in drift_ignore_facts)) if drift_ignore_facts else None
+    my_number_of_facts=0
+    my_drift=[]
+    for my_section in my_rows[my_nodes[0]]:
+        my_section_rows=[my_rows[x][my_section] for x in my_nodes]
+        my_keys=sorted(x for x in set().union(*my_section_rows) if not (my_ignore and my_ignore.match(my_section+x)))
+        my_number_of_facts+=len(my_keys)
+        # rows (map/zip: no python loop per value) -> columns
+        my_columns=zip(*[list(map(x.get,my_keys)) for x in my_section_rows])
+        for my_key,my_column in zip(my_keys,my_columns):
+            if my_column.count(my_column[0]) == len(my_column):
+                continue
+            my_value,my_count=Counter(my_column).most_common(1)[0]
+            my_drift.append((my_section+my_key,my_value,my_count,{my_nodes[i]:x for i,x in enumerate(my_column) if x!=my_value}))
+    return(my_number_of_facts,sorted(my_drift),my_errors)
+
+def create_drift_report():
+
+    # --drift: per role (node list) the facts for which nodes differ from the majority of the role
+    my_text='\nFleet drift (node facts which differ between the nodes of a role, not only the ones in CPC_checker_parms.py):\n'
+    my_rows={}
+    for my_role,my_nodes in (('workers',get_node_list('workers')),('NRD workers',get_node_list('NRD')),('AMF workers',get_node_list('AMF')),
+                             ('CMG workers',get_node_list('CMG')),('CMG SRIOV workers',get_node_list('CMG_SRIOV')),('CMG IPVLAN workers',get_node_list('CMG_IPVLAN'))):
+        if not my_nodes:
+            continue
+        my_facts,my_drift,my_errors=get_pool_drift(my_nodes,my_rows)
+        my_text+='-> '+my_role+': '+str(len(my_nodes))+' nodes, '+str(my_facts)+' facts, '+str(len(my_drift))+' drifting:\n'
+        for node in sorted(my_errors):
+            my_text+=level2*' '+'node: '+node+' not compared -> '+my_errors[node]+'\n'
+        for my_fact,my_value,my_count,my_outliers in my_drift:
+            my_shown=sorted(my_outliers)[:drift_max_outliers_shown]
+            my_more=' (+'+str(len(my_outliers)-len(my_shown))+' more)' if len(my_outliers) > len(my_shown) else ''
+            # no majority (eg: 2 nodes, 2 values): the nodes without the most common value are shown
+            my_value=('majority: ' if my_count*2 > my_count+len(my_outliers) else 'no majority, most common: ')+str(my_value).replace('\t',' ')+' ('+str(my_count)+'/'+str(my_count+len(my_outliers))+')'
+            my_text+=(level2*' '+my_fact+' : '+my_value+' -> outliers: '
+                      +', '.join(x+'='+str(my_outliers[x]).replace('\t',' ') for x in my_shown)+my_more+'\n')
+    return(my_text)
+
+def record_node_facts(node,facts):
+
+    # --export-facts: keep the facts (flatten_node_facts layout) seen on a node + when they were collected
+    if export_facts_path is None:
+        return
+    with collected_facts_lock:
+        collected_facts.setdefault(node_name_by_IP.get(node,node),[]).append((time.time(),facts))
+
+def record_check_value(node,value):
+
+    # value of a node seen by the running check -> history database + --export-facts
+    my_check=getattr(running_check,'name',None)
+    if my_check is None:
+        return
+    with collected_facts_lock:
+        last_run['values'].setdefault(my_check,{})[node]=value
+    record_node_facts(node,{'check/':{my_check:value}})
+
+def get_cluster_name():
+
+    # name of the cluster in the history database + the fact export: cluster profile, else REPORT_FILE_PREFIX
+    return(cluster_profile['name'] if cluster_profile else REPORT_FILE_PREFIX)
+
+def get_fact_rows(cluster):
+
+    # --export-facts: 1x row per fact -> (cluster, node, fact, value, timestamp), sorted on node + fact
+    #  -> a fact collected more than once (eg: sysctl via the probe and via ssh): the last value
+    with collected_facts_lock:
+        my_collected={x:list(y) for x,y in collected_facts.items()}
+    my_rows=[]
+    for node in sorted(my_collected):
+        my_facts={}
+        for my_time,my_sections in my_collected[node]:
+            my_timestamp=time.strftime('%Y-%m-%dT%H:%M:%SZ',time.gmtime(my_time))
+            for my_section,my_values in my_sections.items():
+                for my_key,my_value in my_values.items():
+                    my_facts[my_section+my_key]=(my_value,my_timestamp)
+        for my_fact in sorted(my_facts):
+            my_value,my_timestamp=my_facts[my_fact]
+            my_rows.append((cluster,node,my_fact,'' if my_value is None else str(my_value),my_timestamp))
+    return(my_rows)
+
+def write_fact_export(path,rows):
+
+    # --export-facts: *.parquet -> Parquet (pyarrow, dictionary encoded columns), *.gz -> gzip'ed CSV, else CSV
+    my_columns=['cluster','node','fact','value','timestamp']
+    if path.endswith('.parquet'):
+        my_table=pyarrow.table({x:[y[i] for y in rows] for i,x in enumerate(my_columns)})
+        pyarrow.parquet.write_table(my_table,path)
+        return
+    with (gzip.open(path,'wt',newline='') if path.endswith('.gz') else open(path,'w',newline='')) as f:
+        my_writer=csv.writer(f)
+        my_writer.writerow(my_columns)
+        my_writer.writerows(rows)
+
+def export_facts(rows):
+
+    # --export-facts: write the rows + 1x line of output
+    try:
+        write_fact_export(export_facts_path,rows)
+    except OSError as my_error:
+        print('\n ERROR: could not export the facts to '+export_facts_path+': '+str(my_error)+'\n')
+        return
+    print('Facts exported: '+str(len(rows))+' rows ('+str(len(set(x[:2] for x in rows)))+' nodes) -> '+export_facts_path+'\n')
+
+def get_node_fact(node,fact):
+
+    # 1x value out of the node facts -> same format as the output of the command it replaces
+    # (an empty string when the fact is not present)
+    facts=get_node_facts(node)
+    if isinstance(facts,str):
+        return(facts)
+    try:
+        return(str(fact(facts)))
+    except (KeyError,IndexError,TypeError,AttributeError):
+        return('')
+
+def get_node_sysctl(node,wanted_keys=None):
+
+    # all sysctl values of a node -> dictionary, or the error (string)
+    # wanted_keys: stop reading 'sysctl -a' as soon as all these keys have been seen
+    if use_node_probe:
+        facts=get_node_facts(node)
+        if isinstance(facts,str):
+            return(facts)
+        return(facts['sysctl'])
+    stop_when=None
+    if wanted_keys:
+        stop_when=stop_when_all_seen(wanted_keys,lambda line: line.partition('=')[0].strip())
+    my_info=get_node_info(node,['sudo','sysctl','-a'],True,stop_when=stop_when)
+    if my_info.startswith("ERROR"):
+        return(my_info)
+    node_sysctl={}
+    for line in my_info.split('\n'):
+        sysctl_key,separator,value_in_sysctl=line.partition('=')
+        if separator:
+            node_sysctl[sysctl_key.strip()]=value_in_sysctl.strip()
+    record_node_facts(node,{'sysctl/':node_sysctl})
+    return(node_sysctl)
+
+def get_node_interface(node,interface,count_vfs=False):
+
+    # state, mtu (and number of VFs) of an interface on a node -> dictionary, or the error (string)
+    if use_node_probe:
+        facts=get_node_facts(node)
+        if isinstance(facts,str):
+            return(facts)
+        if interface not in facts['interfaces']:
+            return('ERROR: Device "'+interface+'" does not exist.')
+        return(facts['interfaces'][interface])
+    # if no ifconfig on the worker nodes -> use ip
+    my_info=get_node_info(node,['sudo','ip','a','show',interface],True)
+    if my_info.startswith("ERROR"):
+        return(my_info)
+    interface_info={'state':'','mtu':0,'vfs':0}
+    my_state=RE_IP_STATE.search(my_info)
+    if my_state:
+        interface_info['state']=my_state.group(1)
+    my_mtu=RE_IP_MTU.search(my_info)
+    if my_mtu:
+        interface_info['mtu']=int(my_mtu.group(1))
+    if count_vfs:
+        my_info=get_node_info(node,['sudo','/usr/sbin/ip','link','show',interface],True)
+        interface_info['vfs']=len(RE_IP_VF.findall(my_info))
+    return(interface_info)
+
+def get_node_error_reason(my_error,node):
+
+    # text to show in the report for an error returned by get_Popen_info / the node probe
+    if my_error==NODE_UNREACHABLE:
+        return('UNREACHABLE -> '+unreachable_nodes.get(node,''))
+    if my_error=="ERROR":
+        return(' -> SSH error occurred?')
+    return(my_error)
+
+def do_the_sysctl_check(applicant,required_sysctl,parms_name,os_specific_sysctl={}):
+
+    # check whether the required sysctl values (dictionary 'parms_name' in CPC_checker_parms.py) are set on the nodes
+    # os_specific_sysctl: sysctl values only checked on nodes with a matching OS image, eg: {'kernel.sched_rt_runtime_us': ['Red Hat','CentOS']}
+
+
+    global_check_OK=True
+
+    if not required_sysctl:
+        failure_reason=parms_name+" is empty in CPC_checker_parms.py"
+        CPC_report(level2,failure_reason,check_failed)
+        return("NOK",failure_reason)
+
+    applicant=nodes_in_scope(applicant)
+    if use_node_probe:
+        prefetch_node_facts(applicant)
+    for i in range(0, len(applicant)):
+        add_to_report(level2*' '+"node: "+str(applicant[i])+'\n')
+        node_sysctl=get_node_sysctl(applicant[i],required_sysctl)
+        if node_sysctl == NODE_UNREACHABLE:
+            skip_unreachable_node(level3,applicant[i],show_node=False)
+            continue
+        if isinstance(node_sysctl,str):
+            global_check_OK=False
+            failure_reason=get_node_error_reason(node_sysctl,applicant[i])
+            add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
+            if not create_report:
+                return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+            continue
+        # now loop throught the required sysctl values
+        for sysctl_key in sorted(required_sysctl):
+            if sysctl_key in os_specific_sysctl and not os_image_matches(os_specific_sysctl[sysctl_key])(get_node_status(applicant[i])):
+                CPC_report(level3,'sysctl value: ' + sysctl_key + ' -> not applicable for OS: '+get_node_status(applicant[i])['os_image'],info_value='N/A')
+            elif sysctl_key in node_sysctl:
+                # check value with required input from CPC parameters:
+                value_in_sysctl=node_sysctl[sysctl_key].replace('\t',' ')
+                if value_in_sysctl==str(required_sysctl[sysctl_key]):
+                    msg_ok = 'sysctl value: ' + sysctl_key + ' = '+value_in_sysctl
+                    add_to_report(level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n')
+                else:
+                    global_check_OK=False
+                    failure_reason = 'sysctl value: ' + sysctl_key + " = " + value_in_sysctl + ' -> not set to: ' + str(required_sysctl[sysctl_key])
+                    add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
+                    if not create_report:
+                        return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+            else:
+                global_check_OK=False
+                failure_reason = 'sysctl value: ' + sysctl_key + " does not exist in sysctl"
+                add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
+                if not create_report:
+                    return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+
+    if global_check_OK:
+        return('OK')
+    else:
+        return("NOK",failure_reason)
+
+def do_the_ipvlan_interface_check(applicant,interface_list,parms_name):
+
+    # check whether the interfaces (list 'parms_name' in CPC_checker_parms.py) exist and are UP on the nodes
+    # errors: interface does not exist, or state is not UP
+
+
+    global_check_OK=True
+
+    if not interface_list:
+        failure_reason=parms_name+" is empty in CPC_checker_parms.py"
+        CPC_report(level2,failure_reason,check_failed)
+        return("NOK",failure_reason)
+
+    applicant=nodes_in_scope(applicant)
+    if use_node_probe:
+        prefetch_node_facts(applicant)
+    for i in range(0, len(applicant)):
+        add_to_report(level2*' '+"node: "+str(applicant[i])+'\n')
+        for interface in interface_list:
+            interface_info=get_node_interface(applicant[i],interface)
+            # unreachable node -> 1x line, not 1x per interface
+            if interface_info == NODE_UNREACHABLE:
+                skip_unreachable_node(level3,applicant[i],show_node=False)
+                break
+            if isinstance(interface_info,str):
+                global_check_OK=False
+                failure_reason=get_node_error_reason(interface_info,applicant[i])
+                add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
+                if not create_report:
+                    return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+            elif interface_info['state']!='UP':
+                failure_reason = 'does not have interface: ' + interface + " UP & RUNNING"
+                global_check_OK=False
+                add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
+                if not create_report:
+                    return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+            else:
+                # interface is up and running
+                msg_ok = 'has interface: ' + interface+' -> UP & RUNNING'
+                add_to_report(level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n')
+
+    if global_check_OK:
+        return('OK')
+    else:
+        return("NOK",failure_reason)
+
 def check_istio():
     # check istio-system namespace:
     #istio_system = Popen("kubectl get svc -n "+namespace_istio_system+" 2>/dev/null")
     #output_istio_system = istio_system.stdout.read().decode('utf-8')
     
-    my_info=get_Popen_info(cmd_start_kubectl+" get svc -n "+namespace_istio_system+" 2>/dev/null")
-    if my_info == "":
+    my_info=get_Popen_info(kubectl_argv('get','svc','-n',namespace_istio_system))
+    if my_info == "" or my_info.startswith("ERROR"):
         CPC_report(level2,"istio-system namespace "+namespace_istio_system+" missing",check_failed)
         return("NOK","istio-system namespace "+namespace_istio_system+" missing")    
     else:
         CPC_report(level2,"istio-system namespace '"+namespace_istio_system+"' exists")        
   
     # check istio-ingressgateway:
-    my_info=get_Popen_info(cmd_start_kubectl+" describe svc -n "+namespace_istio_system+" "+podname_istio_ingressgateway)
-    if my_info == "": 
+    my_info=get_Popen_info(kubectl_argv('describe','svc','-n',namespace_istio_system,podname_istio_ingressgateway))
+    if my_info == "" or my_info.startswith("ERROR"):
         CPC_report(level2,"istio-ingressgateway pod '"+podname_istio_ingressgateway+"' missing in "+namespace_istio_system,check_failed)
         return("NOK","istio-ingressgateway pod  '"+podname_istio_ingressgateway+"' missing in "+namespace_istio_system+" namespace")
     else:
@@ -375,8 +2103,9 @@ def check_istio():
         # istio-installation check ior_enabled set for istio-ingressgateway
         # more precise:
         # kubectl get ServiceMeshControlPlane -n istio-system -o yaml |grep -v 'f:appliedValues'|grep -A1000 appliedValues|grep -A1000 istio-ingressgateway|grep -B1000 global
-        my_info=get_Popen_info(cmd_start_kubectl+" get ServiceMeshControlPlane -n "+namespace_istio_system+" -o yaml |grep 'ior_enabled: true' 2>/dev/null")
-        if my_info == "":
+        # -> stop reading the (big) yaml as soon as ior_enabled: true is there
+        my_info=get_Popen_info(kubectl_argv('get','ServiceMeshControlPlane','-n',namespace_istio_system,'-o','yaml'),parse=grep_lines('ior_enabled: true'),stop_when=line_matches('ior_enabled: true'))
+        if my_info == "" or my_info.startswith("ERROR"):
             CPC_report(level2,"istio-ingressgateway flag ior_enabled not set to true",check_failed)
             return("NOK","istio-ingressgateway flag ior_enabled not set to true")
         else:
@@ -384,15 +2113,23 @@ def check_istio():
 
         # check istio version in ServiceMesh:
         # kubectl get csv -n openshift-operators `kubectl get csv -n openshift-operators |grep servicemeshoperator|awk '{print $1}'` -o custom-columns=vers:spec.version|tail -1
-        my_info=get_Popen_info(cmd_start_kubectl+" get csv -n openshift-operators `kubectl get csv -n openshift-operators |grep servicemeshoperator|awk '{print $1}'` -o custom-columns=vers:spec.version|tail -1",rightStrip=True)
-        if my_info == "":
+        # -> page through the csv names of openshift-operators and stop at the servicemeshoperator one
+        servicemesh_csv=get_Popen_first_match(kubectl_argv('get','csv','-n','openshift-operators','--chunk-size='+str(kubectl_chunk_size),'-o','name'),'servicemeshoperator')
+        my_info=''
+        if servicemesh_csv != '' and not servicemesh_csv.startswith('ERROR'):
+            my_info=get_Popen_info(kubectl_argv('get','-n','openshift-operators',servicemesh_csv,'-o','jsonpath={.spec.version}'),rightStrip=True)
+        if my_info == "" or my_info.startswith("ERROR"):
             CPC_report(level2,"could not find the Red Hat Service Mesh version",check_failed)
         else:
             CPC_report(level2,"Red Hat Service Mesh version: ",info_value=str(my_info))
         
         # kubectl rsh -n openshift-operators `kubectl get pods -n openshift-operators |grep istio-operator-|awk '{print $1}'` env | grep ISTIO_VERSION|cut -d'=' -f2
-        my_info=get_Popen_info(cmd_start_kubectl+" rsh -n openshift-operators `kubectl get pods -n openshift-operators |grep istio-operator-|awk '{print $1}'` env | grep ISTIO_VERSION|cut -d'=' -f2",rightStrip=True)
-        if my_info == "":
+        # -> page through the pod names of openshift-operators and stop at the istio-operator pod
+        istio_operator_pod=get_Popen_first_match(kubectl_argv('get','pods','-n','openshift-operators','--chunk-size='+str(kubectl_chunk_size),'-o','name'),'pod/istio-operator-')
+        my_info=''
+        if istio_operator_pod != '' and not istio_operator_pod.startswith('ERROR'):
+            my_info=get_Popen_info(kubectl_argv('rsh','-n','openshift-operators',istio_operator_pod,'env'),rightStrip=True,parse=first_group(r'^ISTIO_VERSION=(.*)$'))
+        if my_info == "" or my_info.startswith("ERROR"):
             CPC_report(level2,"could not read istio version in istio-operator POD",check_failed)
         else:
             CPC_report(level2,"istio version in istio-operator POD: ",info_value=str(my_info))
@@ -400,8 +2137,9 @@ def check_istio():
         # check whether nrd has got a ServiceMeshMemberRoll (if not, the istio envoy will not be injected into the nrd pod)
         # kubectl get ServiceMeshMemberRoll -n istio-system -o yaml |grep -e '- nrd'
         # or: kubectl get ServiceMeshMemberRoll -n istio-system -o yaml |sed -n '/^  spec/,/status/p'|grep nrd
-        my_info=get_Popen_info(cmd_start_kubectl+" get ServiceMeshMemberRoll -n "+namespace_istio_system+" -o yaml |sed -n '/^  spec/,/status/p'|grep nrd")
-        if my_info == "":
+        # -> only the spec: jsonpath={.items[*].spec}
+        my_info=get_Popen_info(kubectl_argv('get','ServiceMeshMemberRoll','-n',namespace_istio_system,'-o','jsonpath={.items[*].spec}'),parse=grep_lines('nrd'))
+        if my_info == "" or my_info.startswith("ERROR"):
             CPC_report(level2,"NRD: no entry for nrd in the ServiceMeshMemberRoll in namespace "+namespace_istio_system,check_failed)
             return("NOK","NRD: no entry for nrd in the ServiceMeshMemberRoll in namespace "+namespace_istio_system)
         else:
@@ -413,7 +2151,7 @@ def check_istio():
             # is istio-ingressgateway setup as NodePort or ClusterIp?
             # kubectl get svc istio-ingressgateway -n istio-system -o custom-columns=type:.spec.type |grep NodePort
             # kubectl -n istio-system get service istio-ingressgateway -o jsonpath='{.spec.type}'
-            my_info=get_Popen_info(cmd_start_kubectl+" get svc "+podname_istio_ingressgateway+" -n "+namespace_istio_system+" -o custom-columns=type:.spec.type |tail -1",rightStrip=True)
+            my_info=get_Popen_info(kubectl_argv('get','svc',podname_istio_ingressgateway,'-n',namespace_istio_system,'-o','jsonpath={.spec.type}'),rightStrip=True)
             CPC_report(level3,"NRD: istio-ingressgateway service created as type: ",info_value=str(my_info))
             
             # on which port are the worker nodes listening for http2 messages?
@@ -423,8 +2161,8 @@ def check_istio():
             # 
             # grep more http2 ports: kubectl -n istio-system get service istio-ingressgateway -o jsonpath='{range .spec.ports[*]}{.name}{" "}{.nodePort}{"\n"}{end}' | grep http2     
 
-            my_info=get_Popen_info(cmd_start_kubectl+" get service "+podname_istio_ingressgateway+' -n '+namespace_istio_system+' -o jsonpath=\'{range .spec.ports[*]}{.name}{" "}{.nodePort}{"\\n"}{end}\' | grep http2')
-            if my_info == '':
+            my_info=get_Popen_info(kubectl_argv('get','service',podname_istio_ingressgateway,'-n',namespace_istio_system,'-o','jsonpath={range .spec.ports[*]}{.name}{" "}{.nodePort}{"\\n"}{end}'),parse=grep_lines('http2'))
+            if my_info == '' or my_info.startswith("ERROR"):
                 CPC_report(level3,"NRD: "+podname_istio_ingressgateway+" is NOT listening for http2 traffic !! ",info_value='FAILED')
             else:
                 CPC_report(level3,"NRD: "+podname_istio_ingressgateway+" is listening for http2 traffic on: ",info_value=str(my_info).replace('\n',',').rstrip(','))          
@@ -432,55 +2170,64 @@ def check_istio():
             if target_platform == 'os':
                 # which router hostname got created in the openshift router in namespace istio-system for nrd:
                 # kubectl get routes -n istio-system
-                my_info=get_Popen_info(cmd_start_kubectl+" get routes -n "+namespace_istio_system+"|egrep '^"+namespace_nrd+"-nrd-'| awk '{print $2}'",rightStrip=True)
+                my_info=get_Popen_info(kubectl_argv('get','routes','-n',namespace_istio_system,'--no-headers'),rightStrip=True,parse=field_of_lines('^'+re.escape(namespace_nrd+'-nrd-'),1))
                 CPC_report(level3,"NRD: host kubectl router created in istio-system for nrd: ",info_value=str(my_info))            
         
         return('OK')
 
 def check_glusterFS():
     apply_to=['local']
-    cmd_to_exec=cmd_start_kubectl+"get storageclass -A|grep glusterfs-storageclass  2>/dev/null"
+    cmd_to_exec=kubectl_argv('get','storageclass','-A')
+    parse_output=grep_lines('glusterfs-storageclass')
     criteria_ok='info returned not empty'
     msg_ok='glusterFS present in storageclass'
     msg_nok='glusterFS is NOT present in storageclass'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,parse=parse_output)
     return(check_my_test)
 
 def check_cephFS():
     apply_to=['local']
-    cmd_to_exec=cmd_start_kubectl+"get storageclass -A|grep cephfs  2>/dev/null"
+    cmd_to_exec=kubectl_argv('get','storageclass','-A')
+    parse_output=grep_lines('cephfs')
     criteria_ok='info returned not empty'
     msg_ok='cephfs present in storageclass'
     msg_nok='cephfs is NOT present in storageclass'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,parse=parse_output)
     return(check_my_test)
     
+
 def check_multus():
     # check: sudo ls /etc/cni/net.d |grep multus
     # alternative check: kubectl get pods -A |grep -i multus
 
     # do ssh to worker and check command
-    apply_to=list_workers
+    apply_to=get_node_list('workers')
     #### OpenShift ####
     if target_platform == 'os':    
         # might also check -> oc get pods -A |grep multus
-        cmd_to_exec='"sudo ls /etc/kubernetes/cni/net.d |grep multus"'
+        cmd_to_exec=['sudo','ls','/etc/kubernetes/cni/net.d']
     #### NCS or GCP or ECCD or k8s ####
     else:
-        cmd_to_exec='"sudo ls /etc/cni/net.d |grep multus"'
+        cmd_to_exec=['sudo','ls','/etc/cni/net.d']
+    parse_output=grep_lines('multus')
     criteria_ok='info returned not empty'
     msg_ok='multus enabled'
     msg_nok='does not seem to have multus installed/enabled'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: files in the CNI config dir
+    cni_dir='/etc/kubernetes/cni/net.d' if target_platform == 'os' else '/etc/cni/net.d'
+    fact_to_check=lambda facts: '\n'.join(x for x in facts['cni'].get(cni_dir,[]) if 'multus' in x)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,parse=parse_output)
     return(check_my_test)
  
+
 def check_NRD_labels():
     #print("check_NRD_labels")
+    list_NRD_workers=get_node_list('NRD')
     if len(list_NRD_workers) == 0:
-        CPC_report(level2,'There are no nodes labeled: '+label_nrdnode,check_failed) 
-        return('NOK','There are no nodes labeled: '+label_nrdnode)
+        CPC_report(level2,'There are no nodes labeled: '+', '.join(labels_nrdnode),check_failed) 
+        return('NOK','There are no nodes labeled: '+', '.join(labels_nrdnode))
     else:
-        CPC_report(level2,'There are '+str(len(list_NRD_workers))+' nodes labeled with: '+label_nrdnode) 
+        CPC_report(level2,'There are '+str(len(list_NRD_workers))+' nodes labeled with: '+', '.join(labels_nrdnode)) 
         return('OK')
  
 def check_NRD_docker_images():
@@ -490,81 +2237,23 @@ def check_NRD_docker_images():
 
 def check_NRD_worker_nodes_sysctl():
 
-    # check whether the required systctl values are set    
-
-    global CPC_checker_report  
-
-    global_check_OK=True      
+    # check whether the required systctl values are set
+    check_my_test=do_the_sysctl_check(get_node_list('NRD'),nrd_worker_node_sysctl,'nrd_worker_node_sysctl')
+    return(check_my_test)
 
-    if nrd_worker_node_sysctl:
-        for i in range(0, len(list_NRD_workers)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_NRD_workers[i])+'\n'
-            ### get sysctl -a
-            cmd_to_exec='"sudo sysctl -a "'
-            if login_worker_nodes_with_SSHKEY:
-                my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_NRD_workers[i])+' '+cmd_to_exec,True)
-            else:
-                if skip_username_worker_node_to_ssh:        
-                    my_info=get_Popen_info('ssh -q '+str(list_NRD_workers[i])+' '+cmd_to_exec,True)
-                else:
-                    my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_NRD_workers[i])+' '+cmd_to_exec,True)
-            #print(' -> my info:',str(my_info)+'FFFFFFF')
-            if my_info.startswith("ERROR:"):
-                global_check_OK=False
-                failure_reason = str(my_info)
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_NRD_workers[i])+' '+failure_reason)                
-            elif my_info=="ERROR":
-                global_check_OK=False
-                failure_reason = ' -> SSH error occurred?'
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_NRD_workers[i])+' '+failure_reason)
-            else:
-                # now loop throught the required sysctl values
-                for sysctl_key in sorted(nrd_worker_node_sysctl):
-                    if sysctl_key in my_info:
-                        #print(' -> value: '+str(nrd_worker_node_sysctl[sysctl_key]))
-                        matched_line = [line for line in my_info.split('\n') if sysctl_key in line]
-                        # check matched line with required input from CPC parameters:
-                        value_in_sysctl=matched_line[0].split('=')[1].lstrip().replace('\t',' ')
-                        if value_in_sysctl==str(nrd_worker_node_sysctl[sysctl_key]):
-                            msg_ok = 'sysctl value: ' + sysctl_key + ' = '+value_in_sysctl
-                            CPC_checker_report+=level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n'
-                        else:
-                            global_check_OK=False
-                            failure_reason = 'sysctl value: ' + sysctl_key + " = " + value_in_sysctl + ' -> not set to: ' + str(nrd_worker_node_sysctl[sysctl_key])
-                            CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                            if not create_report:
-                                return("NOK","node: "+str(list_NRD_workers[i])+' '+failure_reason)                            
-                    else:
-                        #print('ERROR: could not find key in sysctl')
-                        global_check_OK=False
-                        failure_reason = 'sysctl value: ' + sysctl_key + " does not exist in sysctl"
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                        if not create_report:
-                            return("NOK","node: "+str(list_NRD_workers[i])+' '+failure_reason)                                            
-    else:
-        global_check_OK=False
-        failure_reason="nrd_worker_node_sysctl is empty in CPC_checker_parms.py"
-        CPC_report(level2,failure_reason,check_failed)
-        if not create_report:
-            return("NOK",failure_reason)        
-            
-    if global_check_OK:
-        return('OK')
-    else:
-        return("NOK",failure_reason)  
- 
 def check_AMF_CPU_pinning():
 
+    # live kubelet config via the API server -> independent of the platform specific kubelet config file:
+    if use_kubelet_configz:
+        return(do_the_configz_check(get_node_list('AMF'),'cpuManagerPolicy',['static'],'has correct kubelet setting','does not have cpuManagerPolicy: static'))
+
     #### NCS or GCP ####
     if target_platform  in ['ncs','gcp','eccd','k8s']:    
         # check: sudo cat /var/lib/kubelet/cpu_manager_state |grep -- '"policyName":"static"'
         # -> ps -ef|grep kubelet     will give you the config file used for kubelet, eg: --config=/var/lib/kubelet/config.yaml    
-        apply_to=list_AMF_workers
-        cmd_to_exec='"sudo cat /var/lib/kubelet/cpu_manager_state |grep static"'
+        apply_to=get_node_list('AMF')
+        cmd_to_exec=['sudo','cat','/var/lib/kubelet/cpu_manager_state']
+        parse_output=grep_lines('static')
         criteria_ok='info returned not empty'
         msg_ok='has policyName: static'
         msg_nok='does not have policyName: static'
@@ -579,13 +2268,19 @@ def check_AMF_CPU_pinning():
         # -> above check does not always work ... :( 
         #    oc get kubeletconfigs.machineconfiguration.openshift.io performance-worker-profile -o yaml |grep cpuManagerPolicy
         #      cpuManagerPolicy: static
-        apply_to=list_AMF_workers
-        cmd_to_exec='"sudo cat /etc/kubernetes/kubelet.conf |grep cpuManagerPolicy|grep static"'
+        apply_to=get_node_list('AMF')
+        cmd_to_exec=['sudo','cat','/etc/kubernetes/kubelet.conf']
+        parse_output=grep_lines('cpuManagerPolicy.*static')
         criteria_ok='info returned not empty'
         msg_ok='has cpuManagerPolicy: static'
         msg_nok='does not have cpuManagerPolicy: static'           
         
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: cpu manager state (OpenShift: kubelet.conf)
+    if target_platform == 'os':
+        fact_to_check=lambda facts: 'static' if facts['kubelet']['config_files']['/etc/kubernetes/kubelet.conf'].get('cpuManagerPolicy')=='static' else ''
+    else:
+        fact_to_check=lambda facts: 'static' if facts['kubelet']['cpu_manager_state_policy']=='static' else ''
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,parse=parse_output)
     return(check_my_test)
 
 def check_AMF_whereabouts_plugin_installed():
@@ -604,26 +2299,45 @@ def check_AMF_whereabouts_plugin_installed():
     # ippools.whereabouts.cni.cncf.io                          2021-07-11T19:40:42Z
     # overlappingrangeipreservations.whereabouts.cni.cncf.io   2021-09-28T14:35:33Z    
 
-    my_info=get_Popen_info(cmd_start_kubectl+" get pods -A | grep -i whereabouts 2>/dev/null")
+    # do not list all pods of the cluster (can be tens of thousands) -> let the API server filter:
+    # 1) pods with one of the whereabouts labels
+    my_info=''
+    for label in whereabouts_pod_labels:
+        my_info=get_Popen_first_match(kubectl_argv('get','pods','-A','-l',label,'--chunk-size='+str(kubectl_chunk_size),'-o','name'))
+        if my_info != '':
+            break
+    # 2) the whereabouts daemonset itself
+    if my_info == '':
+        my_info=get_Popen_first_match(kubectl_argv('get','daemonsets','-A','--field-selector','metadata.name=whereabouts','--chunk-size='+str(kubectl_chunk_size),'-o','name'))
+    # 3) last resort: page through the pod names of the namespaces whereabouts gets installed in (never all pods)
+    for namespace in whereabouts_namespaces:
+        if my_info != '':
+            break
+        my_info=get_Popen_first_match(kubectl_argv('get','pods','-n',namespace,'--chunk-size='+str(kubectl_chunk_size),'-o','name'),'whereabouts')
+    # kubectl failed (eg: token expired, RBAC, timeout) -> its error, not a verdict about whereabouts
+    if my_info.startswith("ERROR"):
+        CPC_report(level2,"could not look for whereabouts -> "+my_info,check_failed)
+        return("NOK","could not look for whereabouts -> "+my_info)
     if my_info == "":
         CPC_report(level2,"whereabouts seems not installed",check_failed)
-        return("NOK","whereabouts seems not installed")    
+        return("NOK","whereabouts seems not installed")
     else:
         CPC_report(level2,"whereabout pods exist")
 
     # check whereabout crds:
     # 1) ippools
     # 2) overlappingrangeipreservations
-    
-    my_info=get_Popen_info(cmd_start_kubectl+" get crds -n kube-system |grep ippools.whereabouts 2>/dev/null")
-    if my_info == "":
+    # -> get the crd directly by its name instead of listing all crds
+
+    my_info=get_Popen_info(kubectl_argv('get','crd','ippools.whereabouts.cni.cncf.io','-o','name'))
+    if my_info == "" or my_info.startswith("ERROR"):
         CPC_report(level2,"whereabouts crd: ippools.whereabouts.cni.cncf.io seems not installed",check_failed)
-        return("NOK","crd: ippools.whereabouts.cni.cncf.io seems not installed")    
+        return("NOK","crd: ippools.whereabouts.cni.cncf.io seems not installed")
     else:
-        CPC_report(level2,"whereabouts crd: ippools.whereabouts.cni.cncf.io exists")    
-        
-    my_info=get_Popen_info(cmd_start_kubectl+" get crds -n kube-system |grep overlappingrangeipreservations.whereabouts 2>/dev/null")
-    if my_info == "":
+        CPC_report(level2,"whereabouts crd: ippools.whereabouts.cni.cncf.io exists")
+
+    my_info=get_Popen_info(kubectl_argv('get','crd','overlappingrangeipreservations.whereabouts.cni.cncf.io','-o','name'))
+    if my_info == "" or my_info.startswith("ERROR"):
         CPC_report(level2,"whereabouts crd: overlappingrangeipreservations.whereabouts.cni.cncf.io seems not installed",check_failed)
         return("NOK","crd: overlappingrangeipreservations.whereabouts.cni.cncf.io seems not installed")    
     else:
@@ -647,35 +2361,39 @@ def check_AMF_worker_nodes_selinux_permissive():
     #   
 
     # only check AMF worker nodes:
-    apply_to=list_AMF_workers
+    apply_to=get_node_list('AMF')
     # if OS on worker node = SuSe linux, then the cmd_to_exec looks different than on Red Hat:
-    # kubectl get node worker-pool1-4xpr66hn-ccd0-mmt3-tenant1-testing -o custom-columns=NAME:.metadata.name,OSImage:.status.nodeInfo.osImage |grep -i 'suse linux'
-    # for now, check AMF worker0 (assumption is that all worker nodes have the same OS)
-    cmd=cmd_start_kubectl+'get node '+list_AMF_workers[0]+' -o custom-columns=NAME:.metadata.name,OSImage:.status.nodeInfo.osImage |grep -i "suse linux"'
-    my_nodeInfo=get_Popen_info(cmd)    
-    if my_nodeInfo == '':
-        cmd_to_exec='"cat /etc/selinux/config|egrep \'^SELINUX=\'|cut -d\'=\' -f2"'
-    else: # SuSe Linux
-        cmd_to_exec='sudo sestatus -v|awk \'{print $3}\''
+    # -> OS image per node out of the cluster snapshot (mixed OS pools are possible)
+    cmd_to_exec=lambda status: ['sudo','sestatus','-v'] if os_is_suse(status) else ['cat','/etc/selinux/config']
+    # SuSe Linux: 'SELinux status:   disabled' -> disabled
+    parse_output=parse_selinux
+    stop_reading=line_matches(r'^(SELINUX=|SELinux status:)')
     criteria_ok='matches value in list'
     msg_ok='has SELINUX setting OK'
     to_printValue=' -> SELINUX = '
     matchOneOfTheseValues=['permissive','disabled']
     msg_nok='does not have SELINUX='+ " or ".join(matchOneOfTheseValues) 
    
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True)
+    # node probe: SELINUX= in /etc/selinux/config (SuSe Linux: sestatus)
+    fact_to_check=lambda facts: facts['selinux']['config'] if facts['selinux']['config'] else (facts['selinux']['status'] if facts['selinux']['status']=='disabled' else facts['selinux']['current_mode'])
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True,fact=fact_to_check,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)
             
+
 def check_AMF_worker_nodes_ipv6_enabled():
     # check: lsmod |grep 'ipv6'
     # alternative check: test -f /proc/net/if_inet6 && echo "Running kernel is IPv6 ready"
 
-    apply_to=list_AMF_workers
-    cmd_to_exec='"sudo lsmod |grep ipv6"'
+    apply_to=get_node_list('AMF')
+    cmd_to_exec=['sudo','lsmod']
+    parse_output=grep_lines('ipv6')
+    stop_reading=line_matches('ipv6')
     criteria_ok='info returned not empty'
     msg_ok='has ipv6 enabled in its kernel'
     msg_nok='does not have ipv6 enabled in its kernel'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: loaded kernel modules
+    fact_to_check=lambda facts: '\n'.join(x for x in facts['modules'] if 'ipv6' in x)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)
 
 def check_AMF_worker_nodes_sctp_enabled():
@@ -687,15 +2405,20 @@ def check_AMF_worker_nodes_sctp_enabled():
     #             /etc/modprobe.d/sctp-blacklist.conf
     #             /etc/modprobe.d/sctp_diag-blacklist.conf
 
-    apply_to=list_AMF_workers
+    apply_to=get_node_list('AMF')
     #cmd_to_exec='"sudo lsmod |grep sctp"'
-    cmd_to_exec='"sudo modprobe sctp;sudo lsmod |grep sctp"'
+    # 2x command -> remote shell
+    cmd_to_exec='sudo modprobe sctp;sudo lsmod'
+    parse_output=grep_lines('sctp')
+    stop_reading=line_matches('sctp')
+    # no node probe fact: modprobe loads the module, the node probe is read-only
     criteria_ok='info returned not empty'
     msg_ok='has sctp enabled in its kernel'
     msg_nok='does not have sctp enabled in its kernel'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)
       
+
 def check_AMF_worker_nodes_ipsec_kernel_module():
     # check:
     #   1) kernel module loaded?:   lsmod | grep -i xfrm
@@ -710,12 +2433,16 @@ def check_AMF_worker_nodes_ipsec_kernel_module():
     
     
     # NOTE: only needed for 4G LI ... not for 5G LI
-    apply_to=list_AMF_workers
-    cmd_to_exec='"sudo lsmod | grep -i xfrm"'
+    apply_to=get_node_list('AMF')
+    cmd_to_exec=['sudo','lsmod']
+    parse_output=grep_lines('xfrm',re.I)
+    stop_reading=line_matches('xfrm',re.I)
     criteria_ok='info returned not empty'
     msg_ok='has ipsec enabled in its kernel'
     msg_nok='does not have ipsec enabled in its kernel'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: loaded kernel modules
+    fact_to_check=lambda facts: '\n'.join(x for x in facts['modules'] if 'xfrm' in x.lower())
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)        
 
 def check_AMF_worker_nodes_ipsec_service_active():
@@ -732,32 +2459,37 @@ def check_AMF_worker_nodes_ipsec_service_active():
     
     
     # NOTE: only needed for 4G LI ... not for 5G LI
-    apply_to=list_AMF_workers
-    if amf_worker_node_OS_RHEL_or_CentOS:
-        cmd_to_exec='"systemctl --no-pager status ipsec.service |grep \'Active: active\'|awk \'{print \$2}\'"'
-    else:
-        cmd_to_exec='"sudo systemctl show -p ActiveState --value ipsec"'
+    apply_to=get_node_list('AMF')
+    # 'systemctl show' works on RHEL/CentOS and SuSe (no --value: older systemd) -> ActiveState=active
+    cmd_to_exec=['sudo','systemctl','show','-p','ActiveState','ipsec']
+    parse_output=first_group(r'^ActiveState=(\S+)')
     criteria_ok='matches value in list'
     msg_ok='has correct setting'
     to_printValue=' -> ipsec service = '
     matchOneOfTheseValues=['active']
     msg_nok='does not have ipsec service = active'
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True)
+    # node probe: systemd unit state
+    fact_to_check=lambda facts: facts['systemd']['ipsec']['ActiveState']
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True,fact=fact_to_check,parse=parse_output)
     return(check_my_test)
     
+
 def check_AMF_worker_nodes_transparent_hugepage_madvise():
     # cat /sys/kernel/mm/transparent_hugepage/enabled |grep -Po '\[\K[^]]*'
     
     # only check AMF worker nodes:
-    apply_to=list_AMF_workers
-    cmd_to_exec='"cat /sys/kernel/mm/transparent_hugepage/enabled |grep -Po \'\[\K[^]]*\'"'
+    apply_to=get_node_list('AMF')
+    cmd_to_exec=['cat','/sys/kernel/mm/transparent_hugepage/enabled']
+    parse_output=first_group(r'\[([^]]*)\]')
     criteria_ok='matches value in list'
     msg_ok='has correct setting'
     to_printValue=' -> transparent_hugepage = '
     matchOneOfTheseValues=['madvise']
     msg_nok='does not have transparent_hugepage = '+ " or ".join(matchOneOfTheseValues)
    
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True)
+    # node probe: transparent hugepage setting
+    fact_to_check=lambda facts: facts['thp']
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True,fact=fact_to_check,parse=parse_output)
     return(check_my_test)
 
 def check_AMF_worker_nodes_docker_msgqueue_unlimited():
@@ -770,13 +2502,17 @@ def check_AMF_worker_nodes_docker_msgqueue_unlimited():
     #                         
 
     # only check AMF worker nodes:
-    apply_to=list_AMF_workers
-    cmd_to_exec='"sudo cat /etc/systemd/system/multi-user.target.wants/docker.service |grep LimitMSGQUEUE=infinity"'
+    apply_to=get_node_list('AMF')
+    cmd_to_exec=['sudo','cat','/etc/systemd/system/multi-user.target.wants/docker.service']
+    parse_output=grep_lines('LimitMSGQUEUE=infinity')
     criteria_ok='info returned not empty'
     msg_ok='has LimitMSGQUEUE=infinity OK'
     msg_nok='does not have LimitMSGQUEUE=infinity' 
    
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: effective limit of the systemd unit
+    fact_to_check=lambda facts: 'LimitMSGQUEUE=infinity' if facts['systemd']['docker']['LimitMSGQUEUE']=='infinity' else ''
+    # only nodes using docker as container runtime (other nodes -> N/A)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,applies_to=runtime_is('docker'),parse=parse_output)
     return(check_my_test)
 
 def check_AMF_worker_nodes_containerd_msgqueue_unlimited():
@@ -789,197 +2525,86 @@ def check_AMF_worker_nodes_containerd_msgqueue_unlimited():
     #                         
 
     # only check AMF worker nodes:
-    apply_to=list_AMF_workers
-    cmd_to_exec='"sudo cat /etc/systemd/system/multi-user.target.wants/containerd.service |grep LimitMSGQUEUE=infinity"'
+    apply_to=get_node_list('AMF')
+    cmd_to_exec=['sudo','cat','/etc/systemd/system/multi-user.target.wants/containerd.service']
+    parse_output=grep_lines('LimitMSGQUEUE=infinity')
     criteria_ok='info returned not empty'
     msg_ok='has LimitMSGQUEUE=infinity OK'
     msg_nok='does not have LimitMSGQUEUE=infinity' 
    
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: effective limit of the systemd unit
+    fact_to_check=lambda facts: 'LimitMSGQUEUE=infinity' if facts['systemd']['containerd']['LimitMSGQUEUE']=='infinity' else ''
+    # only nodes using containerd as container runtime (other nodes -> N/A)
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,applies_to=runtime_is('containerd'),parse=parse_output)
     return(check_my_test)
 
 def check_AMF_worker_nodes_ipvlan_interfaces():
 
     # errors: interface does not exist, or state is not UP
-    # apply_to=list_AMF_workers
-    # for i in range(0, len(amf_ipvlan_interface_list)):
-        # cmd_to_exec='"sudo /usr/sbin/ifconfig "' + amf_ipvlan_interface_list[i] + '" |grep \'UP,BROADCAST,RUNNING\'"'
-        # criteria_ok='info returned not empty'
-        # msg_ok='has interface: '+ amf_ipvlan_interface_list[i] + " UP & RUNNING"
-        # msg_nok='does not have interface: ' + amf_ipvlan_interface_list[i] + " UP & RUNNING"
-        # check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
-    # return(check_my_test)    
-    
     # interesting check:    ip -d link show bond0.401       -> shows vlan id as well
-
-    global CPC_checker_report  
-
-    global_check_OK=True      
-
-    if amf_ipvlan_interface_list:
-        for i in range(0, len(list_AMF_workers)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_AMF_workers[i])+'\n'
-            #### get value:        
-            for interface in range(0, len(amf_ipvlan_interface_list)):
-                # check 1: interface up and running?
-                ####################################
-                #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + cmg_sriov_interface_list[interface] + '" |grep \'UP,BROADCAST,RUNNING\'"'
-                # if no ifconfig on the worker nodes - change1/2:
-                cmd_to_exec='"sudo ip a show "' + amf_ipvlan_interface_list[interface]                
-                #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + amf_ipvlan_interface_list[interface]
-                if login_worker_nodes_with_SSHKEY:
-                    my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_AMF_workers[i])+' '+cmd_to_exec,True)
-                else:
-                    if skip_username_worker_node_to_ssh:        
-                        my_info=get_Popen_info('ssh -q '+str(list_AMF_workers[i])+' '+cmd_to_exec,True)
-                    else:
-                        my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_AMF_workers[i])+' '+cmd_to_exec,True)
-                #print(' -> my info:',str(my_info)+'FFFFFFF')
-                if my_info.startswith("ERROR:"):
-                    global_check_OK=False
-                    failure_reason = str(my_info)
-                    CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                    if not create_report:
-                        return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)                
-                elif my_info=="ERROR":
-                    global_check_OK=False
-                    failure_reason = ' -> SSH error occurred?'
-                    CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                    if not create_report:
-                        return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)
-                else:
-                    # check whether interface is UP and RUNNING:
-                    # if no ifconfig on the worker nodes - change2/2:
-                    if not "state UP" in my_info:                    
-                    #if not "UP,BROADCAST,RUNNING" in my_info:
-                        failure_reason = 'does not have interface: ' + amf_ipvlan_interface_list[interface] + " UP & RUNNING"
-                        global_check_OK=False
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                        if not create_report:
-                            return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)
-                    else:
-                        # sriov interface is up and running
-                        msg_ok = 'has interface: ' + amf_ipvlan_interface_list[interface]+' -> UP & RUNNING'
-                        CPC_checker_report+=level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n'   
-    else:
-        global_check_OK=False
-        failure_reason="amf_ipvlan_interface_list is empty in CPC_checker_parms.py"
-        CPC_report(level2,failure_reason,check_failed)
-        if not create_report:
-            return("NOK",failure_reason)        
-            
-    if global_check_OK:
-        return('OK')
-    else:
-        return("NOK",failure_reason)
+    check_my_test=do_the_ipvlan_interface_check(get_node_list('AMF'),amf_ipvlan_interface_list,'amf_ipvlan_interface_list')
+    return(check_my_test)
 
 def check_AMF_worker_nodes_sysctl():
 
-    # check whether the required systctl values are set    
-
-    global CPC_checker_report  
-
-    global_check_OK=True      
+    # check whether the required systctl values are set
+    my_sysctl=dict(amf_worker_node_sysctl)
+    if check_amf_ipsec:
+        my_sysctl.update(amf_worker_node_sysctl_ipsec)
+    check_my_test=do_the_sysctl_check(get_node_list('AMF'),my_sysctl,'amf_worker_node_sysctl',amf_worker_node_sysctl_os_specific)
+    return(check_my_test)
 
-    if amf_worker_node_sysctl:
-        for i in range(0, len(list_AMF_workers)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_AMF_workers[i])+'\n'
-            ### get sysctl -a
-            cmd_to_exec='"sudo sysctl -a "'
-            if login_worker_nodes_with_SSHKEY:
-                my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_AMF_workers[i])+' '+cmd_to_exec,True)
-            else:
-                if skip_username_worker_node_to_ssh:        
-                    my_info=get_Popen_info('ssh -q '+str(list_AMF_workers[i])+' '+cmd_to_exec,True)
-                else:
-                    my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_AMF_workers[i])+' '+cmd_to_exec,True)
-            #print(' -> my info:',str(my_info)+'FFFFFFF')
-            if my_info.startswith("ERROR:"):
-                global_check_OK=False
-                failure_reason = str(my_info)
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)                
-            elif my_info=="ERROR":
-                global_check_OK=False
-                failure_reason = ' -> SSH error occurred?'
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)
-            else:
-                # now loop throught the required sysctl values
-                for sysctl_key in sorted(amf_worker_node_sysctl):
-                    if sysctl_key in my_info:
-                        #print(' -> value: '+str(amf_worker_node_sysctl[sysctl_key]))
-                        matched_line = [line for line in my_info.split('\n') if sysctl_key in line]
-                        # check matched line with required input from CPC parameters:
-                        value_in_sysctl=matched_line[0].split('=')[1].lstrip().replace('\t',' ')
-                        if value_in_sysctl==str(amf_worker_node_sysctl[sysctl_key]):
-                            msg_ok = 'sysctl value: ' + sysctl_key + ' = '+value_in_sysctl
-                            CPC_checker_report+=level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n'
-                        else:
-                            global_check_OK=False
-                            failure_reason = 'sysctl value: ' + sysctl_key + " = " + value_in_sysctl + ' -> not set to: ' + str(amf_worker_node_sysctl[sysctl_key])
-                            CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                            if not create_report:
-                                return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)                            
-                    else:
-                        #print('ERROR: could not find key in sysctl')
-                        global_check_OK=False
-                        failure_reason = 'sysctl value: ' + sysctl_key + " does not exist in sysctl"
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                        if not create_report:
-                            return("NOK","node: "+str(list_AMF_workers[i])+' '+failure_reason)                                            
-    else:
-        global_check_OK=False
-        failure_reason="cmg_worker_node_sysctl is empty in CPC_checker_parms.py"
-        CPC_report(level2,failure_reason,check_failed)
-        if not create_report:
-            return("NOK",failure_reason)        
-            
-    if global_check_OK:
-        return('OK')
-    else:
-        return("NOK",failure_reason)  
-    
 def check_worker_node_udp_tnl_segmentation_off():
 
     # setting when using GCP + Intel NICs + Cillium CNI (eg: Telenet)
 
-    apply_to=list_workers
-    cmd_to_exec='ethtool -k bond0 |grep "tx-udp_tnl-segmentation: "|awk \'{printf $2}\''
+    apply_to=get_node_list('workers')
+    cmd_to_exec=['ethtool','-k','bond0']
+    parse_output=first_group(r'^tx-udp_tnl-segmentation: (\S+)')
+    stop_reading=line_matches(r'^tx-udp_tnl-segmentation: ')
     criteria_ok='matches value in list'
     msg_ok='has correct setting'
     to_printValue=' -> tx-udp_tnl-segmentation: '
     matchOneOfTheseValues=['off']
     msg_nok='does not have tx-udp_tnl-segmentation: '+ " or ".join(matchOneOfTheseValues)
 
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True)
+    # node probe: ethtool features (NODE_PROBE_ETHTOOL_INTERFACES)
+    fact_to_check=lambda facts: facts['ethtool']['bond0']['tx-udp_tnl-segmentation']
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True,fact=fact_to_check,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)
 
 def check_worker_node_udp_tnl_csum_off():
 
     # setting when using GCP + Intel NICs + Cillium CNI (eg: Telenet)
 
-    apply_to=list_workers
-    cmd_to_exec='ethtool -k bond0 |grep "tx-udp_tnl-csum-segmentation: "|awk \'{printf $2}\''
+    apply_to=get_node_list('workers')
+    cmd_to_exec=['ethtool','-k','bond0']
+    parse_output=first_group(r'^tx-udp_tnl-csum-segmentation: (\S+)')
+    stop_reading=line_matches(r'^tx-udp_tnl-csum-segmentation: ')
     criteria_ok='matches value in list'
     msg_ok='has correct setting'
     to_printValue=' -> tx-udp_tnl-csum-segmentation: '
     matchOneOfTheseValues=['off']
     msg_nok='does not have tx-udp_tnl-csum-segmentation: '+ " or ".join(matchOneOfTheseValues)
 
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True)
+    # node probe: ethtool features (NODE_PROBE_ETHTOOL_INTERFACES)
+    fact_to_check=lambda facts: facts['ethtool']['bond0']['tx-udp_tnl-csum-segmentation']
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,list_to_match=matchOneOfTheseValues,text_printValue=to_printValue,printValue=True,rightStrip=True,fact=fact_to_check,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)
 
 def check_CMG_CPU_pinning():
 
+    # live kubelet config via the API server -> independent of the platform specific kubelet config file:
+    if use_kubelet_configz:
+        return(do_the_configz_check(get_node_list('CMG'),'cpuManagerPolicy',['static'],'has correct kubelet setting','does not have cpuManagerPolicy: static'))
+
     #### NCS or GCP or ECCD ####
     if target_platform  in ['ncs','gcp','eccd','k8s']:      
         # check: sudo cat /var/lib/kubelet/cpu_manager_state |grep -- '"policyName":"static"'
         # -> ps -ef|grep kubelet     will give you the config file used for kubelet, eg: --config=/var/lib/kubelet/config.yaml    
-        apply_to=list_CMG_workers
-        cmd_to_exec='"sudo cat /var/lib/kubelet/cpu_manager_state |grep static"'
+        apply_to=get_node_list('CMG')
+        cmd_to_exec=['sudo','cat','/var/lib/kubelet/cpu_manager_state']
+        parse_output=grep_lines('static')
         criteria_ok='info returned not empty'
         msg_ok='has policyName: static'
         msg_nok='does not have policyName: static'
@@ -995,26 +2620,36 @@ def check_CMG_CPU_pinning():
         # -> above check does not always work ... :( 
         #    oc get kubeletconfigs.machineconfiguration.openshift.io performance-worker-profile -o yaml |grep cpuManagerPolicy
         #      cpuManagerPolicy: static
-        apply_to=list_CMG_workers
-        cmd_to_exec='"sudo cat /etc/kubernetes/kubelet.conf |grep cpuManagerPolicy|grep static"'
+        apply_to=get_node_list('CMG')
+        cmd_to_exec=['sudo','cat','/etc/kubernetes/kubelet.conf']
+        parse_output=grep_lines('cpuManagerPolicy.*static')
         criteria_ok='info returned not empty'
         msg_ok='has cpuManagerPolicy: static'
         msg_nok='does not have cpuManagerPolicy: static'         
         
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: cpu manager state (OpenShift: kubelet.conf)
+    if target_platform == 'os':
+        fact_to_check=lambda facts: 'static' if facts['kubelet']['config_files']['/etc/kubernetes/kubelet.conf'].get('cpuManagerPolicy')=='static' else ''
+    else:
+        fact_to_check=lambda facts: 'static' if facts['kubelet']['cpu_manager_state_policy']=='static' else ''
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,parse=parse_output)
     return(check_my_test)
 
 def check_CMG_HugePages():
     # only to be checked if using DPDK:
-    apply_to=list_CMG_workers
-    cmd_to_exec='"sudo cat /proc/meminfo |grep HugePages_Total|awk \'{printf \$2}\'"'
+    apply_to=get_node_list('CMG')
+    cmd_to_exec=['sudo','cat','/proc/meminfo']
+    parse_output=first_group(r'^HugePages_Total:\s+(\S+)')
+    stop_reading=line_matches(r'^HugePages_Total:')
     criteria_ok='above min value'
     msg_ok='has HugePages enabled'
     to_printValue=' -> HugePages_Total: '
     msg_nok='does not have HugePages enabled (HugePage_Total: 0)'          
    
     # if HugePage_Total is above 0 (eg: 1), we can assume HugePages have been enabled
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,min_value=1,text_printValue=to_printValue,printValue=True)
+    # node probe: hugepages info of /proc/meminfo
+    fact_to_check=lambda facts: facts['hugepages']['HugePages_Total']
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,min_value=1,text_printValue=to_printValue,printValue=True,fact=fact_to_check,parse=parse_output,stop_when=stop_reading)
     return(check_my_test)
 
 def check_CMG_worker_nodes_sriov_interfaces():
@@ -1034,104 +2669,91 @@ def check_CMG_worker_nodes_sriov_interfaces():
     # find list of virtual functions (VFs):             lspci -nn | grep Virtual
     # find the PCI addresses for the various VFs:       lshw -c network -businfo | grep 'Virtual Function' 
     
-    global CPC_checker_report  
 
     global_check_OK=True      
 
     if cmg_sriov_interface_list:
-        for i in range(0, len(list_CMG_workers_SRIOV)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_CMG_workers_SRIOV[i])+'\n'
+        applicant=nodes_in_scope(get_node_list('CMG_SRIOV'))
+        if use_node_probe:
+            prefetch_node_facts(applicant)
+        for i in range(0, len(applicant)):
+            add_to_report(level2*' '+"node: "+str(applicant[i])+'\n')
             #### get value:        
             for interface in range(0, len(cmg_sriov_interface_list)):
                 # check 1: interface up and running?
                 ####################################
-                #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + cmg_sriov_interface_list[interface] + '" |grep \'UP,BROADCAST,RUNNING\'"'
-                #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + cmg_sriov_interface_list[interface]
-                cmd_to_exec='"sudo ip a show "' + cmg_sriov_interface_list[interface]                
-                if login_worker_nodes_with_SSHKEY:
-                    my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_CMG_workers_SRIOV[i])+' '+cmd_to_exec,True)
-                else:
-                    if skip_username_worker_node_to_ssh:        
-                        my_info=get_Popen_info('ssh -q '+str(list_CMG_workers_SRIOV[i])+' '+cmd_to_exec,True)
-                    else:
-                        my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_CMG_workers_SRIOV[i])+' '+cmd_to_exec,True)
-                #print(' -> my info:',str(my_info)+'FFFFFFF')
-                if my_info.startswith("ERROR:"):
-                    global_check_OK=False
-                    failure_reason = str(my_info)
-                    CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                    if not create_report:
-                        return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)                
-                elif my_info=="ERROR":
+                interface_info=get_node_interface(applicant[i],cmg_sriov_interface_list[interface],count_vfs=True)
+                # unreachable node -> 1x line, not 1x per interface
+                if interface_info == NODE_UNREACHABLE:
+                    skip_unreachable_node(level3,applicant[i],show_node=False)
+                    break
+                if isinstance(interface_info,str):
                     global_check_OK=False
-                    failure_reason = ' -> SSH error occurred?'
-                    CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
+                    failure_reason = get_node_error_reason(interface_info,applicant[i])
+                    add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
                     if not create_report:
-                        return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)
+                        return("NOK","node: "+str(applicant[i])+' '+failure_reason)                
                 else:
                     # check whether interface is UP and RUNNING:
-                    #if not "UP,BROADCAST,RUNNING" in my_info:
-                    if not "state UP" in my_info:                                        
+                    if interface_info['state']!='UP':
                         failure_reason = 'does not have interface: ' + cmg_sriov_interface_list[interface] + " UP & RUNNING"
                         global_check_OK=False
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
+                        add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
                         if not create_report:
-                            return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)
+                            return("NOK","node: "+str(applicant[i])+' '+failure_reason)
                     else:
                         # sriov interface is up and running
-                        CPC_checker_report+=level3*' '+'has interface: ' + cmg_sriov_interface_list[interface]+' \n'
-                        CPC_checker_report+=level4*' '+'UP & RUNNING'.ljust(dotline_length-level4+level2,'.')+' OK\n'
-                        # check 2: mtu size ok?
-                        #######################
-                        interface_mtu_size=my_info.split()[my_info.split().index("mtu")+1]
-                        if not int(interface_mtu_size) > cmg_sriov_interface_mtu_min:
-                            global_check_OK=False
-                            failure_reason = 'mtu = ' + str(interface_mtu_size) + ' (NOK: is NOT above: '+str(cmg_sriov_interface_mtu_min)+')'
-                            CPC_checker_report+=level4*' '+failure_reason.ljust(dotline_length-level4+level2,'.')+' FAILED\n'
-                            if not create_report:
-                                return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)
-                        else:
-                            # mtu size is OK
-                            msg_ok = 'mtu = ' + str(interface_mtu_size) + ' (OK: is above: '+str(cmg_sriov_interface_mtu_min)+')'
-                            CPC_checker_report+=level4*' '+msg_ok.ljust(dotline_length-level4+level2,'.')+' OK\n'
-                            # check 3: number of vf's > 0 ?
-                            ###############################
-                            #cmd_to_exec='"sudo /usr/sbin/ip link show "' + cmg_sriov_interface_list[interface] + '" | grep \'   vf\' | wc -l"'
-                            cmd_to_exec='"sudo /usr/sbin/ip link show "' + cmg_sriov_interface_list[interface]
-                            if login_worker_nodes_with_SSHKEY:
-                                my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_CMG_workers_SRIOV[i])+' '+cmd_to_exec,True)
-                            else:
-                                if skip_username_worker_node_to_ssh:        
-                                    my_info=get_Popen_info('ssh -q '+str(list_CMG_workers_SRIOV[i])+' '+cmd_to_exec,True)
-                                else:
-                                    my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_CMG_workers_SRIOV[i])+' '+cmd_to_exec,True)
-                            number_of_vf=my_info.count('vf ')
-                            if not number_of_vf > 0:
-                                global_check_OK=False
-                                failure_reason = 'number of VF functions = '+str(number_of_vf)+' (NOK: is not above 0)'
-                                CPC_checker_report+=level4*' '+failure_reason.ljust(dotline_length-level4+level2,'.')+' FAILED\n'
-                                if not create_report:
-                                    return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)                            
-                            else:
-                                # at least 1x vf: vf 0:
-                                msg_ok='number of VF functions = '+str(number_of_vf)+' (OK: is above 0)'
-                                CPC_checker_report+=level4*' '+msg_ok.ljust(dotline_length-level4+level2,'.')+' OK\n'
-                                # check 4: vf ->  all trust on? 
-                                ###############################
-                                # CMG Installation Guide: When CMG is deployed on Intel 82599 NICs, SR-IOV virtual functions must be
-                                # configured with trust mode activated to ensure that the VM attached to the respective
-                                # VF is able to receive multicast traffic.
-                                #
-                                # if nic_brand == 'Intel':
-                                    # if 'trust off' in my_info:
-                                        # global_check_OK=False
-                                        # failure_reason = 'trust off for some VFs (NOK: trust must be on for all VFs)'
-                                        # CPC_checker_report+=level4*' '+failure_reason.ljust(dotline_length-level4+level2,'.')+' FAILED\n'
-                                        # if not create_report:
-                                            # return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)                            
-                                    # else:
-                                        # msg_ok='trust mode is on for the VFs'
-                                        # CPC_checker_report+=level4*' '+msg_ok.ljust(dotline_length-level4+level2,'.')+' OK\n'      
+                        add_to_report(level3*' '+'has interface: ' + cmg_sriov_interface_list[interface]+' \n')
+                        add_to_report(level4*' '+'UP & RUNNING'.ljust(dotline_length-level4+level2,'.')+' OK\n')
+                # interface missing or not UP (gate) -> its mtu and VFs can not be checked: SKIPPED on this node
+                interface_gate=get_interface_gate(cmg_sriov_interface_list[interface],interface_info)
+                if interface_gate:
+                    skip_node(level4,applicant[i],interface_gate,what='mtu + VFs')
+                    continue
+                if isinstance(interface_info,str):
+                    continue
+                # check 2: mtu size ok?
+                #######################
+                interface_mtu_size=interface_info['mtu']
+                if not int(interface_mtu_size) > cmg_sriov_interface_mtu_min:
+                    global_check_OK=False
+                    failure_reason = 'mtu = ' + str(interface_mtu_size) + ' (NOK: is NOT above: '+str(cmg_sriov_interface_mtu_min)+')'
+                    add_to_report(level4*' '+failure_reason.ljust(dotline_length-level4+level2,'.')+' FAILED\n')
+                    if not create_report:
+                        return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+                else:
+                    # mtu size is OK
+                    msg_ok = 'mtu = ' + str(interface_mtu_size) + ' (OK: is above: '+str(cmg_sriov_interface_mtu_min)+')'
+                    add_to_report(level4*' '+msg_ok.ljust(dotline_length-level4+level2,'.')+' OK\n')
+                # check 3: number of vf's > 0 ? (also when the mtu is not ok)
+                ###############################
+                number_of_vf=interface_info['vfs']
+                if not number_of_vf > 0:
+                    global_check_OK=False
+                    failure_reason = 'number of VF functions = '+str(number_of_vf)+' (NOK: is not above 0)'
+                    add_to_report(level4*' '+failure_reason.ljust(dotline_length-level4+level2,'.')+' FAILED\n')
+                    if not create_report:
+                        return("NOK","node: "+str(applicant[i])+' '+failure_reason)
+                else:
+                    # at least 1x vf: vf 0:
+                    msg_ok='number of VF functions = '+str(number_of_vf)+' (OK: is above 0)'
+                    add_to_report(level4*' '+msg_ok.ljust(dotline_length-level4+level2,'.')+' OK\n')
+                # check 4: vf ->  all trust on? 
+                ###############################
+                # CMG Installation Guide: When CMG is deployed on Intel 82599 NICs, SR-IOV virtual functions must be
+                # configured with trust mode activated to ensure that the VM attached to the respective
+                # VF is able to receive multicast traffic.
+                #
+                # if nic_brand == 'Intel':
+                    # if 'trust off' in my_info:
+                        # global_check_OK=False
+                        # failure_reason = 'trust off for some VFs (NOK: trust must be on for all VFs)'
+                        # CPC_checker_report+=level4*' '+failure_reason.ljust(dotline_length-level4+level2,'.')+' FAILED\n'
+                        # if not create_report:
+                            # return("NOK","node: "+str(list_CMG_workers_SRIOV[i])+' '+failure_reason)                            
+                    # else:
+                        # msg_ok='trust mode is on for the VFs'
+                        # CPC_checker_report+=level4*' '+msg_ok.ljust(dotline_length-level4+level2,'.')+' OK\n'      
     else:
         global_check_OK=False
         failure_reason="cmg_sriov_interface_list is empty in CPC_checker_parms.py"
@@ -1153,12 +2775,17 @@ def check_CMG_NUMA_pinning():
     # ? how check:  --topology-manager-scope=pod
     # lscpu |grep -i numa
 
+    # live kubelet config via the API server -> independent of the platform specific kubelet config file:
+    if use_kubelet_configz:
+        return(do_the_configz_check(get_node_list('CMG'),'topologyManagerPolicy',['single-numa-node'],'has correct kubelet setting','does not have topologyManagerPolicy: single-numa-node'))
+
     ### NCS ###
     if target_platform == 'ncs':
     # kubelet config:   /etc/kubernetes/kubelet-config.yml
     # to be checked:    topologyManagerPolicy: "single-numa-node"
-        apply_to=list_CMG_workers
-        cmd_to_exec='"sudo cat /etc/kubernetes/kubelet-config.yml |grep \'topologyManagerPolicy: \\"single-numa-node\\"\'"'
+        apply_to=get_node_list('CMG')
+        cmd_to_exec=['sudo','cat','/etc/kubernetes/kubelet-config.yml']
+        parse_output=grep_lines('topologyManagerPolicy: "single-numa-node"')
         criteria_ok='info returned not empty'
         msg_ok='has topologyManagerPolicy: "single-numa-node"'
         msg_nok='does not have topologyManagerPolicy: "single-numa-node"'        
@@ -1168,15 +2795,17 @@ def check_CMG_NUMA_pinning():
         # 
         # might need to check on each worker node:
         #   /etc/kubernetes/kubelet.conf |grep topologyManagerPolicy|grep single-numa-node
-        apply_to=list_CMG_workers
-        cmd_to_exec='"sudo cat /etc/kubernetes/kubelet.conf |grep topologyManagerPolicy|grep single-numa-node"'
+        apply_to=get_node_list('CMG')
+        cmd_to_exec=['sudo','cat','/etc/kubernetes/kubelet.conf']
+        parse_output=grep_lines('topologyManagerPolicy.*single-numa-node')
         criteria_ok='info returned not empty'
         msg_ok='has topologyManagerPolicy: single-numa-node'
         msg_nok='does not have topologyManagerPolicy: single-numa-node'
     else:
         #### GCP or ECCD ####
-        apply_to=list_CMG_workers
-        cmd_to_exec='"sudo cat /var/lib/kubelet/config.yaml |grep \'topologyManagerPolicy: \\"single-numa-node\\"\'"'
+        apply_to=get_node_list('CMG')
+        cmd_to_exec=['sudo','cat','/var/lib/kubelet/config.yaml']
+        parse_output=grep_lines('topologyManagerPolicy: "single-numa-node"')
         criteria_ok='info returned not empty'
         msg_ok='has topologyManagerPolicy: single-numa-node'
         msg_nok='does not have topologyManagerPolicy: single-numa-node'        
@@ -1189,208 +2818,86 @@ def check_CMG_NUMA_pinning():
         # msg_ok='cpumanager-enabled set in machineconfigpool'
         # msg_nok='cpu pinning NOK -> no cpu-manager on the worker nodes?'
      
-    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok)
+    # node probe: topologyManagerPolicy in the (platform specific) kubelet config file
+    kubelet_config_file={'ncs':'/etc/kubernetes/kubelet-config.yml','os':'/etc/kubernetes/kubelet.conf'}.get(target_platform,'/var/lib/kubelet/config.yaml')
+    fact_to_check=lambda facts: 'single-numa-node' if facts['kubelet']['config_files'][kubelet_config_file].get('topologyManagerPolicy')=='single-numa-node' else ''
+    check_my_test=do_the_check(apply_to,cmd_to_exec,criteria_ok,msg_ok,msg_nok,fact=fact_to_check,parse=parse_output)
     return(check_my_test)
     
+
 def check_CMG_worker_nodes_sysctl():
 
-    # check whether the required systctl values are set    
+    # check whether the required systctl values are set
+    check_my_test=do_the_sysctl_check(get_node_list('CMG'),cmg_worker_node_sysctl,'cmg_worker_node_sysctl')
+    return(check_my_test)
+
+def check_CMG_worker_nodes_ipvlan_interfaces():
+
+    # errors: interface does not exist, or state is not UP
+    check_my_test=do_the_ipvlan_interface_check(get_node_list('CMG_IPVLAN'),cmg_ipvlan_interface_list,'cmg_ipvlan_interface_list')
+    return(check_my_test)
+
+def check_CMG_worker_nodes_k8s_cluster_CSF_mtu_size():
+
+    # CSF: check whether k8s cluster interface has got correct mtu size
+    # worker node k8s cluster interface name
+    # eg:   calico  -> tunl0
+    #       cilium  -> cilium_host
+    # cmg_workernode_k8s_interface_name='tunl0'
+    # cmg_CSF_mtu_size=9000
 
-    global CPC_checker_report  
 
     global_check_OK=True      
 
-    if cmg_worker_node_sysctl:
-        for i in range(0, len(list_CMG_workers)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_CMG_workers[i])+'\n'
-            ### get sysctl -a
-            cmd_to_exec='"sudo sysctl -a "'
-            if login_worker_nodes_with_SSHKEY:
-                my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_CMG_workers[i])+' '+cmd_to_exec,True)
-            else:
-                if skip_username_worker_node_to_ssh:        
-                    my_info=get_Popen_info('ssh -q '+str(list_CMG_workers[i])+' '+cmd_to_exec,True)
-                else:
-                    my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_CMG_workers[i])+' '+cmd_to_exec,True)
-            #print(' -> my info:',str(my_info)+'FFFFFFF')
-            if my_info.startswith("ERROR:"):
-                global_check_OK=False
-                failure_reason = str(my_info)
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)                
-            elif my_info=="ERROR":
+    if cmg_workernode_k8s_interface_name:
+        applicant=nodes_in_scope(get_node_list('CMG'))
+        if use_node_probe:
+            prefetch_node_facts(applicant)
+        for i in range(0, len(applicant)):
+            add_to_report(level2*' '+"node: "+str(applicant[i])+'\n')              
+            interface_info=get_node_interface(applicant[i],cmg_workernode_k8s_interface_name)
+            # interface missing (gate) -> its mtu can not be checked: SKIPPED on this node
+            #  -> state not checked: tunnel interfaces (eg: tunl0) are often UNKNOWN iso UP
+            interface_gate=get_interface_gate(cmg_workernode_k8s_interface_name,interface_info,need_up=False)
+            if interface_info == NODE_UNREACHABLE:
+                skip_unreachable_node(level3,applicant[i],show_node=False)
+            elif interface_gate:
+                skip_node(level3,applicant[i],interface_gate,what='mtu')
+            elif isinstance(interface_info,str):
                 global_check_OK=False
-                failure_reason = ' -> SSH error occurred?'
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
+                failure_reason = get_node_error_reason(interface_info,applicant[i])
+                add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
                 if not create_report:
-                    return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)
+                    return("NOK","node: "+str(applicant[i])+' '+failure_reason)
             else:
-                # now loop throught the required sysctl values
-                for sysctl_key in sorted(cmg_worker_node_sysctl):
-                    if sysctl_key in my_info:
-                        #print(' -> value: '+str(cmg_worker_node_sysctl[sysctl_key]))
-                        matched_line = [line for line in my_info.split('\n') if sysctl_key in line]
-                        # check matched line with required input from CPC parameters:
-                        value_in_sysctl=matched_line[0].split('=')[1].lstrip().replace('\t',' ')
-                        if value_in_sysctl==str(cmg_worker_node_sysctl[sysctl_key]):
-                            msg_ok = 'sysctl value: ' + sysctl_key + ' = '+value_in_sysctl
-                            CPC_checker_report+=level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n'
-                        else:
-                            global_check_OK=False
-                            failure_reason = 'sysctl value: ' + sysctl_key + " = " + value_in_sysctl + ' -> not set to: ' + str(cmg_worker_node_sysctl[sysctl_key])
-                            CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                            if not create_report:
-                                return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)                            
-                    else:
-                        #print('ERROR: could not find key in sysctl')
-                        global_check_OK=False
-                        failure_reason = 'sysctl value: ' + sysctl_key + " does not exist in sysctl"
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                        if not create_report:
-                            return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)                                            
-    else:
-        global_check_OK=False
-        failure_reason="cmg_worker_node_sysctl is empty in CPC_checker_parms.py"
-        CPC_report(level2,failure_reason,check_failed)
-        if not create_report:
-            return("NOK",failure_reason)        
-            
-    if global_check_OK:
-        return('OK')
-    else:
-        return("NOK",failure_reason)    
-    
-def check_CMG_worker_nodes_ipvlan_interfaces():
-
-    global CPC_checker_report  
-
-    global_check_OK=True      
-
-    if cmg_ipvlan_interface_list:
-        for i in range(0, len(list_CMG_workers_IPVLAN)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_CMG_workers_IPVLAN[i])+'\n'
-            #### get value:        
-            for interface in range(0, len(cmg_ipvlan_interface_list)):
-                # check 1: interface up and running?
-                ####################################
-                #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + cmg_sriov_interface_list[interface] + '" |grep \'UP,BROADCAST,RUNNING\'"'
-                # if no ifconfig on the worker nodes - change1/2:
-                cmd_to_exec='"sudo ip a show "' + cmg_ipvlan_interface_list[interface]                
-                #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + cmg_ipvlan_interface_list[interface]
-                if login_worker_nodes_with_SSHKEY:
-                    my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_CMG_workers_IPVLAN[i])+' '+cmd_to_exec,True)
-                else:
-                    if skip_username_worker_node_to_ssh:        
-                        my_info=get_Popen_info('ssh -q '+str(list_CMG_workers_IPVLAN[i])+' '+cmd_to_exec,True)
-                    else:
-                        my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_CMG_workers_IPVLAN[i])+' '+cmd_to_exec,True)
-                #print(' -> my info:',str(my_info)+'FFFFFFF')
-                if my_info.startswith("ERROR:"):
-                    global_check_OK=False
-                    failure_reason = str(my_info)
-                    CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                    if not create_report:
-                        return("NOK","node: "+str(list_CMG_workers_IPVLAN[i])+' '+failure_reason)                
-                elif my_info=="ERROR":
-                    global_check_OK=False
-                    failure_reason = ' -> SSH error occurred?'
-                    CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                    if not create_report:
-                        return("NOK","node: "+str(list_CMG_workers_IPVLAN[i])+' '+failure_reason)
-                else:
-                    # check whether interface is UP and RUNNING:
-                    # if no ifconfig on the worker nodes - change2/2:
-                    if not "state UP" in my_info:                    
-                    #if not "UP,BROADCAST,RUNNING" in my_info:
-                        failure_reason = 'does not have interface: ' + cmg_ipvlan_interface_list[interface] + " UP & RUNNING"
-                        global_check_OK=False
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                        if not create_report:
-                            return("NOK","node: "+str(list_CMG_workers_IPVLAN[i])+' '+failure_reason)
-                    else:
-                        # sriov interface is up and running
-                        msg_ok = 'has interface: ' + cmg_ipvlan_interface_list[interface]+' -> UP & RUNNING'
-                        CPC_checker_report+=level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n'   
-    else:
-        global_check_OK=False
-        failure_reason="cmg_ipvlan_interface_list is empty in CPC_checker_parms.py"
-        CPC_report(level2,failure_reason,check_failed)
-        if not create_report:
-            return("NOK",failure_reason)        
-            
-    if global_check_OK:
-        return('OK')
-    else:
-        return("NOK",failure_reason)    
-
-def check_CMG_worker_nodes_k8s_cluster_CSF_mtu_size():
-
-    # CSF: check whether k8s cluster interface has got correct mtu size
-    # worker node k8s cluster interface name
-    # eg:   calico  -> tunl0
-    #       cilium  -> cilium_host
-    # cmg_workernode_k8s_interface_name='tunl0'
-    # cmg_CSF_mtu_size=9000
-
-    global CPC_checker_report  
-
-    global_check_OK=True      
-
-    if cmg_workernode_k8s_interface_name:
-        for i in range(0, len(list_CMG_workers)):
-            CPC_checker_report+=level2*' '+"node: "+str(list_CMG_workers[i])+'\n'              
-            cmd_to_exec='"sudo ip a show "' + cmg_workernode_k8s_interface_name               
-            #cmd_to_exec='"sudo /usr/sbin/ifconfig "' + cmg_ipvlan_interface_list[interface]
-            if login_worker_nodes_with_SSHKEY:
-                my_info=get_Popen_info('ssh -q -i '+sshkey+' '+worker_node_username+'@'+str(list_CMG_workers[i])+' '+cmd_to_exec,True)
-            else:
-                if skip_username_worker_node_to_ssh:        
-                    my_info=get_Popen_info('ssh -q '+str(list_CMG_workers[i])+' '+cmd_to_exec,True)
-                else:
-                    my_info=get_Popen_info('ssh -q '+worker_node_username+'@'+str(list_CMG_workers[i])+' '+cmd_to_exec,True)
-            #print(' -> my info:',str(my_info)+'FFFFFFF')
-            if my_info.startswith("ERROR:"):
-                global_check_OK=False
-                failure_reason = str(my_info)
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)                
-            elif my_info=="ERROR":
-                global_check_OK=False
-                failure_reason = ' -> SSH error occurred?'
-                CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                if not create_report:
-                    return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)
-            else:
-                # check 1: interface up and running?
-                ####################################             
-                # check whether interface is UP and RUNNING:
-                #  -> command: ip link ls up |grep cmg_workernode_k8s_interface_name
-                #if not "UP,BROADCAST,RUNNING" in my_info:
-                # if not "state UP" in my_info:                                        
-                    # failure_reason = 'does not have interface: ' + cmg_workernode_k8s_interface_name + " UP & RUNNING"
-                    # global_check_OK=False
-                    # CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
-                    # if not create_report:
-                        # return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)
-                # else:
-                    # # sriov interface is up and running
-                    # CPC_checker_report+=level3*' '+'has interface: ' + cmg_workernode_k8s_interface_name +' \n'
-                    # CPC_checker_report+=level4*' '+'UP & RUNNING'.ljust(dotline_length-level4+level2,'.')+' OK\n'
-                    # check 2: mtu size ok?
-                    #######################
-                    interface_mtu_size=my_info.split()[my_info.split().index("mtu")+1]
-                    if not int(interface_mtu_size) >= cmg_CSF_mtu_size:
+                # check 1: interface up and running?
+                ####################################             
+                # check whether interface is UP and RUNNING:
+                #  -> command: ip link ls up |grep cmg_workernode_k8s_interface_name
+                #if not "UP,BROADCAST,RUNNING" in my_info:
+                # if not "state UP" in my_info:                                        
+                    # failure_reason = 'does not have interface: ' + cmg_workernode_k8s_interface_name + " UP & RUNNING"
+                    # global_check_OK=False
+                    # CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
+                    # if not create_report:
+                        # return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)
+                # else:
+                    # # sriov interface is up and running
+                    # CPC_checker_report+=level3*' '+'has interface: ' + cmg_workernode_k8s_interface_name +' \n'
+                    # CPC_checker_report+=level4*' '+'UP & RUNNING'.ljust(dotline_length-level4+level2,'.')+' OK\n'
+                    # check 2: mtu size ok?
+                    #######################
+                    interface_mtu_size=interface_info['mtu']
+                    if not int(interface_mtu_size) >= cmg_CSF_mtu_size:
                         global_check_OK=False
                         failure_reason = 'mtu = ' + str(interface_mtu_size) + ' (NOK: is NOT above: '+str(cmg_CSF_mtu_size)+')'
-                        CPC_checker_report+=level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n'
+                        add_to_report(level3*' '+failure_reason.ljust(dotline_length-level3+level2,'.')+' FAILED\n')
                         if not create_report:
-                            return("NOK","node: "+str(list_CMG_workers[i])+' '+failure_reason)
+                            return("NOK","node: "+str(applicant[i])+' '+failure_reason)
                     else:
                         # mtu size is OK
                         msg_ok = 'mtu = ' + str(interface_mtu_size) + ' (OK: is above or equal to: '+str(cmg_CSF_mtu_size)+')'
-                        CPC_checker_report+=level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n'
+                        add_to_report(level3*' '+msg_ok.ljust(dotline_length-level3+level2,'.')+' OK\n')
     else:
         global_check_OK=False
         failure_reason="cmg_workernode_k8s_interface_name is empty in CPC_checker_parms.py"
@@ -1403,6 +2910,7 @@ def check_CMG_worker_nodes_k8s_cluster_CSF_mtu_size():
     else:
         return("NOK",failure_reason)   
     
+
 def print_list_overview(list_to_print,list_description):
 
     descr='-> '+list_description+': '
@@ -1414,18 +2922,24 @@ def print_list_overview(list_to_print,list_description):
             for node in range(1, len(list_to_print)):
                 print(' '*30+list_to_print[node])
        
-def progressbar(it, prefix="", size=40, file=sys.stdout):
-    count = len(it)
-    def show(j):
+def progressbar(it, prefix="", size=40, file=sys.stdout, count=None, eta=None):
+    # it: list, or generator with count items (eg: the checks in the order they finish)
+    # eta: function -> expected remaining seconds (None: unknown)
+    count = len(it) if count is None else count
+    def show(j,name):
         x = int(size*j/count)
+        my_eta = eta() if eta else None
+        if my_eta is not None and j < count:
+            name = ('ETA: '+format_duration(my_eta)+' ').ljust(12)+name
         #file.write("%s[%s%s] %i/%i\r" % (prefix, "#"*x, "."*(size-x), j, count))
         #file.write("%s[%s%s] %i/%i %s\r" % (prefix, "#"*x, "."*(size-x), j, count,str(it[j].__name__).ljust(70)))
-        file.write("%s[%s%s] %i/%i %s\r" % (prefix, "#"*x, "."*(size-x), j, count,str(it[j-1].__name__).ljust(70)))
+        file.write("%s[%s%s] %i/%i %s\r" % (prefix, "#"*x, "."*(size-x), j, count,name.ljust(70)))
         file.flush()        
-    #show(0)
+    if eta and eta() is not None:
+        show(0,'')
     for i, item in enumerate(it):
         yield item
-        show(i+1)
+        show(i+1,str(getattr(item,'__name__',item)))
     # remove last called check from progress bar:
     file.write("%s[%s] %i/%i %s\r" % (prefix, "#"*size, count, count,''.ljust(70)))
     file.write("\n")
@@ -1448,8 +2962,7 @@ def create_report_header():
         # no ANTHOS version:
         # CPC_checker_report += 'Platform:'.ljust(25)+'Google Cloud Platform (Anthos)\n'
         # also show ANTHOS version:
-        cmd="CLUSTERNAME=`kubectl config view -o=jsonpath='{.clusters[0].name}'`;FIRSTHEALTHYNODE=`kubectl get nodes|grep Ready|head -n1|cut -d' ' -f1`;CLUSTERNAMESPACE=`kubectl get node $FIRSTHEALTHYNODE --show-labels |grep -oP 'namespace=\K.*'|cut -d',' -f1`;kubectl get cluster $CLUSTERNAME -n $CLUSTERNAMESPACE -o yaml| awk '/^  anthosBareMetalVersion:/ {print $2}'|head -n1"
-        ANTHOS_VERSION=get_Popen_info(cmd,True)
+        ANTHOS_VERSION=get_platform_fact('anthos_version')
         if ANTHOS_VERSION=='':
             ANTHOS_VERSION='Unknown -> cluster resource not readable via this KUBECONFIG (need admin cluster KUBECONFIG...)'
         CPC_checker_report_header += 'Platform:'.ljust(25)+'Google Cloud Platform (Anthos) - version: '+str(ANTHOS_VERSION)+'\n'
@@ -1460,11 +2973,23 @@ def create_report_header():
     elif target_platform == 'k8s':
         CPC_checker_report_header += 'Platform:'.ljust(25)+'native k8s platform\n'
     # get K8s version:
-    my_info = get_Popen_info(cmd_start_kubectl+"version --short")
-    k8s_version = my_info.splitlines()
+    k8s_version = get_platform_fact('k8s_version')
     CPC_checker_report_header += 'K8s version:'.ljust(25)+k8s_version[0]+'\n'.ljust(26)+k8s_version[1]+'\n'
     CPC_checker_report_header += 'Start time:'.ljust(25) + time.strftime("%Y-%b-%d %H:%M:%S") + '\n\n'
 
+def get_platform_fact(name):
+
+    # platform facts: asked to the cluster on 1st use, kept for the next runs in the same run context
+    #   k8s_version    : kubectl version --short (lines)
+    #   anthos_version : anthosBareMetalVersion of the cluster resource (via the 1st healthy node)
+    if name not in platform_facts:
+        if name == 'k8s_version':
+            platform_facts[name]=get_Popen_info(kubectl_argv('version','--short')).splitlines()
+        elif name == 'anthos_version':
+            cmd="CLUSTERNAME=`kubectl config view -o=jsonpath='{.clusters[0].name}'`;FIRSTHEALTHYNODE=`kubectl get nodes|grep Ready|head -n1|cut -d' ' -f1`;CLUSTERNAMESPACE=`kubectl get node $FIRSTHEALTHYNODE --show-labels |grep -oP 'namespace=\K.*'|cut -d',' -f1`;kubectl get cluster $CLUSTERNAME -n $CLUSTERNAMESPACE -o yaml| awk '/^  anthosBareMetalVersion:/ {print $2}'|head -n1"
+            platform_facts[name]=get_Popen_info(cmd,True)
+    return(platform_facts[name])
+
 def create_report_header_header(text_in_header):
     report_header_header = ''
     report_header_header += '\n'+'*'*report_header_length+'\n'
@@ -1492,81 +3017,126 @@ def create_report_extra_info():
     global CPC_checker_report_extra_info
 
     CPC_checker_report_extra_info=''
-    CPC_checker_report_extra_info+=create_list_overview(list_workers,'Worker nodes')
-    CPC_checker_report_extra_info+=create_list_overview(list_NRD_workers,'NRD worker nodes')
-    CPC_checker_report_extra_info+=create_list_overview(list_AMF_workers,'AMF worker nodes')
-    CPC_checker_report_extra_info+=create_list_overview(list_CMG_workers,'CMG worker nodes')
-    CPC_checker_report_extra_info+=create_list_overview(list_CMG_workers_SRIOV,'CMG worker nodes SRIOV')
-    CPC_checker_report_extra_info+=create_list_overview(list_CMG_workers_IPVLAN,'CMG worker nodes IPVLAN')
+    # only the node lists the checks needed (lazy discovery, see get_node_list)
+    for my_role,my_description in NODE_ROLES:
+        if my_role in node_lists:
+            CPC_checker_report_extra_info+=create_list_overview(node_lists[my_role],my_description)
     CPC_checker_report_extra_info+=create_list_overview(nodes_to_skip,'skipped nodes')
     if checks_to_skip:  # list not empty:
         CPC_checker_report_extra_info+=create_list_overview(checks_to_skip,'skipped checks')   
 
-if __name__ == "__main__":
-
-    parser = argparse.ArgumentParser()
-    parser.add_argument("-i","--sshkey",     help= "provide ssh key to access the cluster nodes")
-    parser.add_argument("-v","--verbose",    help= "Add output verbosity -> report with details will be shown", action="store_true")
-    parser.add_argument("-p","--platform",   choices=['ncs', 'os', 'gcp','eccd','k8s'], help="Add target platform: ncs, os (openshift), gcp (Google Cloud Platform Anthos), eccd (E// CCD) or k8s (native k8s)")
-    parser.add_argument("-l","--listchecks", help= "Get an overview of implemented checks", action="store_true")
-    parser.add_argument("-c","--check",      help= "Give 1x check to be performed (only 1x check!)")
-    parser.add_argument("-n","--nodeinfo",   help= "Give overview of nodes (capacity cpu, mem, versions, OS, ...)", action="store_true")
-    group = parser.add_mutually_exclusive_group()
-    group.add_argument("-s","--skipnode",   help= "Skip 1x node when running checks")
-    group.add_argument("-o","--onlynode",   help= "Only run checks on 1x specific node")
-    #parser.add_argument("-d","--debug",   help= "Enter debug mode", action="store_true")
-    #parser.add_argument("-t","--table",   help= "Print cluster information", action="store_true")
-    args = parser.parse_args()
-    
-    if args.listchecks:
-        list_of_checks = []
-        for key, value in list(locals().items()):
-            if callable(value) and value.__module__ == __name__:
-                if key.startswith("check_"):
-                    list_of_checks.append(key)
-        list_of_checks.sort()
-        # if amf_ipvlan_interface_list has not been defined, you can't do the check... so remove it from the list:
-        if not amf_ipvlan_interface_list:
-            list_of_checks.remove('check_AMF_worker_nodes_ipvlan_interfaces')
-        # remove this dummy test
-        list_of_checks.remove('check_test')    
-        print('\nOverview of checks that can be performed:')
-        print('*****************************************')
-        for i in range(0,len(list_of_checks)):
-            print('  '+list_of_checks[i])
-        print('')
-        sys.exit()
-    
-    if args.sshkey == None:
-        # login to worker nodes with SSH key:
-        login_worker_nodes_with_SSHKEY = False     
-    else:
-        login_worker_nodes_with_SSHKEY = True
-        sshkey = args.sshkey
-
-    if args.platform is not None:
-        target_platform = args.platform
-
-    CPC_checker_report = ''
-    if args.verbose:
-        create_report = True
-        create_report_header()
-    else:
-        create_report = False
-
-    # check target_platform is a supported one:
-    target_plaform=target_platform.lower()
-    if target_plaform not in ['ncs','os','gcp','eccd','k8s']:
-        print("\n ERROR: "+target_plaform+" is not a supported target platform...")
-        print(" It should be one of the following values:\n")
-        print("  - ncs     : Nokia Container Services (NCS)")
-        print("  - os      : RedHat's OpenShift")
-        print("  - gcp     : Google Cloud Platform (Anthos)")
-        print("  - eccd    : Ericson's Cloud Container Distribution")
-        print("  - k8s     : native k8s platform")
-        print("\n -> Please correct the CPC_checker_parms.py file.\n")
-        sys.exit()
-
+def resolve_cluster_profile(profile_name,seen=()):
+
+    # cluster profile + the profile(s) it inherits from (inherits: name of another cluster profile)
+    if profile_name in seen:
+        raise ValueError('cluster_profiles: inheritance loop: '+' -> '.join(seen+(profile_name,)))
+    profile=cluster_profiles[profile_name]
+    if not profile.get('inherits'):
+        return(profile)
+    my_profile=dict(resolve_cluster_profile(profile['inherits'],seen+(profile_name,)))
+    my_parms=dict(my_profile.get('parms',{}))
+    my_parms.update(profile.get('parms',{}))
+    my_profile.update(profile)
+    my_profile['parms']=my_parms
+    return(my_profile)
+
+def get_cluster_parms(profile_name,profile):
+
+    # parameters of 1x cluster profile: parms overrides + kubeconfig/context (kubectl options) + platform
+    my_parms=dict(profile.get('parms',{}))
+    my_config=load_config(profile.get('config'),my_parms)
+    my_cmd_start_kubectl=my_config['cmd_start_kubectl'].rstrip()
+    if profile.get('kubeconfig'):
+        my_cmd_start_kubectl+=' --kubeconfig='+shlex.quote(profile['kubeconfig'])
+    if profile.get('context'):
+        my_cmd_start_kubectl+=' --context='+shlex.quote(profile['context'])
+    my_parms['cmd_start_kubectl']=my_cmd_start_kubectl+' '
+    if profile.get('platform'):
+        my_parms['target_platform']=profile['platform']
+    # 1x report file per cluster:
+    my_parms.setdefault('REPORT_FILE_PREFIX',my_config['REPORT_FILE_PREFIX']+'_'+profile_name)
+    return(my_parms)
+
+def run_profile(profile_name,profile,argv,capture_output=True):
+
+    # run the checks for 1x profile in its own copy of this script (own config, caches and report)
+    #  -> capture_output: all output of the profile is collected and returned together with the results
+    #     print of the copy writes to my_output (not redirect_stdout: sys.stdout is shared by the clusters running in parallel)
+    my_output=io.StringIO()
+    my_profile={'name':profile_name,'config':profile.get('config'),'parms':profile.get('parms',{}),'argv':list(argv),
+                'capture_output':capture_output}
+    if profile.get('sshkey'):
+        my_profile['argv']+=['-i',profile['sshkey']]
+    my_globals={'cluster_profile':my_profile}
+    if capture_output:
+        my_globals['print']=lambda *x,**y: print(*x,**dict(y,file=my_output))
+    my_result={'name':profile_name,'output':my_output,'status':None}
+    try:
+        my_result['status']=runpy.run_path(os.path.abspath(__file__),run_name='__main__',init_globals=my_globals)
+    except SystemExit:
+        # script stopped (eg: no AMF worker nodes found) -> see its output
+        pass
+    except Exception as my_error:
+        my_output.write('\n ERROR: '+type(my_error).__name__+': '+str(my_error)+'\n')
+    return(my_result)
+
+def run_clusters(profile_names,argv,config_file=None):
+
+    # --clusters: run the checks for several clusters at the same time (max cluster_max_parallel)
+    #  -> output of each cluster + a merged summary
+    #  -> config_file (--config): profile file used by the clusters without a config of their own
+    #  -> --export-facts: the facts of all clusters in 1x file (export_facts_path)
+    #  -> --trace: the spans of all clusters in 1x file (trace_path), 1x process per cluster
+    if 'all' in profile_names:
+        profile_names=list(cluster_profiles)
+    my_profiles={}
+    my_errors=[]
+    for profile_name in profile_names:
+        if profile_name not in cluster_profiles:
+            my_errors.append("cluster profile '"+profile_name+"' not found in cluster_profiles")
+            continue
+        # config of all clusters is validated before any cluster is checked:
+        try:
+            my_profile=dict(resolve_cluster_profile(profile_name))
+            my_profile.setdefault('config',config_file)
+            my_profile['parms']=get_cluster_parms(profile_name,my_profile)
+            my_profiles[profile_name]=my_profile
+        except ValueError as my_error:
+            my_errors+=[profile_name+': '+x for x in str(my_error).splitlines()]
+    if my_errors:
+        print('\n ERROR: invalid config:\n'+''.join('   - '+x+'\n' for x in my_errors))
+        sys.exit(1)
+    with ThreadPoolExecutor(max_workers=cluster_max_parallel) as executor:
+        my_results=list(executor.map(lambda x: run_profile(x,my_profiles[x],argv),profile_names))
+
+    cluster_summary='\n'
+    longest_name=len(max(profile_names, key=len))
+    for my_result in my_results:
+        cluster_summary+=create_report_header_header('Cluster: '+my_result['name'])
+        cluster_summary+=my_result['output'].getvalue()
+    cluster_summary+=create_report_header_header('Summary of all clusters ['+str(len(my_results))+']:')
+    for my_result in my_results:
+        my_status=my_result['status']
+        if my_status is None:
+            cluster_summary+=' - '+my_result['name'].ljust(longest_name)+' : ABORTED -> see output of the cluster\n'
+            continue
+        my_counts=(str(len(my_status['checks_OK']))+' OK, '+str(len(my_status['checks_NOK'])//2)+' FAILED, '
+                   +str(len(my_status['checks_NA']))+' N/A, '+str(len(my_status['checks_SKIPPED'])//2)+' SKIPPED, '
+                   +str(len(my_status['unreachable_nodes']))+' unreachable nodes')
+        if my_status.get('REPORT_FILENAME'):
+            my_counts+=' -> '+my_status['REPORT_FILENAME']
+        cluster_summary+=' - '+my_result['name'].ljust(longest_name)+' : '+my_counts+'\n'
+        for i in range(0,len(my_status['checks_NOK']),2):
+            cluster_summary+=' '*(longest_name+6)+'FAILED: '+my_status['checks_NOK'][i]+' : '+my_status['checks_NOK'][i+1]+'\n'
+    print(cluster_summary)
+    if export_facts_path:
+        export_facts([x for y in my_results if y['status'] for x in y['status']['get_fact_rows'](y['name'])])
+    if trace_path:
+        export_trace([(y['name'],y['status']['trace_events']) for y in my_results if y['status']])
+
+def get_checks():
+
+    # all checks to run with this config (minus checks_to_skip), in the order they are run
     # GLOBAL CHECKS:
     ################
 
@@ -1655,19 +3225,8 @@ if __name__ == "__main__":
 
     # CHECK OS of WORKER NODES: 
     ###########################
-    #FIRSTHEALTHYNODE=`kubectl get nodes|grep Ready|head -n1|cut -d' ' -f1`;kubectl get node $FIRSTHEALTHYNODE -o custom-columns=OS:.status.nodeInfo.osImage --no-headers
-    
-    # if OS is not RHEL or Centos -> remove check on sysctl kernel.sched_rt_runtime_us': -1 
-    # -> only checking 1st label of amfnodes - I expect all worker nodes for AMF having the same OS
-    cmd='FIRSTHEALTHYNODE=`'+cmd_start_kubectl+' get nodes -l '+labels_amfnode[0]+'|grep Ready|head -n1|cut -d' ' -f1`;kubectl get node $FIRSTHEALTHYNODE -o custom-columns=OS:.status.nodeInfo.osImage --no-headers'
-    my_workerNode_OS=get_Popen_info(cmd)
-    # Red Hat -> Red Hat Enterprise Linux 8.4 (Ootpa)
-    match_OS=['Red Hat','CentOS']
-    amf_worker_node_OS_RHEL_or_CentOS=False
-    if not(any(x in my_workerNode_OS for x in match_OS)):
-        amf_worker_node_sysctl.pop("kernel.sched_rt_runtime_us",None)
-    else:
-        amf_worker_node_OS_RHEL_or_CentOS=True
+    # -> OS image, kernel and container runtime per node out of the cluster snapshot (see fetch_node_status)
+    #    checks (or sysctl values) which do not apply to a node are N/A for that node
         
     # SRIOV interfaces checken?    
     # -> config map describes SRIOV implementation:   k describe -n kube-system cm sriovdp-config 
@@ -1749,10 +3308,1127 @@ if __name__ == "__main__":
 
     #print('\n-> to_check: '+str(to_check))    
 
+    if run_checks_alphabetically:
+        # order checks alphabetically:
+        # first back to strings, order them and then back to functions:
+        temp_list=[]
+        for i in range(0,len(to_check)):
+            temp_list.append(to_check[i].__name__)
+        
+        temp_list.sort()
+
+        to_check=[]
+        for i in range(0,len(temp_list)):
+            to_check.append(eval(temp_list[i]))
+
+    return(to_check)
+
+def build_node_lists(onlynode=None,skipnode=None,nodes=None):
+
+    # node lists of all roles -> lazy discovery: each list is only built when a check needs it (see get_node_list)
+    #  onlynode (-o), skipnode (-s) and nodes (API: only these nodes) are applied to the lists when they are built
+    if skipnode and skipnode not in nodes_to_skip:
+        nodes_to_skip.append(skipnode)
+    with node_lists_lock:
+        node_lists.clear()
+        node_list_filter.update({'onlynode':onlynode,'nodes':nodes})
+
+def get_nodes_with_labels(labels):
+
+    # nodes having one of the labels (sorted, no duplicates)
+    return(sorted(set(x for my_label in labels for x in get_nodes_with_label(my_label))))
+
+def get_role_nodes(role):
+
+    # nodes of a role out of the labels in CPC_checker_parms.py (before -o/-s/nodes_to_skip and the ECCD IPs)
+    #  -> no labels_cmgnode_sriov: the CMG nodes (labels_cmgnode), no labels_cmgnode_ipvlan: the SRIOV nodes
+    #  -> CMG: labels_cmgnode + the SRIOV + the IPVLAN nodes
+    if role == 'CMG_SRIOV':
+        return(get_nodes_with_labels(labels_cmgnode_sriov if labels_cmgnode_sriov else labels_cmgnode))
+    if role == 'CMG_IPVLAN':
+        return(get_nodes_with_labels(labels_cmgnode_ipvlan) if labels_cmgnode_ipvlan else get_role_nodes('CMG_SRIOV'))
+    if role == 'CMG':
+        return(sorted(set(get_nodes_with_labels(labels_cmgnode)+get_role_nodes('CMG_SRIOV')+get_role_nodes('CMG_IPVLAN'))))
+    return(get_nodes_with_labels({'workers':labels_workernode,'NRD':labels_nrdnode,'AMF':labels_amfnode}[role]))
+
+def get_node_list(role):
+
+    # lazy discovery: nodes of a role (see NODE_ROLES), built on 1st use + kept until the next build_node_lists
+    with node_lists_lock:
+        if role not in node_lists:
+            node_lists[role]=discover_node_list(role)
+        return(node_lists[role])
+
+def discover_node_list(role):
+
+    # node list of a role: labels -> skipped nodes, -o, API nodes -> ECCD: IPs -> ssh pre-flight of its nodes
+    my_nodes=[x for x in get_role_nodes(role) if x not in nodes_to_skip]
+
+    # do all checks only on 1 node:
+    my_onlynode=node_list_filter['onlynode']
+    if my_onlynode and role in ('workers','AMF','CMG'):
+        my_nodes=[my_onlynode]
+    elif my_onlynode and role == 'NRD':
+        my_nodes=[x for x in [my_onlynode] if x in my_nodes]
+
+    # API: only these nodes (same node lists, without the other nodes)
+    if node_list_filter['nodes'] is not None:
+        my_nodes=[x for x in my_nodes if x in node_list_filter['nodes']]
+
+    # OS image, kernel, container runtime and IP of all nodes (kept for the next runs in the same run context):
+    if not node_status_by_name:
+        fetch_node_status()
+
+    # for ECCD: the node IPs instead of the hostnames
+    # kubectl describe node worker-pool1-6jvz816e-ccd0-mmt3-tenant1-testing | grep 'InternalIP'|awk '{print $2}'
+    if target_platform=='eccd':
+        my_node_IPs=[]
+        for node in my_nodes:
+            my_node_IP=str(get_node_internal_IP(node)).rstrip('\n')
+            node_name_by_IP[my_node_IP]=node
+            my_node_IPs.append(my_node_IP)
+        my_nodes=my_node_IPs
+
+    # ssh pre-flight of the nodes (in parallel) -> unreachable nodes are skipped by all checks
+    if ssh_preflight:
+        preflight_nodes(my_nodes)
+    return(my_nodes)
+
+def order_checks(to_check):
+
+    # execution order: gating checks (prerequisites of other checks) first, every check after its prerequisites
+    my_names=[x.__name__ for x in to_check]
+    my_gating=[x for x in my_names if any(x in CHECK_DEPENDENCIES.get(y,[]) for y in my_names)]
+    my_order=[]
+    def add_check(name,seen):
+        if name in my_order or name in seen:
+            return
+        for my_prerequisite in CHECK_DEPENDENCIES.get(name,[]):
+            if my_prerequisite in my_names:
+                add_check(my_prerequisite,seen+(name,))
+        my_order.append(name)
+    for name in my_gating+[x for x in my_names if x not in my_gating]:
+        add_check(name,())
+    return([to_check[my_names.index(x)] for x in my_order])
+
+def get_check_priorities(to_check):
+
+    # longest job first: expected duration of the check (timing history) + the longest chain of checks waiting for it
+    #  -> a check without history: average of the known checks
+    my_history=get_timing_history()['checks']
+    my_names=[x.__name__ for x in to_check]
+    my_known=[my_history[x] for x in my_names if x in my_history]
+    my_expected={x:my_history.get(x,sum(my_known)/len(my_known) if my_known else 0) for x in my_names}
+    my_priorities={}
+    def get_priority(name,seen):
+        if name not in my_priorities:
+            my_dependents=[x for x in my_names if name in CHECK_DEPENDENCIES.get(x,[]) and x not in seen]
+            my_priorities[name]=my_expected[name]+max([get_priority(x,seen+(name,)) for x in my_dependents],default=0)
+        return(my_priorities[name])
+    for name in my_names:
+        get_priority(name,())
+    return(my_expected,my_priorities)
+
+def missing_node_roles(name):
+
+    # node list dependency of a check (see CHECK_NODE_DEPENDENCIES) not met -> reason why the check is SKIPPED
+    my_role=CHECK_NODE_DEPENDENCIES.get(name)
+    if my_role is None or get_node_list(my_role):
+        return([])
+    return(['no '+dict(NODE_ROLES)[my_role]+' found (labels in CPC_checker_parms.py, -o/-s, nodes_to_skip)'])
+
+def run_one_check(test,prerequisites_NOK,node_scope=None):
+
+    # 1x check (in the thread of the scheduler) -> result, report lines of the check, index of the node (node-major mode)
+    #  node_scope: node-major mode -> only do these nodes (see nodes_in_scope)
+    #  prerequisites_NOK: why the check can not be done (prerequisites not OK, no nodes of its role) -> SKIPPED
+    running_check.report=''
+    running_check.skipped_nodes={}
+    running_check.node_scope=node_scope
+    running_check.node_index=None
+    running_check.name=test.__name__
+    my_start=time.monotonic()
+    my_span=start_trace_span(test.__name__,'check',**({'node':', '.join(sorted(node_scope))} if node_scope else {}))
+    result_test=None
+    try:
+        if create_report and not node_scope:
+            CPC_report(level1,str(test.__name__))
+        if prerequisites_NOK:
+            result_test=('SKIPPED','due to '+', '.join(prerequisites_NOK))
+            CPC_report(level2,'not checked '+result_test[1],info_value='SKIPPED')
+        elif test.__name__ in carried_checks:
+            # --rerun-failed: passed in the earlier run -> its result + report lines
+            result_test,my_report=carried_checks[test.__name__]
+            add_to_report(my_report)
+        else:
+            result_test=test()
+            # nodes not checked again -> their result of the earlier run in the report
+            if not node_scope:
+                for node in sorted(x for x,y in carried_results.items() if test.__name__ in y):
+                    CPC_report(level2,'node: '+str(node)+' not checked again -> result of run '+str(carried_from['run_id']),info_value=carried_results[node][test.__name__][0])
+            with timing_lock:
+                if node_scope:
+                    check_durations[test.__name__]=check_durations.get(test.__name__,0)+time.monotonic()-my_start
+                elif running_check.node_index is None:
+                    check_durations[test.__name__]=time.monotonic()-my_start
+            # nodes skipped (unreachable) and no failure -> the check could not be done completely
+            if running_check.skipped_nodes and (result_test=='OK' or result_test[0]=='N/A'):
+                result_test=('SKIPPED',describe_skipped_nodes(running_check.skipped_nodes))
+        return(result_test,running_check.report,running_check.node_index)
+    finally:
+        running_check.report=None
+        running_check.skipped_nodes=None
+        running_check.node_scope=None
+        running_check.name=None
+        end_trace_span(my_span,result=result_test if result_test in (None,'OK') else result_test[0])
+
+def schedule_checks(to_check,results,reports,node_checks=None):
+
+    # run the checks, max check_max_parallel at the same time -> yields each check when it is done
+    #  -> a check is started when its prerequisites are done (see CHECK_DEPENDENCIES)
+    #  -> longest expected work first (see get_check_priorities), else gating checks first (see order_checks)
+    #  node_checks: node-major mode -> the checks are run without nodes, the per-node checks are added to it (see run_node_major)
+    my_names=[x.__name__ for x in to_check]
+    my_expected,my_priorities=get_check_priorities(to_check)
+    my_waiting=sorted(order_checks(to_check),key=lambda x: -my_priorities[x.__name__])
+    my_running={}
+    with ThreadPoolExecutor(max_workers=check_max_parallel) as executor:
+        while my_waiting or my_running:
+            my_ready=[x for x in my_waiting if all(y in results or y not in my_names for y in CHECK_DEPENDENCIES.get(x.__name__,[]))]
+            if not my_ready and not my_running:
+                # circular dependency -> just start the next one
+                my_ready=my_waiting[:1]
+            for test in my_ready[:check_max_parallel-len(my_running)]:
+                my_waiting.remove(test)
+                my_prerequisites_NOK=[x+' (not OK)' for x in CHECK_DEPENDENCIES.get(test.__name__,[]) if x in results and results[x]!='OK']
+                my_prerequisites_NOK+=missing_node_roles(test.__name__)
+                my_running[executor.submit(trace_wrap(run_one_check,test.__name__),test,my_prerequisites_NOK,None if node_checks is None else set())]=test
+            my_done,_=wait(my_running,return_when=FIRST_COMPLETED)
+            for future in my_done:
+                test=my_running.pop(future)
+                results[test.__name__],reports[test.__name__],my_node_index=future.result()
+                if node_checks is not None and my_node_index is not None:
+                    node_checks.append(test)
+                yield test
+
+def combine_node_results(node_runs):
+
+    # node-major mode: results of the check per node -> result of the check (same as the check run check by check)
+    my_results=[my_result for my_node,my_result,my_report in node_runs]
+    my_NOK=[x for x in my_results if x!='OK' and x[0] not in ('N/A','SKIPPED')]
+    if my_NOK:
+        # check by check: the last failure (report), or the first one (no report: stops at the first failure)
+        return(my_NOK[-1] if create_report else my_NOK[0])
+    # node skipped -> 'node(s) <node> skipped due to <reason>' (see describe_skipped_nodes)
+    my_skipped={my_node:my_result[1].split(' skipped due to ',1)[-1] for my_node,my_result,my_report in node_runs if my_result!='OK' and my_result[0]=='SKIPPED'}
+    if my_skipped:
+        return(('SKIPPED',describe_skipped_nodes(my_skipped)))
+    if all(x!='OK' and x[0]=='N/A' for x in my_results):
+        return(my_results[0])
+    return('OK')
+
+def get_all_nodes():
+
+    # all nodes of the node lists the checks needed so far (no duplicates)
+    #  -> node-major mode + sampling: the checks have already run without nodes -> the roles they use are known
+    return(list(dict.fromkeys(x for my_role,my_description in NODE_ROLES for x in node_lists.get(my_role,[]))))
+
+def run_node_checks(checks_of_node,runs,progress_file=sys.stdout):
+
+    # per node the given per-node checks back to back (1x ssh connection to the node, its node facts stay cached),
+    # max node_major_max_parallel nodes at the same time -> runs: (check, node) -> result, report lines, index of the node
+    my_nodes=order_nodes(checks_of_node)
+    def run_node(node):
+        with trace_span('node: '+str(node),'node',node=node):
+            for test in checks_of_node[node]:
+                runs[(test.__name__,node)]=run_one_check(test,[],{node})
+        return(node)
+    # ETA: expected ssh work of the nodes still to do, spread over the nodes done at the same time
+    my_history=get_timing_history()['nodes']
+    my_done=set()
+    def get_eta():
+        if not my_history:
+            return(None)
+        my_remaining=[my_history.get(x,0) for x in my_nodes if x not in my_done]
+        return(max(sum(my_remaining)/node_major_max_parallel,max(my_remaining,default=0)))
+    with ThreadPoolExecutor(max_workers=node_major_max_parallel) as executor:
+        my_futures=[executor.submit(trace_wrap(run_node,'node'),x) for x in my_nodes]
+        def nodes_done():
+            for future in as_completed(my_futures):
+                my_done.add(future.result())
+                yield future.result()
+        for node in progressbar(nodes_done(), "Nodes:    ", 40, progress_file, len(my_nodes), get_eta):
+            pass
+
+def combine_node_runs(node_checks,runs,results,reports):
+
+    # results + report per check out of the runs per node, report in the order of the node list of the check (same as check by check)
+    for test in node_checks:
+        my_node_runs=[]
+        for (name,node),(my_result,my_report,my_index) in runs.items():
+            if name == test.__name__ and my_index >= 0:
+                my_node_runs.append((my_index,node,my_result,my_report))
+        if not my_node_runs:
+            # no nodes -> keep the result of the run without nodes
+            continue
+        my_node_runs=[x[1:] for x in sorted(my_node_runs,key=lambda x: x[0])]
+        results[test.__name__]=combine_node_results(my_node_runs)
+        reports[test.__name__]=('-> '+test.__name__+':\n' if create_report else '')+''.join(x[2] for x in my_node_runs)
+
+def run_node_major(node_checks,results,reports,progress_file=sys.stdout):
+
+    # node-major mode: every node does all per-node checks
+    my_runs={}
+    run_node_checks({x:node_checks for x in get_all_nodes()},my_runs,progress_file)
+    combine_node_runs(node_checks,my_runs,results,reports)
+
+def run_sampled(node_checks,results,reports,progress_file=sys.stdout):
+
+    # --sample: nodes with the same fingerprint (see get_node_fingerprint) form a group, only sample_nodes_per_group
+    # nodes of each group are checked -> a check which is not OK/N/A on a sampled node is done on the whole group
+    my_groups={}
+    for node in get_all_nodes():
+        my_groups.setdefault(get_node_fingerprint(node),[]).append(node)
+    sampling_coverage.clear()
+    for my_group in my_groups.values():
+        sampling_coverage.append({'nodes':my_group,'sampled':my_group[:sample_nodes_per_group],'expanded':[]})
+    my_runs={}
+    run_node_checks({x:node_checks for my_group in sampling_coverage for x in my_group['sampled']},my_runs,progress_file)
+
+    # expand: the rest of the group for the checks which did not pass on a sampled node
+    my_expand={}
+    for my_group in sampling_coverage:
+        for test in node_checks:
+            my_sampled_runs=[my_runs[(test.__name__,x)] for x in my_group['sampled']]
+            if any(my_index >= 0 and my_result != 'OK' and my_result[0] != 'N/A' for my_result,my_report,my_index in my_sampled_runs):
+                my_group['expanded'].append(test.__name__)
+                for node in my_group['nodes'][sample_nodes_per_group:]:
+                    my_expand.setdefault(node,[]).append(test)
+    if my_expand:
+        run_node_checks(my_expand,my_runs,progress_file)
+    combine_node_runs(node_checks,my_runs,results,reports)
+
+    # coverage of each check in its report: nodes checked / nodes of the groups it applies to
+    for test in node_checks:
+        my_total=0
+        my_checked=0
+        for my_group in sampling_coverage:
+            if any(my_runs[(test.__name__,x)][2] >= 0 for x in my_group['sampled']):
+                my_total+=len(my_group['nodes'])
+                my_checked+=len([x for x in my_group['nodes'] if x in my_group['sampled'] or test.__name__ in my_group['expanded']])
+        if my_checked < my_total and create_report:
+            my_text='sampled: '+str(my_checked)+'/'+str(my_total)+' nodes checked (the other nodes are identical, see sampling coverage)'
+            reports[test.__name__]+=level2*' '+my_text.ljust(dotline_length,'.')+' SAMPLED\n'
+
+def describe_sampling_coverage():
+
+    # --sample: coverage of the groups of identical nodes -> summary
+    my_total=sum(len(x['nodes']) for x in sampling_coverage)
+    my_not_sampled=my_total-sum(len(x['sampled']) for x in sampling_coverage)
+    my_text=('\nSampling coverage (--sample): '+str(sum(len(x['sampled']) for x in sampling_coverage))+'/'+str(my_total)
+             +' nodes fully checked, '+str(len(sampling_coverage))+' groups of identical nodes, max '+str(sample_nodes_per_group)+' nodes sampled per group:\n')
+    for i,my_group in enumerate(sampling_coverage):
+        my_status=get_node_status(my_group['nodes'][0])
+        my_text+=(' - group '+str(i+1)+' : '+str(len(my_group['nodes']))+' nodes, sampled: '+', '.join(my_group['sampled'])
+                  +' -> OS: '+my_status['os_image']+', kernel: '+my_status['kernel']+', kubelet: '+my_status['kubelet']+'\n')
+        if my_group['expanded'] and len(my_group['nodes']) > len(my_group['sampled']):
+            my_text+='     expanded to all '+str(len(my_group['nodes']))+' nodes (failure on a sampled node) for: '+', '.join(sorted(my_group['expanded']))+'\n'
+    if my_not_sampled:
+        my_text+=' !! '+str(my_not_sampled)+' nodes not sampled: only checked by the checks which failed on a sampled node of their group\n'
+    return(my_text)
+
+def run_check_list(to_check,progress_file=sys.stdout):
+
+    # run the checks -> names of the checks OK, NOK (+ failure reason), N/A and SKIPPED (+ reason)
+    #  -> run at the same time + longest first (see schedule_checks), report + results in the order of to_check
+    global CPC_checker_report
+    checks_OK=[]
+    checks_NOK=[]
+    checks_NA=[]
+    checks_SKIPPED=[]
+    my_results={}
+    my_reports={}
+
+    # ETA: expected duration of the checks still to do, spread over the checks run at the same time
+    my_expected,_=get_check_priorities(to_check)
+    def get_eta():
+        if not get_timing_history()['checks']:
+            return(None)
+        my_remaining=[my_expected[x.__name__] for x in to_check if x.__name__ not in my_results]
+        return(max(sum(my_remaining)/check_max_parallel,max(my_remaining,default=0)))
+
+    # node-major mode + sampling: 1st the checks without nodes (cluster level checks + dependencies), then node by node
+    sampling_coverage.clear()
+    last_run['values'].clear()
+    my_node_checks=[] if execution_mode == 'node' or sample_nodes else None
+    for test in progressbar(schedule_checks(to_check,my_results,my_reports,my_node_checks), "Progress: ", 40, progress_file, len(to_check), get_eta):
+        #print("-> checking: "+str(test.__name__))
+        pass
+    if my_node_checks and sample_nodes:
+        run_sampled(my_node_checks,my_results,my_reports,progress_file)
+    elif my_node_checks:
+        run_node_major(my_node_checks,my_results,my_reports,progress_file)
+
+    for test in to_check:
+        if compact_report:
+            CPC_checker_report+=create_compact_report(my_reports[test.__name__])
+        else:
+            CPC_checker_report+=my_reports[test.__name__]
+        result_test=my_results[test.__name__]
+        if result_test=='OK':
+            checks_OK.append(test.__name__)
+        elif result_test[0]=='N/A':
+            checks_NA.append(test.__name__)
+        elif result_test[0]=='SKIPPED':
+            checks_SKIPPED.append(test.__name__)
+            checks_SKIPPED.append(result_test[1])
+        else:
+            checks_NOK.append(test.__name__)
+            checks_NOK.append(result_test[1])
+
+    save_timing_history()
+    last_run['reports']=my_reports
+
+    return(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
+
+def get_report_blocks(report):
+
+    # report lines of 1x check -> blocks: [node, lines] (node=None: line which is not about 1x node)
+    #  -> 'node: <node> ...' lines + the lines below them (level3, eg: the sysctl values of the node)
+    #  -> a line which does not start with ' ' or '->' is the rest of the line above (multi-line error of a command)
+    my_lines=[]
+    for line in report.splitlines():
+        if my_lines and line and not line.startswith((' ','->')):
+            my_lines[-1]+=' '+line.strip()
+        else:
+            my_lines.append(line)
+    my_blocks=[]
+    node=None
+    for line in my_lines:
+        my_text=line.strip()
+        if my_text.startswith('node: '):
+            node=my_text[6:].split(' ',1)[0].rstrip('.')
+            my_blocks.append([node,[line]])
+        elif node and line.startswith(level3*' '):
+            my_blocks[-1][1].append(line)
+        else:
+            node=None
+            my_blocks.append([None,[line]])
+    return(my_blocks)
+
+def get_node_results(report):
+
+    # report lines of 1x check -> status per node: {node: (worst status, text of the line with that status)}
+    my_results={}
+    for node,my_lines in get_report_blocks(report):
+        for line in my_lines:
+            my_match=RE_REPORT_STATUS.match(line)
+            if node and my_match:
+                my_status=my_match.group(2)
+                if node not in my_results or NODE_STATUS_RANK[my_status] > NODE_STATUS_RANK[my_results[node][0]]:
+                    my_results[node]=(my_status,my_match.group(1).strip())
+    return(my_results)
+
+def create_compact_report(report):
+
+    # compact_report: the nodes with the same outcome of a check -> 1x line 'N/M nodes: <outcome>' + the nodes
+    #  -> outcome: the node line without the node name + the lines below it (eg: the sysctl values)
+    #  -> an outcome of 1x node keeps its own lines, the lines which are not about 1x node stay as they are
+    #  -> the full lines per node: last_run['reports'] (history database, --diff-against, ...)
+    def get_outcome(node,my_lines):
+        my_first=my_lines[0].strip()[6+len(node):]
+        my_match=RE_REPORT_STATUS.match(my_first)
+        if my_match:
+            return(my_match.group(1).rstrip('. ').strip(),my_match.group(2),tuple(my_lines[1:]))
+        return(my_first.strip(),None,tuple(my_lines[1:]))
+
+    my_blocks=[(node,my_lines,get_outcome(node,my_lines) if node else None) for node,my_lines in get_report_blocks(report)]
+    my_outcomes={}
+    for node,_,my_key in my_blocks:
+        if node:
+            my_outcomes.setdefault(my_key,{})[node]=True
+    my_total=len(set(x for y in my_outcomes.values() for x in y))
+    my_shown_outcomes=set()
+    my_report=''
+    for node,my_lines,my_key in my_blocks:
+        if node is None:
+            my_report+=my_lines[0]+'\n'
+            continue
+        if my_key in my_shown_outcomes:
+            continue
+        my_shown_outcomes.add(my_key)
+        my_nodes=list(my_outcomes[my_key])
+        if len(my_nodes) == 1:
+            my_report+='\n'.join(my_lines)+'\n'
+            continue
+        my_text=(str(len(my_nodes))+'/'+str(my_total)+' nodes: '+my_key[0]).rstrip()
+        if my_key[1]:
+            my_report+=level2*' '+my_text.ljust(dotline_length,'.')+' '+my_key[1]+'\n'
+        else:
+            my_report+=level2*' '+my_text+'\n'
+        my_shown=', '.join(my_nodes[:compact_max_nodes_shown])
+        if len(my_nodes) > compact_max_nodes_shown:
+            my_shown+=', ... (+'+str(len(my_nodes)-compact_max_nodes_shown)+' more)'
+        my_report+=level3*' '+'-> '+my_shown+'\n'
+        my_report+=''.join(x+'\n' for x in my_lines[1:])
+    return(my_report)
+
+def open_history_db():
+
+    # history database (history_db) -> connection, the tables + indexes are created when they do not exist yet
+    os.makedirs(os.path.dirname(history_db) or '.',exist_ok=True)
+    my_db=sqlite3.connect(history_db,timeout=60)
+    for my_sql in HISTORY_SCHEMA:
+        my_db.execute(my_sql)
+    for my_table,my_column,my_type in HISTORY_NEW_COLUMNS:
+        if my_column not in [x[1] for x in my_db.execute('PRAGMA table_info('+my_table+')')]:
+            my_db.execute('ALTER TABLE '+my_table+' ADD COLUMN '+my_column+' '+my_type)
+    return(my_db)
+
+def get_run_check_results(checks_OK,checks_NOK,checks_NA,checks_SKIPPED):
+
+    # results of the checks of this run -> {check: (status, reason)}
+    return(dict([(x,('OK','')) for x in checks_OK]+[(x,('FAILED',y)) for x,y in zip(checks_NOK[0::2],checks_NOK[1::2])]
+                +[(x,('N/A','')) for x in checks_NA]+[(x,('SKIPPED',y)) for x,y in zip(checks_SKIPPED[0::2],checks_SKIPPED[1::2])]))
+
+def get_run_node_results(checks):
+
+    # results of the nodes of this run -> {(node, check): (status, value, line of the report)}
+    #  -> nodes not checked again (see carried_results): their results of that earlier run
+    my_results={}
+    for my_check in checks:
+        for node,(my_status,my_line) in get_node_results(last_run['reports'].get(my_check,'')).items():
+            my_value=last_run['values'].get(my_check,{}).get(node)
+            my_results[(node,my_check)]=(my_status,None if my_value is None else str(my_value),my_line)
+    for node,my_checks in carried_results.items():
+        for my_check,my_result in my_checks.items():
+            if my_check in checks:
+                my_results[(node,my_check)]=my_result
+    return(my_results)
+
+def get_check_report_lines(check):
+
+    # report lines of 1x check of this run, without the '-> check:' line (only there with -v)
+    my_report=last_run['reports'].get(check,'')
+    return(my_report[len('-> '+check+':\n'):] if my_report.startswith('-> '+check+':\n') else my_report)
+
+def get_node_state_key(node):
+
+    # state key of a node: what the results of the checks on the node depend on and is known without ssh to the node
+    #  -> node status of the cluster snapshot (versions, boot ID, labels, capacity) + the config (without nodes_to_skip)
+    #  -> the same key as in an earlier run: the node did not change (not rebooted, not upgraded, not relabeled)
+    my_config={x:y for x,y in parms_config.items() if x != 'nodes_to_skip'}
+    return(hashlib.sha1(json.dumps([get_node_status(node),my_config],sort_keys=True,default=str).encode('utf-8')).hexdigest())
+
+def store_run_history(started,checks_OK,checks_NOK,checks_NA,checks_SKIPPED,report_file=None):
+
+    # 1x run -> history database: status + reason + duration per check, status + value per node per check, ssh work per node,
+    # state key per node (--diff-against)
+    #  -> runs older than history_retention_days are removed (all clusters)
+    my_cluster=get_cluster_name()
+    my_started=time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(started))
+    my_results=get_run_check_results(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
+    try:
+        my_db=open_history_db()
+        try:
+            with my_db:
+                my_run_id=my_db.execute('INSERT INTO runs (cluster,started,duration,checks_ok,checks_failed,checks_na,checks_skipped,unreachable_nodes,report_file,argv) '
+                                        'VALUES (?,?,?,?,?,?,?,?,?,?)',
+                                        (my_cluster,my_started,round(time.time()-started,3),len(checks_OK),len(checks_NOK)//2,len(checks_NA),
+                                         len(checks_SKIPPED)//2,len(unreachable_nodes),report_file,' '.join(sys.argv))).lastrowid
+                my_db.executemany('INSERT INTO check_results (run_id,cluster,started,check_name,status,reason,duration,report) VALUES (?,?,?,?,?,?,?,?)',
+                                  [(my_run_id,my_cluster,my_started,x,y,z,last_run['durations']['checks'].get(x),get_check_report_lines(x))
+                                   for x,(y,z) in my_results.items()])
+                my_db.executemany('INSERT INTO node_results VALUES (?,?,?,?,?,?,?,?)',
+                                  [(my_run_id,my_cluster,my_started,x,y)+z for (x,y),z in get_run_node_results(my_results).items()])
+                my_db.executemany('INSERT INTO node_durations VALUES (?,?,?,?,?)',
+                                  [(my_run_id,my_cluster,my_started,x,round(y,3)) for x,y in last_run['durations']['nodes'].items()])
+                my_db.executemany('INSERT INTO node_states VALUES (?,?,?,?,?)',
+                                  [(my_run_id,my_cluster,my_started,x,get_node_state_key(x)) for x in get_all_nodes()])
+                if history_retention_days:
+                    my_oldest=time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(time.time()-history_retention_days*86400))
+                    for my_table in HISTORY_TABLES:
+                        my_db.execute('DELETE FROM '+my_table+' WHERE started < ?',(my_oldest,))
+        finally:
+            my_db.close()
+    except (sqlite3.Error,OSError) as my_error:
+        print('WARNING: could not save the run in the history database '+history_db+': '+str(my_error))
+
+def get_baseline_run(run):
+
+    # --diff-against: run of the history database -> {'run_id','started','report_file'}, None: not found
+    #   run: 'latest' (last run of this cluster), run id (see --history), start time (or the start of it) or report file
+    if not os.path.exists(history_db):
+        return(None)
+    my_db=open_history_db()
+    try:
+        my_sql='SELECT run_id,started,report_file FROM runs WHERE '
+        if run == 'latest':
+            my_row=my_db.execute(my_sql+'cluster = ? ORDER BY started DESC,run_id DESC LIMIT 1',(get_cluster_name(),)).fetchone()
+        elif run.isdigit():
+            my_row=my_db.execute(my_sql+'run_id = ?',(int(run),)).fetchone()
+        else:
+            my_row=my_db.execute(my_sql+"cluster = ? AND (started LIKE ? OR report_file LIKE ?) ORDER BY started DESC,run_id DESC LIMIT 1",
+                                 (get_cluster_name(),run+'%','%'+os.path.basename(run))).fetchone()
+    finally:
+        my_db.close()
+    return(dict(zip(['run_id','started','report_file'],my_row)) if my_row else None)
+
+def get_unchanged_nodes(baseline):
+
+    # diff_skip_unchanged_nodes: nodes with the same state key as in the baseline run -> {node: {check: (status, value, line)}}
+    #  -> checks which skipped the node (eg: unreachable) in the baseline run do the node again
+    my_db=open_history_db()
+    try:
+        my_keys=dict(my_db.execute('SELECT node,state_key FROM node_states WHERE run_id = ?',(baseline['run_id'],)))
+        my_rows=my_db.execute('SELECT node,check_name,status,value,detail FROM node_results WHERE run_id = ?',(baseline['run_id'],)).fetchall()
+    finally:
+        my_db.close()
+    my_unchanged={x:{} for x,y in my_keys.items() if node_name_by_IP.get(x,x) in node_status_by_name and get_node_state_key(x) == y}
+    for node,my_check,my_status,my_value,my_line in my_rows:
+        if node in my_unchanged and my_status != 'SKIPPED':
+            my_unchanged[node][my_check]=(my_status,my_value,my_line)
+    return({x:y for x,y in my_unchanged.items() if y})
+
+def get_failed_of_run(baseline):
+
+    # --rerun-failed: what is not done again from the baseline run -> (carried_checks, carried_results)
+    #  -> checks OK or N/A: not run again, their result + report lines are used
+    #  -> checks FAILED or SKIPPED: run again, but not on the nodes which passed them (OK or N/A)
+    #     (a check without -v stops at its 1st failing node: the nodes after it have no result and are done again)
+    my_db=open_history_db()
+    try:
+        my_checks=my_db.execute('SELECT check_name,status,reason,report FROM check_results WHERE run_id = ?',(baseline['run_id'],)).fetchall()
+        my_rows=my_db.execute('SELECT node,check_name,status,value,detail FROM node_results WHERE run_id = ?',(baseline['run_id'],)).fetchall()
+    finally:
+        my_db.close()
+    my_passed={x:('OK' if y == 'OK' else (y,z or 'not applicable'),w or '') for x,y,z,w in my_checks if y in ('OK','N/A')}
+    my_results={}
+    for node,my_check,my_status,my_value,my_line in my_rows:
+        if my_check not in my_passed and my_status in ('OK','N/A'):
+            my_results.setdefault(node,{})[my_check]=(my_status,my_value,my_line)
+    return(my_passed,my_results)
+
+def apply_carried_results(checks_OK,checks_NOK,checks_NA,checks_SKIPPED):
+
+    # the results of the nodes which were not checked again (see carried_results) count for the checks of this run
+    #  -> a check OK, N/A or SKIPPED (unreachable nodes) on the checked nodes, but FAILED on a node not checked again: FAILED
+    #  -> N/A on the checked nodes, but OK on a node not checked again: OK
+    my_skipped_nodes=[x for x,y in zip(checks_SKIPPED[0::2],checks_SKIPPED[1::2]) if y.startswith('node(s) ')]
+    for my_check in checks_OK+checks_NA+my_skipped_nodes:
+        my_failed=sorted(x for x,y in carried_results.items() if y.get(my_check,('',))[0] == 'FAILED')
+        if my_failed:
+            if my_check in my_skipped_nodes:
+                del checks_SKIPPED[checks_SKIPPED.index(my_check):checks_SKIPPED.index(my_check)+2]
+            else:
+                (checks_OK if my_check in checks_OK else checks_NA).remove(my_check)
+            checks_NOK+=[my_check,carried_results[my_failed[0]][my_check][2]+' (result of run '+str(carried_from['run_id'])+')']
+        elif my_check in checks_NA and any(y.get(my_check,('',))[0] == 'OK' for y in carried_results.values()):
+            checks_NA.remove(my_check)
+            checks_OK.append(my_check)
+    return(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
+
+def describe_carried_results():
+
+    # summary: results of an earlier run used in this run (not checked again)
+    my_text='\nResults of run '+str(carried_from['run_id'])+' ('+carried_from['started']+') used -> not checked again:\n'
+    if carried_checks:
+        my_text+=' - checks : '+str(len(carried_checks))+' (passed)\n'
+    if carried_results:
+        my_text+=(' - nodes  : '+str(len(carried_results))+' ('+str(sum(len(x) for x in carried_results.values()))+' results of nodes: '
+                  +('passed the failing checks' if carried_checks else 'did not change')+')\n')
+    return(my_text)
+
+def create_run_diff(checks_OK,checks_NOK,checks_NA,checks_SKIPPED):
+
+    # --diff-against: only what changed since the baseline run -> status of the checks, nodes added/removed,
+    # status + value per node per check (only for nodes with a result in both runs: without -v a check stops at its 1st failure)
+    my_db=open_history_db()
+    try:
+        my_old_checks={x:(y,z) for x,y,z in my_db.execute('SELECT check_name,status,reason FROM check_results WHERE run_id = ?',(diff_baseline['run_id'],))}
+        my_old_nodes={(x[0],x[1]):x[2:] for x in my_db.execute('SELECT node,check_name,status,value,detail FROM node_results WHERE run_id = ?',(diff_baseline['run_id'],))}
+        my_old_node_list=set(x for x, in my_db.execute('SELECT node FROM node_states WHERE run_id = ?',(diff_baseline['run_id'],)))
+    finally:
+        my_db.close()
+    my_checks=get_run_check_results(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
+    my_nodes=get_run_node_results(my_checks)
+    my_node_list=set(get_all_nodes())
+
+    my_text='\nChanges since run '+str(diff_baseline['run_id'])+' ('+diff_baseline['started']+(' -> '+diff_baseline['report_file'] if diff_baseline['report_file'] else '')+'):\n'
+    my_changes=''
+    for my_check in sorted(set(my_old_checks)|set(my_checks)):
+        my_old,my_new=my_old_checks.get(my_check,('not run','')),my_checks.get(my_check,('not run',''))
+        if my_old[0] != my_new[0]:
+            my_changes+=' - '+my_check+' : '+my_old[0]+' -> '+my_new[0]+(' : '+my_new[1] if my_new[1] else '')+'\n'
+    for node in sorted(my_node_list-my_old_node_list):
+        my_changes+=' - node added   : '+node+'\n'
+    for node in sorted(my_old_node_list-my_node_list):
+        my_changes+=' - node removed : '+node+'\n'
+    for (node,my_check) in sorted(set(my_old_nodes)&set(my_nodes)):
+        my_old,my_new=my_old_nodes[(node,my_check)],my_nodes[(node,my_check)]
+        if my_old[0] != my_new[0]:
+            my_changes+=' - node: '+node+' '+my_check+' : '+my_old[0]+' -> '+my_new[0]+' : '+my_new[2]+'\n'
+        elif my_old[1] != my_new[1]:
+            my_changes+=' - node: '+node+' '+my_check+' : value '+str(my_old[1])+' -> '+str(my_new[1])+'\n'
+    return(my_text+(my_changes or ' - no changes\n'))
+
+def create_history_report(report='runs',node=None,check=None,last_runs=30):
+
+    # --history: out of the history database, the last_runs runs of each cluster
+    #   runs    : the runs with their results
+    #   status  : status per node per check: the runs in which it changed -> eg: since when a node fails a check
+    #             (without node/check: only the ones which changed or are not OK in the last run)
+    #   slowest : the nodes (ssh work) + checks which took the longest on average
+    if not os.path.exists(history_db):
+        return('\nNo history yet: '+history_db+' does not exist\n')
+    my_runs='SELECT run_id FROM (SELECT run_id,ROW_NUMBER() OVER (PARTITION BY cluster ORDER BY started DESC,run_id DESC) AS n FROM runs) WHERE n <= ?'
+    my_filter=''
+    my_parms=[last_runs]
+    for my_column,my_value in (('node',node),('check_name',check)):
+        if my_value:
+            my_filter+=' AND '+my_column+' = ?'
+            my_parms.append(my_value)
+    my_db=open_history_db()
+    try:
+        if report == 'runs':
+            my_text='\nLast '+str(last_runs)+' runs per cluster ('+history_db+'):\n'
+            for my_row in my_db.execute('SELECT cluster,started,duration,checks_ok,checks_failed,checks_na,checks_skipped,unreachable_nodes,report_file '
+                                        'FROM runs WHERE run_id IN ('+my_runs+') ORDER BY cluster,started',(last_runs,)):
+                my_text+=(' - '+my_row[0]+' '+my_row[1]+' ('+format_duration(my_row[2])+') : '+str(my_row[3])+' OK, '+str(my_row[4])+' FAILED, '
+                          +str(my_row[5])+' N/A, '+str(my_row[6])+' SKIPPED, '+str(my_row[7])+' unreachable nodes'+(' -> '+my_row[8] if my_row[8] else '')+'\n')
+        elif report == 'status':
+            my_text='\nStatus per node per check over the last '+str(last_runs)+' runs per cluster ('+history_db+'):\n'
+            my_timelines={}
+            for my_row in my_db.execute('SELECT cluster,node,check_name,started,status,value,detail FROM node_results '
+                                        'WHERE run_id IN ('+my_runs+')'+my_filter+' ORDER BY cluster,node,check_name,started',my_parms):
+                my_timelines.setdefault(my_row[:3],[]).append(my_row[3:])
+            for (my_cluster,my_node,my_check),my_timeline in sorted(my_timelines.items()):
+                my_changes=[x for i,x in enumerate(my_timeline) if i == 0 or x[1] != my_timeline[i-1][1]]
+                if not (node or check) and len(my_changes) == 1 and my_timeline[-1][1] in ('OK','N/A'):
+                    continue
+                my_text+='-> '+my_cluster+': node: '+my_node+' '+my_check+':\n'
+                for my_started,my_status,my_value,my_detail in my_changes:
+                    my_text+=level2*' '+(my_started+' '+my_detail).ljust(dotline_length,'.')+' '+my_status+'\n'
+                my_since=len(my_timeline)-my_timeline.index(my_changes[-1])
+                my_text+=level2*' '+'-> '+my_timeline[-1][1]+' since '+my_changes[-1][0]+' ('+str(my_since)+'/'+str(len(my_timeline))+' runs)'+(
+                    ', last value: '+str(my_timeline[-1][2]) if my_timeline[-1][2] is not None else '')+'\n'
+        else:
+            my_text='\nSlowest nodes (ssh work) + checks over the last '+str(last_runs)+' runs per cluster ('+history_db+'):\n'
+            for my_title,my_table,my_column in (('nodes','node_durations','node'),('checks','check_results','check_name')):
+                if (my_column == 'node' and check) or (my_column == 'check_name' and node):
+                    continue
+                my_text+='-> '+my_title+' (average, max, runs):\n'
+                for my_row in my_db.execute('SELECT cluster,'+my_column+',AVG(duration),MAX(duration),COUNT(*) FROM '+my_table+' WHERE duration IS NOT NULL AND run_id IN ('
+                                            +my_runs+')'+my_filter+' GROUP BY cluster,'+my_column+' ORDER BY AVG(duration) DESC LIMIT '+str(HISTORY_SLOWEST_SHOWN),my_parms):
+                    my_text+=level2*' '+(my_row[0]+': '+my_row[1]).ljust(dotline_length,'.')+' '+format_duration(my_row[2])+', '+format_duration(my_row[3])+', '+str(my_row[4])+'\n'
+    finally:
+        my_db.close()
+    return(my_text)
+
+def create_test_status(checks_OK,checks_NOK,checks_NA,checks_SKIPPED):
+
+    # overview test status:
+    test_status=''
+    test_status+='\n\n'
+    total_tests=len(checks_OK)+len(checks_NOK)//2+len(checks_NA)+len(checks_SKIPPED)//2
+    test_status+='Successful tests ['+str(len(checks_OK))+'/'+str(total_tests)+']:'+'\n'
+    for i in range(0,len(checks_OK)):
+        test_status+=' - '+checks_OK[i]+'\n'
+
+    if len(checks_NOK)>1:    
+        test_status+='\nFailing tests    ['+str(len(checks_NOK)//2)+'/'+str(total_tests)+']:'+'\n'        
+        # print failing tests in nicer output:
+        temp_checks_NOK=[]
+        for i in range(0,len(checks_NOK),2):
+            temp_checks_NOK.append(checks_NOK[i])
+        # longest check:
+        longest_check=len(max(temp_checks_NOK, key=len))        
+        for i in range(0,len(checks_NOK),2):
+             test_status+=' - '+checks_NOK[i].ljust(longest_check)+' : '+checks_NOK[i+1]+'\n'
+
+    if checks_NA:
+        test_status+='\nNot applicable   ['+str(len(checks_NA))+'/'+str(total_tests)+']:'+'\n'
+        for i in range(0,len(checks_NA)):
+            test_status+=' - '+checks_NA[i]+'\n'
+
+    if checks_SKIPPED:
+        test_status+='\nSkipped tests    ['+str(len(checks_SKIPPED)//2)+'/'+str(total_tests)+']:'+'\n'
+        longest_check=len(max(checks_SKIPPED[0::2], key=len))
+        for i in range(0,len(checks_SKIPPED),2):
+            test_status+=' - '+checks_SKIPPED[i].ljust(longest_check)+' : '+checks_SKIPPED[i+1]+'\n'
+
+    if unreachable_nodes:
+        test_status+='\nUnreachable nodes ['+str(len(unreachable_nodes))+'] -> skipped by all checks:'+'\n'
+        longest_node=len(max(unreachable_nodes, key=len))
+        for node in sorted(unreachable_nodes):
+            test_status+=' - '+node.ljust(longest_node)+' : '+unreachable_nodes[node]+'\n'
+
+    if sampling_coverage:
+        test_status+=describe_sampling_coverage()
+
+    if carried_results or carried_checks:
+        test_status+=describe_carried_results()
+
+    test_status+=describe_admission_wait()
+    
+    test_status+='\n\n'
+
+    return(test_status)
+
+def forget_node(node):
+
+    # --shell refresh: forget what is known about 1x node (node facts, kubelet config, unreachable, ssh pre-flight)
+    for my_cache in (node_facts_cache,kubelet_configz_cache,unreachable_nodes):
+        my_cache.pop(node,None)
+    preflight_passed_nodes.discard(node)
+
+def reset_caches():
+
+    # forget what is known about the cluster (node lists, node facts, unreachable nodes, ...) -> next run starts from scratch
+    global node_labels_lines
+    node_labels_lines=None
+    for my_cache in (kubelet_configz_cache,node_name_by_IP,node_facts_cache,node_status_by_name,unreachable_nodes,preflight_passed_nodes,collected_facts,
+                     node_lists,platform_facts):
+        my_cache.clear()
+
+def close_run_context():
+
+    # end of a run context (see RunContext.close): close the ssh connections kept open (ControlMaster) + forget the caches
+    for node in sorted(ssh_control_nodes-set(unreachable_nodes),key=str):
+        my_argv=get_ssh_argv(node)
+        try:
+            subprocess.run(my_argv[:-1]+['-O','exit',my_argv[-1]],stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL,timeout=ssh_connect_timeout)
+        except (OSError,subprocess.TimeoutExpired):
+            pass
+    ssh_control_nodes.clear()
+    reset_caches()
+
+def execute_checks(checks=None,nodes=None,sshkey_file=None,verbose=False,refresh=False):
+
+    # 1x run of the checks in this run context (see run_checks)
+    global create_report,CPC_checker_report,login_worker_nodes_with_SSHKEY,sshkey
+    if refresh:
+        reset_caches()
+    login_worker_nodes_with_SSHKEY=sshkey_file is not None
+    sshkey=sshkey_file
+    create_report=verbose
+    CPC_checker_report=''
+    if create_report:
+        create_report_header()
+    to_check=get_checks()
+    if checks is not None:
+        my_unknown=[x for x in checks if not (x.startswith('check_') and callable(globals().get(x)))]
+        if my_unknown:
+            raise ValueError('unknown check(s): '+', '.join(my_unknown))
+        to_check=[globals()[x] for x in checks]
+    build_node_lists(nodes=nodes)
+    if checks is None and nodes is None and len(get_node_list('AMF'))==0:
+        raise ValueError('no AMF worker nodes found -> check labels_amfnode')
+    checks_OK,checks_NOK,checks_NA,checks_SKIPPED=run_check_list(to_check,io.StringIO())
+    return({'passed':checks_OK,
+            'failed':dict(zip(checks_NOK[0::2],checks_NOK[1::2])),
+            'not_applicable':checks_NA,
+            'skipped':dict(zip(checks_SKIPPED[0::2],checks_SKIPPED[1::2])),
+            'unreachable_nodes':dict(unreachable_nodes),
+            'summary':create_test_status(checks_OK,checks_NOK,checks_NA,checks_SKIPPED),
+            'report':CPC_checker_report})
+
+class RunContext:
+
+    # API run context (see run_checks): own copy of this script with its own config, caches, unreachable nodes, ssh
+    # connections and admission control -> only used via execute_checks/close, the copy itself is never handed out
+    #   -> isolation per copy: the checks still read module globals (of their copy), they do not get the run context
+    #   config: None (CPC_checker_parms.py), YAML/JSON profile file or dictionary with the parameters that differ
+    #   -> 'with RunContext(config) as context:' closes it at the end
+    def __init__(self,config=None):
+        my_profile={'name':'api','config':None,'parms':{},'argv':[],'capture_output':True}
+        if isinstance(config,str):
+            my_profile['config']=config
+        elif config:
+            my_profile['parms']=dict(config)
+        my_copy=runpy.run_path(os.path.abspath(__file__),run_name='cpc_run_context',init_globals={'cluster_profile':my_profile})
+        self._execute_checks=my_copy['execute_checks']
+        self._close=my_copy['close_run_context']
+        # the config of the run context (copy: changing it has no effect on the run context)
+        self.config=copy.deepcopy(my_copy['parms_config'])
+        self.closed=False
+
+    def execute_checks(self,checks=None,nodes=None,sshkey=None,verbose=False,refresh=False):
+        if self.closed:
+            raise ValueError('run context is closed')
+        return(self._execute_checks(checks,nodes,sshkey,verbose,refresh))
+
+    def close(self):
+        if not self.closed:
+            self._close()
+            self.closed=True
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self,*exc_info):
+        self.close()
+
+def describe_shell_nodes():
+
+    # --shell nodes: node lists per role + unreachable nodes
+    my_text=''
+    for my_role,my_description in NODE_ROLES:
+        my_nodes=get_node_list(my_role)
+        my_text+=' - '+my_description.ljust(23)+' : '+(', '.join(my_nodes) if my_nodes else '-')+'\n'
+    for node in sorted(unreachable_nodes):
+        my_text+=' !! '+node+' UNREACHABLE -> '+unreachable_nodes[node]+'\n'
+    return(my_text.rstrip('\n'))
+
+def describe_shell_facts(node,text=None):
+
+    # --shell facts: facts of the node out of the node probe (see flatten_node_facts) + the cluster snapshot
+    my_facts={'node/'+x:y for x,y in get_node_status(node).items() if not isinstance(y,dict)}
+    my_facts.update({'labels/'+x:y for x,y in get_node_status(node)['labels'].items()})
+    my_probe=get_node_facts(node)
+    if isinstance(my_probe,dict):
+        for my_section,my_values in flatten_node_facts(my_probe).items():
+            my_facts.update({my_section+x:y for x,y in my_values.items()})
+    my_names=sorted(x for x in my_facts if text is None or text in x)
+    my_text=''.join(' '+x+' = '+('' if my_facts[x] is None else str(my_facts[x]))+'\n' for x in my_names)
+    if isinstance(my_probe,str):
+        my_text+=' !! node probe: '+my_probe+'\n'
+    return(my_text.rstrip('\n') if my_text else ' no facts'+(' containing '+text if text else '')+' for node '+node)
+
+def run_shell_command(command,args):
+
+    # 1x command of the shell -> text to show (ValueError: wrong command)
+    global node_labels_lines
+    if command == 'help':
+        return(SHELL_HELP)
+    if command == 'checks':
+        return('\n'.join(' - '+x.__name__ for x in get_checks()))
+    if command == 'nodes':
+        return(describe_shell_nodes())
+    if command == 'check':
+        if not args:
+            raise ValueError('check <check|all> [nodes]')
+        my_results=execute_checks(None if args[0] == 'all' else [args[0]],args[1:] or None,
+                                  sshkey if login_worker_nodes_with_SSHKEY else None,True)
+        return(my_results['report'].rstrip('\n')+my_results['summary'].rstrip('\n'))
+    if command == 'facts':
+        if not args or len(args) > 2:
+            raise ValueError('facts <node> [text]')
+        return(describe_shell_facts(args[0],args[1] if len(args) > 1 else None))
+    if command == 'refresh':
+        if args:
+            for node in args:
+                forget_node(node)
+        else:
+            reset_caches()
+        # the cluster snapshot (labels, OS, kernel, ...) is always taken again
+        node_labels_lines=None
+        node_status_by_name.clear()
+        build_node_lists()
+        return(' refreshed: '+(', '.join(args) if args else 'all nodes')+'\n'+describe_shell_nodes())
+    raise ValueError('unknown command: '+command+' (see help)')
+
+def run_shell():
+
+    # --shell: interactive mode -> the cluster snapshot, node lists, node facts and ssh connections (ControlPersist) are
+    # kept between the commands, so only the 1st command pays for the discovery + the ssh handshakes
+    global interactive_shell
+    interactive_shell=True
+    my_start=time.monotonic()
+    print('Warming up: cluster snapshot, node lists + ssh pre-flight ...')
+    build_node_lists()
+    print(describe_shell_nodes())
+    print(' ({:.1f}s)\n'.format(time.monotonic()-my_start))
+    print(SHELL_HELP)
+    while True:
+        try:
+            my_words=input('\ncpc> ').split()
+        except EOFError:
+            print('')
+            break
+        except KeyboardInterrupt:
+            print('')
+            continue
+        if not my_words:
+            continue
+        if my_words[0] in ('quit','exit'):
+            break
+        my_start=time.monotonic()
+        try:
+            print(run_shell_command(my_words[0],my_words[1:]))
+        except ValueError as my_error:
+            print(' ERROR: '+str(my_error))
+        except KeyboardInterrupt:
+            print(' interrupted')
+        print(' ({:.2f}s)'.format(time.monotonic()-my_start))
+
+def run_checks(config=None,checks=None,nodes=None,context=None,sshkey=None,verbose=False,refresh=False):
+
+    # API: run the checks from python, eg:
+    #   import cpc_k8s_platform_checker as cpc
+    #   results=cpc.run_checks('prod.yaml',checks=['check_AMF_worker_nodes_sysctl'])
+    #   results=cpc.run_checks(context=results['context'],nodes=['worker0'])  -> reuses the caches (+ ssh connections)
+    #   results['context'].close()                                             -> closes the ssh connections of the run context
+    #   context : run context (RunContext) of an earlier call, None: new run context for this config
+    #   checks  : names of the checks to run (None = all checks of the config)
+    #   nodes   : only check these nodes (None = all nodes found via the labels of the config)
+    #   refresh : forget the caches of the run context first
+    # -> results: passed, failed ({check: reason}), not_applicable, skipped ({check: reason}), unreachable_nodes, summary,
+    #             report (verbose), context
+    # -> ValueError: invalid config, unknown check or no AMF worker nodes found
+    if context is None:
+        context=RunContext(config)
+    my_results=context.execute_checks(checks,nodes,sshkey,verbose,refresh)
+    my_results['context']=context
+    return(my_results)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i","--sshkey",     help= "provide ssh key to access the cluster nodes")
+    parser.add_argument("-v","--verbose",    help= "Add output verbosity -> report with details will be shown", action="store_true")
+    parser.add_argument("-p","--platform",   choices=['ncs', 'os', 'gcp','eccd','k8s'], help="Add target platform: ncs, os (openshift), gcp (Google Cloud Platform Anthos), eccd (E// CCD) or k8s (native k8s)")
+    parser.add_argument("-l","--listchecks", help= "Get an overview of implemented checks", action="store_true")
+    parser.add_argument("-c","--check",      help= "Give 1x check to be performed (only 1x check!)")
+    parser.add_argument("-n","--nodeinfo",   help= "Give overview of nodes (capacity cpu, mem, versions, OS, ...)", action="store_true")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("-s","--skipnode",   help= "Skip 1x node when running checks")
+    group.add_argument("-o","--onlynode",   help= "Only run checks on 1x specific node")
+    parser.add_argument("--clusters",       nargs='+', metavar='PROFILE', help= "Run the checks for several clusters at once: profiles of cluster_profiles in CPC_checker_parms.py ('all' = all profiles)")
+    parser.add_argument("--config",         metavar='FILE', help= "YAML/JSON profile file with the parameters that differ from CPC_checker_parms.py")
+    parser.add_argument("--node-major",     action="store_true", help= "Node by node: all per-node checks of a node back to back over 1x ssh connection, nodes at the same time")
+    parser.add_argument("--drift",          action="store_true", help= "Compare the node facts (node probe) across the nodes of each role -> facts differing from the majority")
+    parser.add_argument("--export-facts",   metavar='FILE', help= "Write all facts collected during the run to FILE: 1x row per (cluster, node, fact, value, timestamp), *.csv, *.csv.gz or *.parquet")
+    parser.add_argument("--shell",          action="store_true", help= "Interactive mode: check, refresh, facts, ... on a warm cluster snapshot, node facts + ssh connections (see help in the shell)")
+    parser.add_argument("--trace",          metavar='FILE', help= "Write the timeline of the run to FILE (Chrome trace-event JSON: chrome://tracing, ui.perfetto.dev): 1x span per check, node, node probe and command (with queue wait)")
+    parser.add_argument("--history",        nargs='?', const='runs', choices=['runs','status','slowest'], help= "Results of the previous runs (history_db): runs, status (per node per check, since when; filter: -o, -c) or slowest (nodes, checks)")
+    parser.add_argument("--diff-against",   metavar='RUN', help= "Only show what changed since an earlier run of the history database: run id (see --history), start time, report file or 'latest'")
+    parser.add_argument("--rerun-failed",   nargs='?', const='latest', metavar='RUN', help= "Only do the failing checks + nodes of an earlier run again (default: latest, see --diff-against), full report with the other results of that run")
+    parser.add_argument("--last",           type=int, default=30, metavar='N', help= "--history: the last N runs of each cluster (default: 30)")
+    parser.add_argument("--sample",         action="store_true", help= "Only check sample_nodes_per_group nodes of each group of identical nodes (the whole group when a sampled node fails)")
+    parser.add_argument("--self-check",     action="store_true", help= "Check that the ssh/kubectl transport errors are classified and retried as configured (transport_retry_*), then stop")
+    parser.add_argument("--compact",        action="store_true", help= "Compact report (-v): the nodes with the same outcome of a check on 1x line (N/M nodes: ...), full details in the history database (history_db)")
+    #parser.add_argument("-d","--debug",   help= "Enter debug mode", action="store_true")
+    #parser.add_argument("-t","--table",   help= "Print cluster information", action="store_true")
+    args = parser.parse_args(cluster_profile['argv'] if cluster_profile else None)
+
+    if args.export_facts:
+        if args.export_facts.endswith('.parquet') and pyarrow is None:
+            print('\n ERROR: --export-facts '+args.export_facts+' -> pyarrow is needed to write Parquet files (pip install pyarrow)\n')
+            sys.exit()
+        export_facts_path=args.export_facts
+    # several clusters at once: the facts are exported by run_clusters (1x file for all clusters)
+    export_facts_here=export_facts_path and not (cluster_profile and cluster_profile['capture_output'])
+    # same for the trace: 1x file for all clusters, 1x process per cluster
+    trace_path=args.trace
+    trace_here=trace_path and not (cluster_profile and cluster_profile['capture_output'])
+
+    # several clusters: every cluster runs this script in its own copy (cluster_profile)
+    if args.clusters and cluster_profile is None:
+        my_argv=[]
+        for my_option,my_value in (('-v',args.verbose),('--compact',args.compact),('-c',args.check),('-s',args.skipnode),('--diff-against',args.diff_against),('--rerun-failed',args.rerun_failed)):
+            if my_value is True:
+                my_argv.append(my_option)
+            elif my_value:
+                my_argv+=[my_option,my_value]
+        if args.sshkey:
+            my_argv+=['-i',args.sshkey]
+        if args.export_facts:
+            my_argv+=['--export-facts',args.export_facts]
+        if args.trace:
+            my_argv+=['--trace',args.trace]
+        run_clusters(args.clusters,my_argv,args.config)
+        sys.exit()
+
+    # profile file: run this script in its own copy with the config of the profile
+    if args.config and cluster_profile is None:
+        my_argv=list(sys.argv[1:])
+        my_index=my_argv.index('--config') if '--config' in my_argv else None
+        if my_index is None:
+            my_argv=[x for x in my_argv if not x.startswith('--config=')]
+        else:
+            del my_argv[my_index:my_index+2]
+        run_profile(os.path.basename(args.config),{'config':args.config},my_argv,capture_output=False)
+        sys.exit()
+    
+    if args.self_check:
+        sys.exit(0 if self_check_transport_retries() else 1)
+
+    if args.listchecks:
+        list_of_checks = []
+        for key, value in list(locals().items()):
+            if callable(value) and value.__module__ == __name__:
+                if key.startswith("check_"):
+                    list_of_checks.append(key)
+        list_of_checks.sort()
+        # if amf_ipvlan_interface_list has not been defined, you can't do the check... so remove it from the list:
+        if not amf_ipvlan_interface_list:
+            list_of_checks.remove('check_AMF_worker_nodes_ipvlan_interfaces')
+        # remove this dummy test
+        list_of_checks.remove('check_test')    
+        print('\nOverview of checks that can be performed:')
+        print('*****************************************')
+        for i in range(0,len(list_of_checks)):
+            print('  '+list_of_checks[i])
+        print('')
+        sys.exit()
+
+    # results of the previous runs instead of the checks:
+    if args.history:
+        if not history_db:
+            print('\n ERROR: --history needs history_db in CPC_checker_parms.py\n')
+            sys.exit()
+        print(create_history_report(args.history,args.onlynode,args.check,args.last))
+        sys.exit()
+    
+    if args.sshkey == None:
+        # login to worker nodes with SSH key:
+        login_worker_nodes_with_SSHKEY = False     
+    else:
+        login_worker_nodes_with_SSHKEY = True
+        sshkey = args.sshkey
+
+    if args.platform is not None:
+        target_platform = args.platform
+
+    if args.node_major:
+        execution_mode = 'node'
+
+    if args.sample:
+        sample_nodes = True
+
+    if args.compact:
+        compact_report = True
+
+    CPC_checker_report = ''
+    if args.verbose:
+        create_report = True
+    else:
+        create_report = False
+
+    # compact report without history database -> the details per node are not kept anywhere
+    if compact_report and create_report and not history_db:
+        print("\n WARNING: compact report without history_db in CPC_checker_parms.py -> the details per node are lost")
+
+    # check target_platform is a supported one:
+    target_plaform=target_platform.lower()
+    if target_plaform not in ['ncs','os','gcp','eccd','k8s']:
+        print("\n ERROR: "+target_plaform+" is not a supported target platform...")
+        print(" It should be one of the following values:\n")
+        print("  - ncs     : Nokia Container Services (NCS)")
+        print("  - os      : RedHat's OpenShift")
+        print("  - gcp     : Google Cloud Platform (Anthos)")
+        print("  - eccd    : Ericson's Cloud Container Distribution")
+        print("  - k8s     : native k8s platform")
+        print("\n -> Please correct the CPC_checker_parms.py file.\n")
+        sys.exit()
+
+    to_check=get_checks()
+
     # only want node info:
     if args.nodeinfo:
         #cmd=cmd_start_kubectl+'get nodes -o custom-columns=NAME:.metadata.name,CAP_CPU:.status.capacity.cpu,CAP_MEM:.status.capacity.memory,HUGE_1Gi:.status.capacity.hugepages-1Gi,HUGE_2Mi:.status.capacity.hugepages-2Mi,ARCH:.status.nodeInfo.architecture,ContRunTime:.status.nodeInfo.containerRuntimeVersion,kernelVers:.status.nodeInfo.kernelVersion,kubeProxyVers:.status.nodeInfo.kubeProxyVersion,kubeletVers:.status.nodeInfo.kubeletVersion,OSImage:.status.nodeInfo.osImage'
-        cmd=cmd_start_kubectl+'get nodes -o custom-columns=NAME:.metadata.name,CAP_CPU:.status.capacity.cpu,CAP_MEM:.status.capacity.memory,HUGE_1Gi:.status.capacity.hugepages-1Gi,ARCH:.status.nodeInfo.architecture,ContRunTime:.status.nodeInfo.containerRuntimeVersion,kernelVers:.status.nodeInfo.kernelVersion,kubeletVers:.status.nodeInfo.kubeletVersion,OSImage:.status.nodeInfo.osImage'
+        cmd=kubectl_argv('get','nodes','-o','custom-columns=NAME:.metadata.name,CAP_CPU:.status.capacity.cpu,CAP_MEM:.status.capacity.memory,HUGE_1Gi:.status.capacity.hugepages-1Gi,ARCH:.status.nodeInfo.architecture,ContRunTime:.status.nodeInfo.containerRuntimeVersion,kernelVers:.status.nodeInfo.kernelVersion,kubeletVers:.status.nodeInfo.kubeletVersion,OSImage:.status.nodeInfo.osImage')
         my_nodeInfo=get_Popen_info(cmd)
         print('\n'+my_nodeInfo)
         #
@@ -1768,30 +4444,35 @@ if __name__ == "__main__":
         # use parameter to define worker node:
         #
         # for now: do the SRIOV check only on CMG nodes
-        #       
-        list_CMG_workers=[]
-        list_CMG_workers_SRIOV=[]
-        if labels_cmgnode_sriov: 
-            for i in range(0,len(labels_cmgnode_sriov)):
-                my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_cmgnode_sriov[i]+"'|awk '{print $1}'")
-                list_CMG_workers_SRIOV = list_CMG_workers_SRIOV + my_info.splitlines()  
-            # remove duplicates 
-            list_CMG_workers_SRIOV=sorted(list(set(list_CMG_workers_SRIOV)))
-        else:
-            for i in range(0,len(labels_cmgnode)):
-                my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_cmgnode[i]+"'|awk '{print $1}'")
-                list_CMG_workers = list_CMG_workers + my_info.splitlines()
-            # remove duplicates
-            list_CMG_workers = sorted(list(set(list_CMG_workers)))        
-            list_CMG_workers_SRIOV = list_CMG_workers
-        my_CMG_workers=''
+        #  -> the CMG SRIOV nodes out of their labels only (see get_role_nodes): no ssh pre-flight, no cluster snapshot
+        list_CMG_workers_SRIOV=get_role_nodes('CMG_SRIOV')
+        my_nodeInfo=''
         for i in range(0,len(list_CMG_workers_SRIOV)):
-            my_CMG_workers += list_CMG_workers_SRIOV[i]+' '
-        cmd='for i in '+my_CMG_workers+';do echo $i;'+cmd_start_kubectl+'describe node $i |sed -n -e \'/Allocatable/,/System Info:/ p\' |grep sriov;done'
-        my_nodeInfo=get_Popen_info(cmd)
+            # describe node |sed -n -e '/Allocatable/,/System Info:/ p' |grep sriov
+            my_nodeInfo += list_CMG_workers_SRIOV[i]+'\n'
+            my_info=get_Popen_info(kubectl_argv('describe','node',list_CMG_workers_SRIOV[i]),parse=parse_allocatable_sriov)
+            if my_info != '':
+                my_nodeInfo += my_info+'\n'
         print('\n'+my_nodeInfo)
         sys.exit()
 
+    # fleet drift analysis instead of the checks:
+    if args.drift:
+        build_node_lists(args.onlynode,args.skipnode)
+        print(create_drift_report())
+        if export_facts_here:
+            export_facts(get_fact_rows(get_cluster_name()))
+        sys.exit()
+
+    # interactive mode instead of 1x run:
+    if args.shell:
+        run_shell()
+        sys.exit()
+
+    # report header (platform facts): not needed for --nodeinfo, --drift and --shell
+    if create_report:
+        create_report_header()
+
     # only perform 1x particular check?:
     if args.check:
         to_check = []
@@ -1803,194 +4484,55 @@ if __name__ == "__main__":
         list_of_checks.sort()
         if args.check in list_of_checks:
             # use function name to append function itself to 'to_check':
-            to_check.append(getattr(sys.modules[__name__], args.check))
+            to_check.append(globals()[args.check])
         else:
             print("\n ERROR: can't find this check ? Do: "+sys.argv[0]+" -l to get a list of possible checks...\n")
             sys.exit()
 
-    checks_OK=[]
-    checks_NOK=[]
-
     print("")
 
-    # build list of worker nodes
-    ############################
-    # get_all_workers = Popen("kubectl get node --selector='!node-role.kubernetes.io/master' -o custom-columns=NAME:.metadata.name --no-headers",shell=True, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.PIPE)    
-    # list_workers = get_all_workers.stdout.read().decode('utf-8').splitlines()
-    #my_info = get_Popen_info(cmd_start_kubectl+"get node --selector='node-role.kubernetes.io/worker' -o custom-columns=NAME:.metadata.name --no-headers")
-    #my_info = get_Popen_info(cmd_start_kubectl+"get node --selector='!node-role.kubernetes.io/master' -o custom-columns=NAME:.metadata.name --no-headers")
-    
-    #my_info = get_Popen_info(cmd_start_kubectl+"get node --selector='"+label_workernode+"' -o custom-columns=NAME:.metadata.name --no-headers")
-    #list_workers = my_info.splitlines()
-    list_workers=[] 
-    for i in range(0,len(labels_workernode)):
-        my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_workernode[i]+"'|awk '{print $1}'")
-        list_workers = list_workers + my_info.splitlines()  
-    # remove duplicates    
-    list_workers = sorted(list(set(list_workers)))
-
-    
-    # build list of NRD worker nodes
-    # my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+label_nrdnode+"'|awk '{print $1}'")
-    # list_NRD_workers = my_info.splitlines() 
-    list_NRD_workers=[]
-    for i in range(0,len(labels_amfnode)):
-        my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_nrdnode[i]+"'|awk '{print $1}'")
-        list_NRD_workers = list_NRD_workers + my_info.splitlines()  
-    # remove duplicates    
-    list_NRD_workers = sorted(list(set(list_NRD_workers)))
-
-    
-    # build list of AMF worker nodes
-    #get_all_AMF_workers = Popen("kubectl get node --show-labels|grep '"+label_amf+"'|awk '{print $1}'",shell=True, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    #list_AMF_workers = get_all_AMF_workers.stdout.read().decode('utf-8').splitlines()
-    # my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+label_amfnode+"'|awk '{print $1}'")
-    # list_AMF_workers = my_info.splitlines() 
-    list_AMF_workers=[]
-    for i in range(0,len(labels_amfnode)):
-        my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_amfnode[i]+"'|awk '{print $1}'")
-        list_AMF_workers = list_AMF_workers + my_info.splitlines()  
-    # remove duplicates    
-    list_AMF_workers = sorted(list(set(list_AMF_workers)))
-    
-    # build list of CMG worker nodes
-    #my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+label_cmgnode+"'|awk '{print $1}'")
-    list_CMG_workers=[]
-    for i in range(0,len(labels_cmgnode)):
-        my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_cmgnode[i]+"'|awk '{print $1}'")
-        list_CMG_workers = list_CMG_workers + my_info.splitlines()  
-    # remove duplicates       
-    list_CMG_workers = sorted(list(set(list_CMG_workers)))
-    
-    # SRIOV:
-    list_CMG_workers_SRIOV=[]
-    if labels_cmgnode_sriov: 
-        for i in range(0,len(labels_cmgnode_sriov)):
-            my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_cmgnode_sriov[i]+"'|awk '{print $1}'")
-            list_CMG_workers_SRIOV = list_CMG_workers_SRIOV + my_info.splitlines()  
-        # remove duplicates 
-        list_CMG_workers_SRIOV=sorted(list(set(list_CMG_workers_SRIOV)))
-    else:
-        list_CMG_workers_SRIOV=list_CMG_workers
-    
-    # IPVLAN:
-    list_CMG_workers_IPVLAN=[]
-    if labels_cmgnode_ipvlan:
-        for i in range(0,len(labels_cmgnode_ipvlan)):
-            my_info = get_Popen_info(cmd_start_kubectl+"get node --show-labels|grep -e '"+labels_cmgnode_ipvlan[i]+"'|awk '{print $1}'")
-            list_CMG_workers_IPVLAN = list_CMG_workers_IPVLAN + my_info.splitlines()  
-        # remove duplicates 
-        list_CMG_workers_IPVLAN=sorted(list(set(list_CMG_workers_IPVLAN)))
-    else:
-        list_CMG_workers_IPVLAN=list_CMG_workers_SRIOV
-    
-    # list_CMG_workers contains all nodes: labels_cmgnode + labels_cmgnode_SRIOV + labels_cmgnode_IPVLAN
-    list_CMG_workers = list_CMG_workers + list_CMG_workers_SRIOV + list_CMG_workers_IPVLAN
-    # remove duplicates       
-    list_CMG_workers = sorted(list(set(list_CMG_workers)))
-
-    if args.skipnode:
-        nodes_to_skip.append(args.skipnode)
-
-    # skip certain node(s) if given:
-    if nodes_to_skip:
-        list_workers=[x for x in list_workers if (x not in nodes_to_skip)]
-        list_NRD_workers=[x for x in list_NRD_workers if (x not in nodes_to_skip)]
-        list_AMF_workers=[x for x in list_AMF_workers if (x not in nodes_to_skip)]
-        list_CMG_workers=[x for x in list_CMG_workers if (x not in nodes_to_skip)]
-        list_CMG_workers_SRIOV=[x for x in list_CMG_workers_SRIOV if (x not in nodes_to_skip)]
-        list_CMG_workers_IPVLAN=[x for x in list_CMG_workers_IPVLAN if (x not in nodes_to_skip)]
-    
-    # do all checks only on 1 node:
-    if args.onlynode:
-        list_workers=[args.onlynode]
-        list_NRD_workers=[x for x in list_workers if (x in list_NRD_workers)]
-        list_AMF_workers=[args.onlynode]
-        list_CMG_workers=[args.onlynode]
-
-    # for ECCD: get the node IPs instead of the hostnames:
-    # kubectl describe node worker-pool1-6jvz816e-ccd0-mmt3-tenant1-testing | grep 'InternalIP'|awk '{print $2}'
-    # replace in the lists the hostnames by its IP
-    if target_platform=='eccd':
-        # list_workers:
-        for i in range(0,len(list_workers)):
-            # get IP of node:
-            my_node_IP = get_Popen_info("kubectl describe node "+list_workers[i]+" | grep InternalIP|awk '{print $2}'")
-            list_workers[list_workers.index(list_workers[i])] = str(my_node_IP).rstrip('\n')
-        # nrd_workers:
-        for i in range(0,len(list_NRD_workers)):
-            # get IP of node:
-            my_node_IP = get_Popen_info("kubectl describe node "+list_NRD_workers[i]+" | grep InternalIP|awk '{print $2}'")
-            list_NRD_workers[list_NRD_workers.index(list_NRD_workers[i])] = str(my_node_IP).rstrip('\n')        
-        # amf_workers:
-        for i in range(0,len(list_AMF_workers)):
-            # get IP of node:
-            my_node_IP = get_Popen_info("kubectl describe node "+list_AMF_workers[i]+" | grep InternalIP|awk '{print $2}'")
-            list_AMF_workers[list_AMF_workers.index(list_AMF_workers[i])] = str(my_node_IP).rstrip('\n')        
-        # cmg_workers:
-        for i in range(0,len(list_CMG_workers)):
-            # get IP of node:
-            my_node_IP = get_Popen_info("kubectl describe node "+list_CMG_workers[i]+" | grep InternalIP|awk '{print $2}'")
-            list_CMG_workers[list_CMG_workers.index(list_CMG_workers[i])] = str(my_node_IP).rstrip('\n')
-        # cmg workers sriov:
-        for i in range(0,len(list_CMG_workers_SRIOV)):
-            # get IP of node:
-            my_node_IP = get_Popen_info("kubectl describe node "+list_CMG_workers_SRIOV[i]+" | grep InternalIP|awk '{print $2}'")
-            list_CMG_workers_SRIOV[list_CMG_workers_SRIOV.index(list_CMG_workers_SRIOV[i])] = str(my_node_IP).rstrip('\n')
-        # cmg workers ipvlan:
-        for i in range(0,len(list_CMG_workers_IPVLAN)):
-            # get IP of node:
-            my_node_IP = get_Popen_info("kubectl describe node "+list_CMG_workers_IPVLAN[i]+" | grep InternalIP|awk '{print $2}'")
-            list_CMG_workers_IPVLAN[list_CMG_workers_IPVLAN.index(list_CMG_workers_IPVLAN[i])] = str(my_node_IP).rstrip('\n')
-            
-    if len(list_AMF_workers)==0:
+    run_started=time.time()
+    run_span=start_trace_span('run: '+get_cluster_name(),'run')
+    # only the failing checks + nodes of an earlier run:
+    if args.rerun_failed:
+        if not history_db:
+            print(" ERROR: --rerun-failed needs history_db in CPC_checker_parms.py\n")
+            sys.exit()
+        carried_from=get_baseline_run(args.rerun_failed)
+        if carried_from is None:
+            print(" ERROR: --rerun-failed "+args.rerun_failed+" -> run not found in the history database (history_db), see --history\n")
+            sys.exit()
+        my_checks,my_results=get_failed_of_run(carried_from)
+        carried_checks.update(my_checks)
+        carried_results.update(my_results)
+    # only the changes since an earlier run:
+    if args.diff_against:
+        if not history_db:
+            print(" ERROR: --diff-against needs history_db in CPC_checker_parms.py\n")
+            sys.exit()
+        diff_baseline=get_baseline_run(args.diff_against)
+        if diff_baseline is None:
+            print(" ERROR: --diff-against "+args.diff_against+" -> run not found in the history database (history_db), see --history\n")
+            sys.exit()
+        if diff_skip_unchanged_nodes and not args.rerun_failed:
+            carried_from=diff_baseline
+            fetch_node_status()
+            carried_results.update(get_unchanged_nodes(diff_baseline))
+    build_node_lists(args.onlynode,args.skipnode)
+
+    # all checks: the AMF worker nodes must be there (1x check: only the node lists it needs are built, see get_node_list)
+    if not args.check and len(get_node_list('AMF'))==0:
         print("!! ABORTING -> I could not find any AMF worker nodes? Please check the amf_label parameter?\n")
         sys.exit()
 
-    if run_checks_alphabetically:
-        # order checks alphabetically:
-        # first back to strings, order them and then back to functions:
-        temp_list=[]
-        for i in range(0,len(to_check)):
-            temp_list.append(to_check[i].__name__)
-        
-        temp_list.sort()
-
-        to_check=[]
-        for i in range(0,len(temp_list)):
-            to_check.append(eval(temp_list[i]))
-
-    for test in progressbar(to_check, "Progress: ", 40):
-        #print("-> checking: "+str(test.__name__))
-        if create_report:
-            CPC_report(level1,str(test.__name__))
-        result_test=test()
-        if result_test=='OK':
-            checks_OK.append(test.__name__)
-        else:
-            checks_NOK.append(test.__name__)
-            checks_NOK.append(result_test[1])
-
-    # overview test status:
-    test_status=''
-    test_status+='\n\n'
-    total_tests=len(checks_OK)+len(checks_NOK)//2
-    test_status+='Successful tests ['+str(len(checks_OK))+'/'+str(total_tests)+']:'+'\n'
-    for i in range(0,len(checks_OK)):
-        test_status+=' - '+checks_OK[i]+'\n'
+    # several clusters at once -> no progress bar:
+    checks_OK,checks_NOK,checks_NA,checks_SKIPPED=run_check_list(to_check,io.StringIO() if cluster_profile and cluster_profile['capture_output'] else sys.stdout)
 
-    if len(checks_NOK)>1:    
-        test_status+='\nFailing tests    ['+str(len(checks_NOK)//2)+'/'+str(total_tests)+']:'+'\n'        
-        # print failing tests in nicer output:
-        temp_checks_NOK=[]
-        for i in range(0,len(checks_NOK),2):
-            temp_checks_NOK.append(checks_NOK[i])
-        # longest check:
-        longest_check=len(max(temp_checks_NOK, key=len))        
-        for i in range(0,len(checks_NOK),2):
-             test_status+=' - '+checks_NOK[i].ljust(longest_check)+' : '+checks_NOK[i+1]+'\n'
-    
-    test_status+='\n\n'
+    if carried_results:
+        checks_OK,checks_NOK,checks_NA,checks_SKIPPED=apply_carried_results(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
+    test_status=create_test_status(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
+    if diff_baseline:
+        test_status+=create_run_diff(checks_OK,checks_NOK,checks_NA,checks_SKIPPED)
     print(test_status)
 
     if create_report:
@@ -2066,7 +4608,14 @@ if __name__ == "__main__":
         # 
         CPC_checker_parms_report=''
         CPC_checker_parms_report=create_report_header_header('Settings of CPC_checker_parms.py:')
-        CPC_checker_parms_report += get_Popen_info("awk '!/^#/ && NF' CPC_checker_parms.py")        
+        with open('CPC_checker_parms.py') as f:
+            CPC_checker_parms_report += ''.join(x for x in f if x.strip() != '' and not x.startswith('#'))
+        if cluster_profile:
+            CPC_checker_parms_report += '\n# profile: '+cluster_profile['name']+'\n'
+            if cluster_profile['config']:
+                CPC_checker_parms_report += '# config file: '+os.path.abspath(cluster_profile['config'])+'\n'
+                CPC_checker_parms_report += ''.join(x+'='+repr(y)+'\n' for x,y in sorted(read_config_file(cluster_profile['config']).items()))
+            CPC_checker_parms_report += ''.join(x+'='+repr(y)+'\n' for x,y in sorted(cluster_profile['parms'].items()))
         #print(CPC_checker_parms_report)
 
         #create report file:
@@ -2081,6 +4630,16 @@ if __name__ == "__main__":
 
         print(' -> report created: '+REPORT_FILENAME+'\n')
 
+    if history_db:
+        store_run_history(run_started,checks_OK,checks_NOK,checks_NA,checks_SKIPPED,REPORT_FILENAME if CREATE_REPORT_FILE else None)
+
+    if export_facts_here:
+        export_facts(get_fact_rows(get_cluster_name()))
+
+    end_trace_span(run_span)
+    if trace_here:
+        export_trace([(get_cluster_name(),trace_events)])
+
     # print("")
     # get only worker nodes:
     # kubectl get node -l node-role.kubernetes.io/worker
@@ -0,0 +1,209 @@
+#!/bin/sh
+#
+# CPC node probe: collects the node facts needed by cpc_k8s_platform_checker.py in 1x go
+#
+# the checker streams this script over ssh stdin (sudo sh -s -- <arguments>) once per node
+# and gets back 1x JSON document with all facts (sysctl, kernel modules, THP, SELinux, systemd units,
+# hugepages, kubelet, CNI config, interfaces, ...) -> the parsing is done on the jump host
+#
+# arguments:
+#   $1      : compress the JSON document (gzip + base64) when it is bigger than $1 bytes (0 = never)
+#   $2 ...  : interfaces for which the ethtool features are collected (eg: bond0)
+#
+# !! this script is READ-ONLY: it does not change anything on the node
+# !! only needs: sh, sed, awk, tr (gzip + base64 when compressing)
+#
+# comments: jan.van_opstal@nokia.com
+#
+# schema version of the JSON document -> bump when the layout changes (checked by the checker)
+SCHEMA_VERSION=1
+
+COMPRESS_MIN_BYTES=${1:-0}
+[ $# -gt 0 ] && shift
+
+PATH=$PATH:/usr/sbin:/sbin:/usr/bin:/bin
+LC_ALL=C
+export PATH LC_ALL
+
+# JSON string of $1
+json_str() {
+    printf '"%s"' "$(printf '%s' "$1" | tr -d '\r\n' | tr '\t' ' ' | sed -e 's/\\/\\\\/g' -e 's/"/\\"/g')"
+}
+
+# escape the lines on stdin so they can be used in a JSON string
+json_escape_lines() {
+    tr -d '\r' | tr '\t' ' ' | sed -e 's/\\/\\\\/g' -e 's/"/\\"/g'
+}
+
+# "key = value" lines of sysctl -a -> {"key":"value",...}
+probe_sysctl() {
+    sysctl -a 2>/dev/null | json_escape_lines | awk -F' = ' '
+        BEGIN { printf "{" }
+        NF >= 2 { printf "%s\"%s\":\"%s\"", (n++ ? "," : ""), $1, substr($0, length($1) + 4) }
+        END { printf "}" }'
+}
+
+# loaded kernel modules -> ["ipv6","sctp",...]
+probe_modules() {
+    cat /proc/modules 2>/dev/null | awk '
+        BEGIN { printf "[" }
+        { printf "%s\"%s\"", (n++ ? "," : ""), $1 }
+        END { printf "]" }'
+}
+
+# transparent hugepage setting -> the selected value between [ ]
+probe_thp() {
+    json_str "$(sed -n 's/.*\[\(.*\)\].*/\1/p' /sys/kernel/mm/transparent_hugepage/enabled 2>/dev/null)"
+}
+
+# SELinux: setting in /etc/selinux/config + runtime status
+probe_selinux() {
+    config=$(sed -n 's/^SELINUX=//p' /etc/selinux/config 2>/dev/null | head -n1)
+    status=''
+    mode=''
+    if command -v sestatus >/dev/null 2>&1; then
+        status=$(sestatus 2>/dev/null | sed -n 's/^SELinux status: *//p')
+        mode=$(sestatus 2>/dev/null | sed -n 's/^Current mode: *//p')
+    elif command -v getenforce >/dev/null 2>&1; then
+        mode=$(getenforce 2>/dev/null | tr 'A-Z' 'a-z')
+    fi
+    printf '{"config":%s,"status":%s,"current_mode":%s}' "$(json_str "$config")" "$(json_str "$status")" "$(json_str "$mode")"
+}
+
+# systemd units: state + limits (effective values) -> {"docker":{"ActiveState":"active","LimitMSGQUEUE":"infinity",...},...}
+probe_systemd() {
+    printf '{'
+    first=1
+    if command -v systemctl >/dev/null 2>&1; then
+        for unit in docker containerd crio kubelet ipsec; do
+            props=$(systemctl show -p LoadState -p ActiveState -p UnitFileState -p LimitMSGQUEUE -p LimitMEMLOCK -p LimitNOFILE "$unit.service" 2>/dev/null) || continue
+            [ $first -eq 1 ] || printf ','
+            first=0
+            printf '%s:' "$(json_str "$unit")"
+            printf '%s\n' "$props" | json_escape_lines | awk -F'=' '
+                BEGIN { printf "{" }
+                NF >= 2 { printf "%s\"%s\":\"%s\"", (n++ ? "," : ""), $1, substr($0, length($1) + 2) }
+                END { printf "}" }'
+        done
+    fi
+    printf '}'
+}
+
+# hugepages info of /proc/meminfo -> {"HugePages_Total":"50","Hugepagesize":"1048576 kB",...}
+probe_hugepages() {
+    cat /proc/meminfo 2>/dev/null | awk -F':' '
+        BEGIN { printf "{" }
+        /^HugePages_|^Hugepagesize|^Hugetlb/ { v = $2; gsub(/^ +| +$/, "", v); printf "%s\"%s\":\"%s\"", (n++ ? "," : ""), $1, v }
+        END { printf "}" }'
+}
+
+# kubelet: cpu manager state + policies in the (platform specific) kubelet config files
+probe_kubelet() {
+    policy=$(sed -n 's/.*"policyName" *: *"\([^"]*\)".*/\1/p' /var/lib/kubelet/cpu_manager_state 2>/dev/null | head -n1)
+    printf '{"cpu_manager_state_policy":%s,"config_files":{' "$(json_str "$policy")"
+    first=1
+    for f in /var/lib/kubelet/config.yaml /etc/kubernetes/kubelet.conf /etc/kubernetes/kubelet-config.yml; do
+        [ -r "$f" ] || continue
+        [ $first -eq 1 ] || printf ','
+        first=0
+        printf '%s:{' "$(json_str "$f")"
+        sep=''
+        for key in cpuManagerPolicy topologyManagerPolicy topologyManagerScope; do
+            value=$(sed -n 's/^[ "]*'"$key"'"\{0,1\} *: *"\{0,1\}\([^",]*\)"\{0,1\}.*/\1/p' "$f" | head -n1)
+            [ -n "$value" ] || continue
+            printf '%s%s:%s' "$sep" "$(json_str "$key")" "$(json_str "$value")"
+            sep=','
+        done
+        printf '}'
+    done
+    printf '}}'
+}
+
+# files in the CNI config dirs -> {"/etc/cni/net.d":["00-multus.conf",...],...}
+probe_cni() {
+    printf '{'
+    first=1
+    for d in /etc/cni/net.d /etc/kubernetes/cni/net.d; do
+        [ -d "$d" ] || continue
+        [ $first -eq 1 ] || printf ','
+        first=0
+        printf '%s:' "$(json_str "$d")"
+        ls "$d" 2>/dev/null | json_escape_lines | awk '
+            BEGIN { printf "[" }
+            { printf "%s\"%s\"", (n++ ? "," : ""), $0 }
+            END { printf "]" }'
+    done
+    printf '}'
+}
+
+# interfaces: state, mtu and number of virtual functions -> {"bond0":{"state":"UP","mtu":9000,"vfs":0},...}
+probe_interfaces() {
+    ip -o link show 2>/dev/null | json_escape_lines | awk '
+        BEGIN { printf "{" }
+        {
+            name = $2; sub(/:$/, "", name); sub(/@.*/, "", name)
+            mtu = 0; state = ""
+            for (i = 3; i < NF; i++) {
+                if ($i == "mtu") mtu = $(i + 1)
+                if ($i == "state") state = $(i + 1)
+            }
+            line = $0
+            vfs = gsub(/ vf [0-9]+ /, "", line)
+            printf "%s\"%s\":{\"state\":\"%s\",\"mtu\":%d,\"vfs\":%d}", (n++ ? "," : ""), name, state, mtu, vfs
+        }
+        END { printf "}" }'
+}
+
+# ethtool features of the given interfaces -> {"bond0":{"tx-udp_tnl-segmentation":"off",...}}
+probe_ethtool() {
+    printf '{'
+    first=1
+    if command -v ethtool >/dev/null 2>&1; then
+        for itf in "$@"; do
+            features=$(ethtool -k "$itf" 2>/dev/null) || continue
+            [ $first -eq 1 ] || printf ','
+            first=0
+            printf '%s:' "$(json_str "$itf")"
+            printf '%s\n' "$features" | json_escape_lines | awk -F': ' '
+                BEGIN { printf "{" }
+                NF >= 2 { split($2, v, " "); printf "%s\"%s\":\"%s\"", (n++ ? "," : ""), $1, v[1] }
+                END { printf "}" }'
+        done
+    fi
+    printf '}'
+}
+
+# OS release info
+probe_os_release() {
+    printf '{"ID":%s,"VERSION_ID":%s,"PRETTY_NAME":%s}' \
+        "$(json_str "$(sed -n 's/^ID=//p' /etc/os-release 2>/dev/null | tr -d '"')")" \
+        "$(json_str "$(sed -n 's/^VERSION_ID=//p' /etc/os-release 2>/dev/null | tr -d '"')")" \
+        "$(json_str "$(sed -n 's/^PRETTY_NAME=//p' /etc/os-release 2>/dev/null | tr -d '"')")"
+}
+
+doc=$(
+    printf '{"schema_version":%s' "$SCHEMA_VERSION"
+    printf ',"hostname":%s' "$(json_str "$(cat /proc/sys/kernel/hostname 2>/dev/null)")"
+    printf ',"kernel":%s' "$(json_str "$(uname -r 2>/dev/null)")"
+    printf ',"os_release":%s' "$(probe_os_release)"
+    printf ',"sysctl":%s' "$(probe_sysctl)"
+    printf ',"modules":%s' "$(probe_modules)"
+    printf ',"thp":%s' "$(probe_thp)"
+    printf ',"selinux":%s' "$(probe_selinux)"
+    printf ',"systemd":%s' "$(probe_systemd)"
+    printf ',"hugepages":%s' "$(probe_hugepages)"
+    printf ',"kubelet":%s' "$(probe_kubelet)"
+    printf ',"cni":%s' "$(probe_cni)"
+    printf ',"interfaces":%s' "$(probe_interfaces)"
+    printf ',"ethtool":%s' "$(probe_ethtool "$@")"
+    printf '}'
+)
+
+# big document -> compress it (less to transfer over ssh)
+if [ "$COMPRESS_MIN_BYTES" -gt 0 ] && [ "${#doc}" -gt "$COMPRESS_MIN_BYTES" ] \
+        && command -v gzip >/dev/null 2>&1 && command -v base64 >/dev/null 2>&1; then
+    echo "CPC_PROBE_GZIP_BASE64"
+    printf '%s' "$doc" | gzip -c | base64
+else
+    printf '%s\n' "$doc"
+fi